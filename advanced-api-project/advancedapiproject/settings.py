@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -45,6 +46,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'api.compression.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -83,6 +85,21 @@ DATABASES = {
     }
 }
 
+# Cache
+# The object cache (api.objectcache) uses cache.add() as a lock between
+# workers and deletes entries when books and authors change. LocMemCache is
+# per process: with more than one worker, other processes keep serving stale
+# books (up to OBJECT_CACHE_TIMEOUT + OBJECT_CACHE_STALE_TIMEOUT) and reject
+# new authors (up to OBJECT_CACHE_NEGATIVE_TIMEOUT). It is only fine for a
+# single process; deployments must point DJANGO_CACHE_BACKEND at a shared
+# backend (Redis, Memcached), which `manage.py check --deploy` enforces.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('DJANGO_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', ''),
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -135,4 +152,38 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ]
-}
\ No newline at end of file
+}
+# Books embedded per author on the author endpoints (?books_limit=)
+AUTHOR_TOP_BOOKS = 5
+AUTHOR_TOP_BOOKS_MAX = 50
+
+# Facet counts on the book list (?facets=): values per facet and cache lifetime
+FACET_LIMIT = 50
+FACET_CACHE_TIMEOUT = 60
+
+# Bulk book writes (POST/PATCH a JSON list): items per bulk query and transaction
+BULK_CHUNK_SIZE = 500
+
+# Book list: rows rendered per chunk with ?stream=true, cursor page sizes with ?page_size=
+STREAM_CHUNK_SIZE = 1000
+BOOK_PAGE_SIZE = 100
+BOOK_PAGE_SIZE_MAX = 1000
+
+# Response compression (api.compression.CompressionMiddleware): br or gzip as
+# negotiated, for bodies of at least COMPRESSION_MIN_SIZE bytes
+COMPRESSION_MIN_SIZE = 860
+COMPRESSION_LEVELS = {'br': 4, 'gzip': 6}
+# Per URL name; the unpaginated book list is large enough to pay for a higher level
+COMPRESSION_ROUTE_LEVELS = {
+    'book-list': {'br': 5, 'gzip': 6},
+}
+
+# Book/author object cache (api.objectcache): seconds an entry is fresh, how
+# long an expired one may still be served while it is reloaded, and how long
+# a missing id is remembered
+OBJECT_CACHE_TIMEOUT = 300
+OBJECT_CACHE_STALE_TIMEOUT = 60
+OBJECT_CACHE_NEGATIVE_TIMEOUT = 30
+# Seconds one worker may hold a reload lock, and others wait for its result
+OBJECT_CACHE_LOCK_TIMEOUT = 10
+OBJECT_CACHE_WAIT = 2.0
@@ -0,0 +1,200 @@
+import copy
+import datetime
+
+from django.conf import settings
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import DatabaseError, transaction
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from . import objectcache
+
+
+def chunks(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class BulkWriteMixin:
+    """
+    Lets a create/update view accept a JSON list and write it in bulk.
+
+    - The batch is validated first, item by item, with one shared context:
+      the current year is computed once, and related objects are looked up
+      with one query per related field (see BatchPrimaryKeyRelatedField).
+    - Valid items are written with bulk_create / bulk_update, one
+      transaction per chunk of BULK_CHUNK_SIZE items.
+    - Invalid items are reported by position and the rest are still saved.
+      With ?atomic=true nothing is saved unless every item is valid, and
+      everything is written in a single transaction.
+
+    Response: {"results": [...saved items...], "errors": [{"index": 0, "errors": {...}}]}
+    with status 201/200 when everything was saved, 207 when only some were,
+    and 400 when none were.
+    """
+    bulk_related_fields = ()
+
+    def bulk_written(self, objects, originals):
+        """
+        Called in the write transaction after each chunk, with the saved
+        objects and (for updates) copies of them from before the update.
+        bulk_create/bulk_update send no model signals, so views keep
+        anything derived from the rows current here.
+        """
+
+    def is_atomic(self):
+        return self.request.query_params.get('atomic', '').lower() in ('1', 'true', 'yes')
+
+    def get_bulk_chunk_size(self):
+        return getattr(settings, 'BULK_CHUNK_SIZE', 500)
+
+    def get_bulk_context(self, items):
+        context = self.get_serializer_context()
+        context['current_year'] = datetime.datetime.now().year
+        serializer_class = self.get_serializer_class()
+        related = {}
+        for name in self.bulk_related_fields:
+            field = serializer_class().fields[name]
+            ids = {item.get(name) for item in items if isinstance(item, dict)}
+            ids = {value for value in ids if isinstance(value, int) or str(value).isdigit()}
+            related[name] = field.get_queryset().in_bulk(ids)
+        context['batch_related'] = related
+        return context
+
+    def check_list(self, data):
+        if not isinstance(data, list):
+            raise ValidationError({'non_field_errors': ['Expected a list of items.']})
+        if not data:
+            raise ValidationError({'non_field_errors': ['The list is empty.']})
+
+    def get_bulk_instances(self, items):
+        """
+        The objects the items of an update batch name by id, as
+        ({index: instance}, errors). Ids the pk field cannot convert are
+        reported per item; the rest are looked up in one query on the
+        view's queryset.
+        """
+        pk_field = self.get_queryset().model._meta.pk
+        pks, errors = {}, []
+        for index, item in enumerate(items):
+            if not isinstance(item, dict) or item.get('id') is None:
+                continue
+            try:
+                pks[index] = pk_field.to_python(item['id'])
+            except DjangoValidationError as exc:
+                errors.append({'index': index, 'errors': {'id': exc.messages}})
+        found = self.get_queryset().in_bulk(set(pks.values()))
+        return {index: found.get(pk) for index, pk in pks.items()}, errors
+
+    def validate_batch(self, items, instances=None, partial=False, errors=()):
+        """
+        Validate each item, skipping those already in `errors`. For updates,
+        `instances` maps item index to the object it updates.
+        """
+        context = self.get_bulk_context(items)
+        serializer_class = self.get_serializer_class()
+        valid, errors = [], list(errors)
+        failed = {error['index'] for error in errors}
+        for index, item in enumerate(items):
+            if index in failed:
+                continue
+            instance = None
+            if instances is not None:
+                instance = instances.get(index)
+                if instance is None:
+                    errors.append({'index': index, 'errors': {'id': ['No item with this id.']}})
+                    continue
+            serializer = serializer_class(instance, data=item, partial=partial, context=context)
+            if serializer.is_valid():
+                valid.append((index, serializer))
+            else:
+                errors.append({'index': index, 'errors': serializer.errors})
+        return valid, errors
+
+    def write_in_chunks(self, valid, write):
+        """
+        Run write(list of serializers) per chunk. A chunk the database rejects
+        is reported item by item and does not stop the following chunks.
+        """
+        saved, errors = [], []
+        if self.is_atomic():
+            try:
+                with transaction.atomic():
+                    for chunk in chunks(valid, self.get_bulk_chunk_size()):
+                        write([serializer for _, serializer in chunk])
+            except DatabaseError as exc:
+                return [], [{'index': index, 'errors': {'non_field_errors': [str(exc)]}}
+                            for index, _ in valid]
+            return [serializer for _, serializer in valid], errors
+
+        for chunk in chunks(valid, self.get_bulk_chunk_size()):
+            try:
+                with transaction.atomic():
+                    write([serializer for _, serializer in chunk])
+            except DatabaseError as exc:
+                errors.extend({'index': index, 'errors': {'non_field_errors': [str(exc)]}}
+                              for index, _ in chunk)
+            else:
+                saved.extend(serializer for _, serializer in chunk)
+        return saved, errors
+
+    def bulk_response(self, saved, errors, success_status):
+        results = [serializer.to_representation(serializer.instance) for serializer in saved]
+        errors = sorted(errors, key=lambda error: error['index'])
+        if not errors:
+            code = success_status
+        elif saved:
+            code = status.HTTP_207_MULTI_STATUS
+        else:
+            code = status.HTTP_400_BAD_REQUEST
+        return Response({'results': results, 'errors': errors}, status=code)
+
+    def bulk_create(self, request):
+        items = request.data
+        self.check_list(items)
+        valid, errors = self.validate_batch(items)
+        if errors and self.is_atomic():
+            return self.bulk_response([], errors, status.HTTP_201_CREATED)
+
+        model = self.get_queryset().model
+
+        def write(serializers):
+            objects = model.objects.bulk_create(
+                [model(**serializer.validated_data) for serializer in serializers]
+            )
+            for serializer, obj in zip(serializers, objects):
+                serializer.instance = obj
+            # bulk_create sends no post_save; drop any "does not exist" entries.
+            objectcache.invalidate(model, *[obj.pk for obj in objects])
+            self.bulk_written(objects, [])
+
+        saved, write_errors = self.write_in_chunks(valid, write)
+        return self.bulk_response(saved, errors + write_errors, status.HTTP_201_CREATED)
+
+    def bulk_update(self, request, partial=True):
+        items = request.data
+        self.check_list(items)
+        instances, id_errors = self.get_bulk_instances(items)
+        valid, errors = self.validate_batch(items, instances=instances, partial=partial, errors=id_errors)
+        if errors and self.is_atomic():
+            return self.bulk_response([], errors, status.HTTP_200_OK)
+
+        model = self.get_queryset().model
+
+        def write(serializers):
+            fields = set()
+            originals = [copy.copy(serializer.instance) for serializer in serializers]
+            for serializer in serializers:
+                for name, value in serializer.validated_data.items():
+                    setattr(serializer.instance, name, value)
+                    fields.add(name)
+            if fields:
+                instances = [serializer.instance for serializer in serializers]
+                model.objects.bulk_update(instances, sorted(fields))
+                # bulk_update sends no post_save either.
+                objectcache.invalidate(model, *[obj.pk for obj in instances])
+                self.bulk_written(instances, originals)
+
+        saved, write_errors = self.write_in_chunks(valid, write)
+        return self.bulk_response(saved, errors + write_errors, status.HTTP_200_OK)
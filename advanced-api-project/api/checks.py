@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+
+# Backends whose entries, locks and deletes stay inside one process.
+PER_PROCESS_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register(Tags.caches, deploy=True)
+def check_object_cache_backend(app_configs, **kwargs):
+    """api.objectcache needs a cache every worker process shares."""
+    backend = settings.CACHES.get('default', {}).get('BACKEND', '')
+    if backend not in PER_PROCESS_BACKENDS:
+        return []
+    return [Error(
+        f"The default cache ({backend}) is not shared between processes, so "
+        "api.objectcache would serve stale and missing objects across workers.",
+        hint="Set DJANGO_CACHE_BACKEND to a shared backend such as "
+             "django.core.cache.backends.redis.RedisCache.",
+        id='api.E001',
+    )]
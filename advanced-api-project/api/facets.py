@@ -0,0 +1,75 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from rest_framework.exceptions import ValidationError
+
+FACET_KEY = 'api:facets:%s'
+
+
+class Facet:
+    """
+    Counts of matching rows per value of one field, e.g. books per year.
+    `label` names a related field to show next to the value (author name).
+    """
+
+    def __init__(self, field, label=None):
+        self.field = field
+        self.label = label
+
+    def counts(self, queryset, limit):
+        columns = [self.field] + ([self.label] if self.label else [])
+        # order_by() drops the list ordering so the database only groups.
+        rows = (queryset.order_by().values(*columns)
+                .annotate(count=Count('pk'))
+                .order_by('-count', self.field)[:limit])
+        return [
+            {'value': row[self.field], **({'label': row[self.label]} if self.label else {}),
+             'count': row['count']}
+            for row in rows
+        ]
+
+
+def parse_facets(request, available):
+    """
+    Names from ?facets=a,b, checked against the view's facets.
+    """
+    value = request.query_params.get('facets', '')
+    names = [name.strip() for name in value.split(',') if name.strip()]
+    unknown = [name for name in names if name not in available]
+    if unknown:
+        raise ValidationError({'facets': f'Unknown facet(s): {", ".join(unknown)}. '
+                                         f'Choose from: {", ".join(available)}.'})
+    return names
+
+
+def filter_signature(request, ignored=('facets', 'ordering', 'page', 'cursor')):
+    """
+    The query parameters that decide which rows match, in a stable order.
+    Ordering and paging change the results page but not the counts.
+    """
+    params = sorted(
+        (key, value) for key, values in request.query_params.lists()
+        if key not in ignored for value in values
+    )
+    return hashlib.md5(repr(params).encode(), usedforsecurity=False).hexdigest()
+
+
+def facet_counts(request, queryset, facets, names):
+    """
+    Grouped counts for each requested facet over the already filtered
+    queryset, cached for FACET_CACHE_TIMEOUT seconds per filter signature.
+    """
+    signature = filter_signature(request)
+    limit = getattr(settings, 'FACET_LIMIT', 50)
+    keys = {name: FACET_KEY % f'{queryset.model._meta.label_lower}:{name}:{signature}' for name in names}
+    cached = cache.get_many(keys.values())
+    result = {}
+    for name in names:
+        counts = cached.get(keys[name])
+        if counts is None:
+            counts = facets[name].counts(queryset, limit)
+            cache.set(keys[name], counts, getattr(settings, 'FACET_CACHE_TIMEOUT', 60))
+        result[name] = counts
+    return result
@@ -0,0 +1,18 @@
+from django_filters import rest_framework as filters
+
+from .models import Author
+
+
+class AuthorFilter(filters.FilterSet):
+    """
+    Range filters on the author statistics, e.g.
+    ?book_count_min=3&latest_year_min=2000 (each also takes _max).
+    The names are aliases of the AuthorStats columns (see AuthorListView).
+    """
+    book_count = filters.RangeFilter()
+    earliest_year = filters.RangeFilter()
+    latest_year = filters.RangeFilter()
+
+    class Meta:
+        model = Author
+        fields = ['book_count', 'earliest_year', 'latest_year']
@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from api.compression import available_encodings, compress
+from api.models import Author, Book
+from api.serializers import BookSerializer
+
+WORDS = 'the of and a to in is you that it he was for on are as with his they'.split()
+
+
+class Command(BaseCommand):
+    help = ("Compress a BookListView payload with gzip and brotli at several "
+            "levels and report bytes saved against CPU time per response.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[10, 100, 1000, 10000])
+        parser.add_argument('--levels', type=int, nargs='+', default=[1, 4, 6, 9])
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        for rows in options['rows']:
+            payload = self.payload(rows)
+            self.stdout.write(f"BookListView, {rows} books: {len(payload)} bytes")
+            for encoding in available_encodings():
+                for level in options['levels']:
+                    size, ms = self.timed(encoding, level, payload, options['repeat'])
+                    saved = 100 * (1 - size / len(payload))
+                    self.stdout.write(
+                        f"  {encoding:4} level {level:2}   {size:9} bytes   "
+                        f"saved {saved:5.1f}%   {ms:8.3f} ms   {len(payload) / ms / 1000:7.1f} MB/s"
+                    )
+
+    def timed(self, encoding, level, payload, repeat):
+        size = len(compress(encoding, level, payload))
+        start = time.perf_counter()
+        for _ in range(repeat):
+            compress(encoding, level, payload)
+        return size, (time.perf_counter() - start) / repeat * 1000
+
+    def payload(self, rows):
+        # The same JSON BookListView renders, from unsaved books.
+        authors = [Author(pk=i + 1, name=f'Author {i}') for i in range(max(rows // 20, 1))]
+        books = [
+            Book(pk=i + 1, title=' '.join(WORDS[(i * 7 + j) % len(WORDS)] for j in range(4)).title(),
+                 publication_year=1900 + i % 125, author=authors[i % len(authors)])
+            for i in range(rows)
+        ]
+        return JSONRenderer().render(BookSerializer(books, many=True).data)
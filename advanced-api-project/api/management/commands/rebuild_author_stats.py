@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from api import stats
+
+
+class Command(BaseCommand):
+    help = ("Recompute every author's book statistics in one GROUP BY pass and fix rows "
+            "that drifted (e.g. after raw SQL or QuerySet.update() on books). Run it "
+            "periodically, e.g. nightly from cron.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        created, updated = stats.rebuild(batch_size=options['batch_size'])
+        self.stdout.write(f"author stats: {created} created, {updated} corrected")
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.4 on 2026-10-19 08:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Max, Min
+
+
+def compute_stats(apps, schema_editor):
+    Author = apps.get_model('api', 'Author')
+    AuthorStats = apps.get_model('api', 'AuthorStats')
+    rows = Author.objects.annotate(
+        book_count=Count('books'), earliest_year=Min('books__publication_year'),
+        latest_year=Max('books__publication_year'),
+    ).values_list('pk', 'book_count', 'earliest_year', 'latest_year')
+    AuthorStats.objects.bulk_create(
+        (AuthorStats(author_id=pk, book_count=count, earliest_year=earliest, latest_year=latest)
+         for pk, count, earliest, latest in rows.iterator()),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_book_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='api.author')),
+                ('book_count', models.PositiveIntegerField(default=0)),
+                ('earliest_year', models.IntegerField(blank=True, null=True)),
+                ('latest_year', models.IntegerField(blank=True, null=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['book_count'], name='author_stats_count_idx'), models.Index(fields=['earliest_year'], name='author_stats_earliest_idx'), models.Index(fields=['latest_year'], name='author_stats_latest_idx')],
+            },
+        ),
+        migrations.RunPython(compute_stats, migrations.RunPython.noop),
+    ]
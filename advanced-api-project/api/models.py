@@ -8,7 +8,46 @@ class Book(models.Model):
     title = models.CharField(max_length=200)
     publication_year = models.IntegerField()
     author = models.ForeignKey(Author, on_delete=models.CASCADE, related_name='books')
-    
+
+    class Meta:
+        indexes = [
+            # Filters and facet counts on BookListView
+            models.Index(fields=['publication_year'], name='book_year_idx'),
+            models.Index(fields=['title'], name='book_title_idx'),
+            models.Index(fields=['author', 'publication_year'], name='book_author_year_idx'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # What the row held when loaded, so api.signals can tell on save which
+        # author statistics move without reading the row again.
+        loaded = dict(zip(field_names, values))
+        if 'author_id' in loaded and 'publication_year' in loaded:
+            instance._stats_key = (loaded['author_id'], loaded['publication_year'])
+        return instance
+
     def __str__(self):
         return f"{self.title} ({self.publication_year})"
-    
\ No newline at end of file
+
+
+class AuthorStats(models.Model):
+    """
+    Per-author book statistics, kept current by api.signals (see api.stats)
+    so author lists can show, sort and filter on them without aggregating.
+    """
+    author = models.OneToOneField(Author, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    book_count = models.PositiveIntegerField(default=0)
+    earliest_year = models.IntegerField(null=True, blank=True)
+    latest_year = models.IntegerField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Sorting and range filters on the author list
+            models.Index(fields=['book_count'], name='author_stats_count_idx'),
+            models.Index(fields=['earliest_year'], name='author_stats_earliest_idx'),
+            models.Index(fields=['latest_year'], name='author_stats_latest_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.author_id}: {self.book_count} books"
@@ -0,0 +1,96 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import Http404
+
+OBJECT_KEY = 'api:object:%s:%s'
+LOCK_KEY = 'api:object-lock:%s:%s'
+
+# How often a request waiting for another worker's load looks for its result.
+POLL_INTERVAL = 0.05
+
+
+def object_key(model, pk):
+    return OBJECT_KEY % (model._meta.label_lower, pk)
+
+
+def lock_key(model, pk):
+    return LOCK_KEY % (model._meta.label_lower, pk)
+
+
+def load(model, pk):
+    """
+    Read the row and cache it, or cache that it does not exist. Entries
+    outlive their freshness by OBJECT_CACHE_STALE_TIMEOUT so that, while one
+    worker reloads an expired object, the others can keep serving it.
+    """
+    obj = model._default_manager.filter(pk=pk).first()
+    if obj is not None:
+        ttl = getattr(settings, 'OBJECT_CACHE_TIMEOUT', 300)
+    else:
+        ttl = getattr(settings, 'OBJECT_CACHE_NEGATIVE_TIMEOUT', 30)
+    entry = {'object': obj, 'fresh_until': time.time() + ttl}
+    cache.set(object_key(model, pk), entry, ttl + getattr(settings, 'OBJECT_CACHE_STALE_TIMEOUT', 60))
+    return obj
+
+
+def wait_for(model, pk):
+    deadline = time.monotonic() + getattr(settings, 'OBJECT_CACHE_WAIT', 2.0)
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        entry = cache.get(object_key(model, pk))
+        if entry is not None:
+            return entry
+    return None
+
+
+def get(model, pk):
+    """
+    The model instance with this pk, or None if there is none.
+
+    Read-through with single flight: when the cached entry is missing or
+    expired, only the worker that takes the lock queries the database.
+    The others serve the expired entry if there is one, or wait for the
+    new one (and query themselves if it does not show up in time).
+    """
+    entry = cache.get(object_key(model, pk))
+    if entry is not None and entry['fresh_until'] > time.time():
+        return entry['object']
+
+    lock = lock_key(model, pk)
+    if cache.add(lock, 1, getattr(settings, 'OBJECT_CACHE_LOCK_TIMEOUT', 10)):
+        try:
+            return load(model, pk)
+        finally:
+            cache.delete(lock)
+
+    if entry is None:
+        entry = wait_for(model, pk)
+        if entry is None:
+            return model._default_manager.filter(pk=pk).first()
+    return entry['object']
+
+
+def invalidate(model, *pks):
+    keys = [object_key(model, pk) for pk in pks]
+    cache.delete_many(keys)
+    # Again after commit: a worker that read the old row before the commit
+    # may have cached it since.
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+class CachedObjectMixin:
+    """
+    For detail views: look the object up through the object cache instead
+    of querying the view's queryset on every request.
+    """
+
+    def get_object(self):
+        model = self.get_queryset().model
+        obj = get(model, self.kwargs[self.lookup_url_kwarg or self.lookup_field])
+        if obj is None:
+            raise Http404('No %s matches the given query.' % model._meta.object_name)
+        self.check_object_permissions(self.request, obj)
+        return obj
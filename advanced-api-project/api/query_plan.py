@@ -0,0 +1,130 @@
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField, RelatedField
+
+
+class QueryPlan:
+    """
+    The select_related / prefetch_related / only() calls a serializer needs,
+    worked out from its fields (see plan_for()).
+    """
+
+    def __init__(self):
+        self.select_related = set()
+        self.prefetches = []
+        self.only = set()
+
+    def apply(self, queryset):
+        if self.select_related:
+            queryset = queryset.select_related(*sorted(self.select_related))
+        if self.prefetches:
+            queryset = queryset.prefetch_related(*self.prefetches)
+        return queryset.only(*sorted(self.only))
+
+    def load_all(self, model, prefix):
+        # Used when a field may read anything on the object (methods,
+        # properties, source='*'), so nothing on this model is deferred.
+        for field in model._meta.concrete_fields:
+            self.only.add(prefix + field.name)
+
+
+def plan_for(serializer, model=None):
+    """
+    Walk a serializer's readable fields and their sources and return the
+    QueryPlan that loads everything they touch without extra queries:
+
+    - `author.name` or a nested author serializer -> select_related('author')
+      and only('author__name', ...)
+    - a nested `books` serializer (many=True) -> Prefetch('books') whose
+      queryset is planned the same way for BookSerializer
+    - primary key related fields -> only the foreign key column
+    """
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    plan = QueryPlan()
+    walk(serializer, model or serializer.Meta.model, '', plan)
+    return plan
+
+
+def walk(serializer, model, prefix, plan):
+    plan.only.add(prefix + model._meta.pk.name)
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if field.source == '*':
+            plan.load_all(model, prefix)
+            continue
+        walk_source(field, model, field.source_attrs, prefix, plan)
+
+
+def walk_source(field, model, attrs, prefix, plan):
+    for position, attr in enumerate(attrs):
+        last = position == len(attrs) - 1
+        try:
+            model_field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            # A property or method: it could use any field.
+            plan.load_all(model, prefix)
+            return
+
+        if not model_field.is_relation:
+            plan.only.add(prefix + attr)
+            return
+
+        related = model_field.related_model
+        path = prefix + attr
+        if model_field.one_to_many or model_field.many_to_many:
+            plan.prefetches.append(Prefetch(path, queryset=related_queryset(field, model_field, last)))
+            return
+
+        if model_field.concrete:
+            plan.only.add(path)
+        if last and isinstance(field, RelatedField) and field.use_pk_only_optimization():
+            # Reads the foreign key column; the related row is never loaded.
+            return
+        plan.select_related.add(path)
+        if last:
+            if isinstance(field, serializers.BaseSerializer):
+                walk(field, related, path + '__', plan)
+            else:
+                # e.g. StringRelatedField: renders the whole object.
+                plan.load_all(related, path + '__')
+            return
+        model, prefix = related, path + '__'
+
+
+def related_queryset(field, model_field, last):
+    """
+    Queryset for prefetching a collection, planned from what the field
+    renders for each member.
+    """
+    related = model_field.related_model
+    queryset = related._default_manager.all()
+    if not last:
+        return queryset
+
+    if isinstance(field, serializers.ListSerializer):
+        plan = plan_for(field.child, related)
+    elif isinstance(field, ManyRelatedField) and field.child_relation.use_pk_only_optimization():
+        plan = QueryPlan()
+        plan.only.add(related._meta.pk.name)
+    else:
+        return queryset
+
+    if model_field.one_to_many:
+        # Prefetching matches rows to their parent through this foreign key.
+        plan.only.add(model_field.field.name)
+    return plan.apply(queryset)
+
+
+class QueryPlanMixin:
+    """
+    For generic views: load what the view's serializer renders with the
+    plan from plan_for(), so adding a nested or dotted-source field to a
+    serializer cannot introduce one query per row.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        return plan_for(self.get_serializer(), queryset.model).apply(queryset)
@@ -1,14 +1,39 @@
+from django.conf import settings
 from rest_framework import serializers
+from rest_framework.reverse import reverse
+from . import objectcache
 from .models import Author, Book
 import datetime
 
+class BatchPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField that, when validating a batch (see api.bulk),
+    looks the id up in objects fetched once for the whole batch instead of
+    running one query per item. Single items go through the object cache.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        known = self.context.get('batch_related', {}).get(self.field_name)
+        obj = known.get(pk) if known is not None else objectcache.get(self.get_queryset().model, pk)
+        if obj is None:
+            self.fail('does_not_exist', pk_value=data)
+        return obj
+
+
 class BookSerializer(serializers.ModelSerializer):
     """
     Serializer for the Book model.
     - Serializes all fields of the Book model.
     - Includes a custom validator to ensure publication_year is not in the future.
     """
-     
+    author = BatchPrimaryKeyRelatedField(queryset=Author.objects.all())
+
     class Meta:
         model = Book
         fields = '__all__'  # includes: title, publication_year, author
@@ -17,21 +42,36 @@ class BookSerializer(serializers.ModelSerializer):
         """
         Custom validator for publication_year.
         Ensures the year is not greater than the current year.
+        Batches pass the current year in the context so it is computed once.
         """
 
-        current_year = datetime.datetime.now().year
+        current_year = self.context.get('current_year') or datetime.datetime.now().year
         if value > current_year:
             raise serializers.ValidationError("Publication year cannot be in the future.")
         return value
 class AuthorSerializer(serializers.ModelSerializer):
-    books = BookSerializer(many=True, read_only=True)
+    books = BookSerializer(many=True, read_only=True, source='top_books')
+    book_count = serializers.IntegerField(source='stats.book_count', read_only=True)
+    earliest_year = serializers.IntegerField(source='stats.earliest_year', read_only=True)
+    latest_year = serializers.IntegerField(source='stats.latest_year', read_only=True)
+    books_url = serializers.SerializerMethodField()
     """
     Serializer for the Author model.
-    - Serializes 'id', 'name', and a nested list of books using BookSerializer.
-    - The nested 'books' field uses the related_name from the Book model.
+    - Serializes 'id', 'name', and a nested list of the author's top books using BookSerializer.
+    - 'books' holds at most N books, prefetched into `top_books` by the author views
+      (see AuthorBooksMixin).
+    - 'book_count', 'earliest_year' and 'latest_year' are read from the author's
+      AuthorStats row (see api.stats) instead of aggregating the books.
+    - 'books_url' links to the first cursor page of the book list filtered by this author.
     - read_only=True: Books are displayed but not created through this serializer.
     """
 
     class Meta:
         model = Author
-        fields = ['id', 'name', 'books']
\ No newline at end of file
+        fields = ['id', 'name', 'books', 'book_count', 'earliest_year', 'latest_year', 'books_url']
+
+    def get_books_url(self, obj):
+        url = reverse('book-list', request=self.context.get('request'))
+        # page_size opts into cursor pages (see OptInCursorPagination), so
+        # following the link never loads a prolific author's whole list.
+        return f"{url}?author={obj.pk}&page_size={getattr(settings, 'BOOK_PAGE_SIZE', 100)}"
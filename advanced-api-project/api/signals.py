@@ -0,0 +1,46 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import objectcache, stats
+from .models import Author, Book
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_save, sender=Author)
+@receiver(post_delete, sender=Book)
+@receiver(post_delete, sender=Author)
+def invalidate_cached_object(sender, instance, **kwargs):
+    # Also on raw saves (loaddata): the cached copy would be just as stale.
+    objectcache.invalidate(sender, instance.pk)
+
+
+@receiver(post_save, sender=Author)
+def create_author_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        stats.ensure(instance.pk)
+
+
+@receiver(pre_save, sender=Book)
+def remember_book_author_and_year(sender, instance, raw=False, **kwargs):
+    # Books loaded from the database carry this from Book.from_db(); only
+    # instances built by hand around an existing pk need the row read.
+    if not raw and instance.pk is not None and not hasattr(instance, '_stats_key'):
+        instance._stats_key = (Book.objects.filter(pk=instance.pk)
+                               .values_list('author_id', 'publication_year').first())
+
+
+@receiver(post_save, sender=Book)
+def update_author_stats(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    before = getattr(instance, '_stats_key', None)
+    if created or before is None:
+        stats.book_added(instance.author_id, instance.publication_year)
+    elif before != (instance.author_id, instance.publication_year):
+        stats.refresh({before[0], instance.author_id})
+    instance._stats_key = (instance.author_id, instance.publication_year)
+
+
+@receiver(post_delete, sender=Book)
+def remove_from_author_stats(sender, instance, **kwargs):
+    stats.book_removed(instance.author_id, instance.publication_year)
@@ -0,0 +1,77 @@
+from django.db.models import Count, F, Max, Min, Value
+from django.db.models.functions import Coalesce, Greatest, Least
+
+from .models import Author, AuthorStats, Book
+
+
+def ensure(author_id):
+    AuthorStats.objects.get_or_create(author_id=author_id)
+
+
+def book_added(author_id, year):
+    # One UPDATE: the new book can only widen the year range.
+    updated = AuthorStats.objects.filter(author_id=author_id).update(
+        book_count=F('book_count') + 1,
+        earliest_year=Least(Coalesce('earliest_year', Value(year)), Value(year)),
+        latest_year=Greatest(Coalesce('latest_year', Value(year)), Value(year)),
+    )
+    if not updated:
+        # No row yet (e.g. an author loaded from a fixture): count from the books.
+        ensure(author_id)
+        refresh([author_id])
+
+
+def book_removed(author_id, year):
+    # Removing a book from inside the range only changes the count; a book at
+    # either end may move the range, so that author is recounted.
+    updated = AuthorStats.objects.filter(
+        author_id=author_id, earliest_year__lt=year, latest_year__gt=year,
+    ).update(book_count=F('book_count') - 1)
+    if not updated:
+        refresh([author_id])
+
+
+def refresh(author_ids):
+    """
+    Recompute the statistics of these authors from their books: one GROUP
+    BY over the (author, publication_year) index, then one bulk UPDATE.
+    """
+    author_ids = set(author_ids)
+    rows = {
+        row['author']: row
+        for row in Book.objects.filter(author_id__in=author_ids).order_by().values('author').annotate(
+            book_count=Count('pk'), earliest_year=Min('publication_year'), latest_year=Max('publication_year'),
+        )
+    }
+    empty = {'book_count': 0, 'earliest_year': None, 'latest_year': None}
+    refreshed = []
+    for author_id in author_ids:
+        row = rows.get(author_id, empty)
+        refreshed.append(AuthorStats(author_id=author_id, book_count=row['book_count'],
+                                     earliest_year=row['earliest_year'], latest_year=row['latest_year']))
+    # bulk_update() only updates: an author being deleted has no row left to fill in.
+    AuthorStats.objects.bulk_update(refreshed, ['book_count', 'earliest_year', 'latest_year'])
+
+
+def rebuild(batch_size=1000):
+    """
+    Recompute every author's statistics in one GROUP BY pass and write the
+    rows that differ (or are missing). Returns (created, updated).
+    """
+    current = {stats.author_id: stats for stats in AuthorStats.objects.all()}
+    rows = Author.objects.annotate(
+        book_count=Count('books'), earliest_year=Min('books__publication_year'),
+        latest_year=Max('books__publication_year'),
+    ).order_by().values_list('pk', 'book_count', 'earliest_year', 'latest_year')
+
+    missing, changed = [], []
+    for pk, count, earliest, latest in rows.iterator():
+        stats = current.get(pk)
+        if stats is None:
+            missing.append(AuthorStats(author_id=pk, book_count=count, earliest_year=earliest, latest_year=latest))
+        elif (stats.book_count, stats.earliest_year, stats.latest_year) != (count, earliest, latest):
+            stats.book_count, stats.earliest_year, stats.latest_year = count, earliest, latest
+            changed.append(stats)
+    AuthorStats.objects.bulk_create(missing, batch_size=batch_size, ignore_conflicts=True)
+    AuthorStats.objects.bulk_update(changed, ['book_count', 'earliest_year', 'latest_year'], batch_size=batch_size)
+    return len(missing), len(changed)
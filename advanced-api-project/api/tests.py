@@ -1,3 +1,484 @@
-from django.test import TestCase
+import gzip
+import json
+import unittest
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync, iscoroutinefunction
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Prefetch
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+
+from . import compression, objectcache, stats
+from .checks import check_object_cache_backend
+from .models import Author, AuthorStats, Book
+from .query_plan import plan_for
+from .serializers import BookSerializer
+
+
+class BookWithAuthorSerializer(serializers.ModelSerializer):
+    author_name = serializers.ReadOnlyField(source='author.name')
+
+    class Meta:
+        model = Book
+        fields = ['id', 'title', 'author_name']
+
+
+class FullAuthorSerializer(serializers.ModelSerializer):
+    books = BookSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Author
+        fields = ['id', 'name', 'books']
+
+
+class QueryPlanTests(TestCase):
+    def setUp(self):
+        for i in range(5):
+            author = Author.objects.create(name=f'Author {i}')
+            for year in (2001, 2002, 2003):
+                Book.objects.create(title=f'Book {i}-{year}', publication_year=year, author=author)
+
+    def test_plan_follows_nested_and_dotted_sources(self):
+        plan = plan_for(BookWithAuthorSerializer())
+        self.assertEqual(plan.select_related, {'author'})
+        self.assertEqual(plan.only, {'id', 'title', 'author', 'author__name'})
+
+        plan = plan_for(FullAuthorSerializer())
+        self.assertEqual(plan.only, {'id', 'name'})
+        self.assertEqual([prefetch.prefetch_to for prefetch in plan.prefetches], ['books'])
+        self.assertIsInstance(plan.prefetches[0], Prefetch)
+        with self.assertNumQueries(2):
+            data = FullAuthorSerializer(plan.apply(Author.objects.all()), many=True).data
+        self.assertEqual(len(data[0]['books']), 3)
+
+    def test_author_list_costs_the_same_for_any_number_of_authors(self):
+        # One query for the authors, one for all of their books.
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/authors/')
+        self.assertEqual(len(response.data), 5)
+        self.assertEqual(len(response.data[0]['books']), 3)
+        self.assertEqual(response.data[0]['book_count'], 3)
+
+        author = Author.objects.create(name='Author 5')
+        with self.assertNumQueries(2):
+            self.client.get('/api/authors/')
+        with self.assertNumQueries(2):
+            self.client.get(f'/api/authors/{author.pk}/')
+
+    def test_dotted_source_is_joined(self):
+        queryset = plan_for(BookWithAuthorSerializer()).apply(Book.objects.all())
+        with self.assertNumQueries(1):
+            data = BookWithAuthorSerializer(queryset, many=True).data
+        self.assertEqual(len(data), 15)
+        self.assertTrue(data[0]['author_name'].startswith('Author'))
+
+    def test_book_list_does_not_load_authors(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/books/')
+        self.assertEqual(response.data[0]['author'], Author.objects.get(name='Author 0').pk)
+        self.assertEqual(plan_for(BookSerializer()).select_related, set())
+
+
+class AuthorTopBooksTests(TestCase):
+    def setUp(self):
+        self.prolific = Author.objects.create(name='Prolific')
+        for year in range(1990, 2010):
+            Book.objects.create(title=f'Book {year}', publication_year=year, author=self.prolific)
+        self.quiet = Author.objects.create(name='Quiet')
+        Book.objects.create(title='Only book', publication_year=2000, author=self.quiet)
+
+    def test_embeds_top_books_with_total_and_link(self):
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/authors/', {'books_limit': 3})
+        prolific, quiet = response.data
+        self.assertEqual([book['publication_year'] for book in prolific['books']], [2009, 2008, 2007])
+        self.assertEqual(prolific['book_count'], 20)
+        self.assertEqual(prolific['books_url'], f'http://testserver/api/books/?author={self.prolific.pk}&page_size=100')
+        self.assertEqual(len(self.client.get(prolific['books_url']).data['results']), 20)
+        self.assertEqual([book['title'] for book in quiet['books']], ['Only book'])
+
+    def test_ordering_by_title_on_the_detail_endpoint(self):
+        response = self.client.get(f'/api/authors/{self.prolific.pk}/', {'books_ordering': 'title', 'books_limit': 2})
+        self.assertEqual([book['title'] for book in response.data['books']], ['Book 1990', 'Book 1991'])
+        self.assertEqual(response.data['book_count'], 20)
+
+    def test_rejects_bad_parameters(self):
+        self.assertEqual(self.client.get('/api/authors/', {'books_limit': 0}).status_code, 400)
+        self.assertEqual(self.client.get('/api/authors/', {'books_ordering': 'pages'}).status_code, 400)
+
+
+class BookFacetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.ada = Author.objects.create(name='Ada')
+        self.grace = Author.objects.create(name='Grace')
+        for title, year, author in [('A', 2001, self.ada), ('B', 2001, self.ada),
+                                    ('C', 2002, self.ada), ('D', 2001, self.grace)]:
+            Book.objects.create(title=title, publication_year=year, author=author)
+
+    def test_counts_follow_the_filters(self):
+        response = self.client.get('/api/books/', {'facets': 'publication_year,author'})
+        self.assertEqual(len(response.data['results']), 4)
+        self.assertEqual(response.data['facets']['publication_year'],
+                         [{'value': 2001, 'count': 3}, {'value': 2002, 'count': 1}])
+        self.assertEqual(response.data['facets']['author'][0],
+                         {'value': self.ada.pk, 'label': 'Ada', 'count': 3})
+
+        response = self.client.get('/api/books/', {'facets': 'author', 'publication_year': 2001})
+        self.assertEqual([row['count'] for row in response.data['facets']['author']], [2, 1])
+
+    def test_counts_are_cached_per_filter_signature(self):
+        self.client.get('/api/books/', {'facets': 'author', 'author': self.ada.pk, 'ordering': 'title'})
+        # The author filter's lookup and the results: the same filters in
+        # another order reuse the cached counts.
+        with self.assertNumQueries(2):
+            self.client.get('/api/books/', {'ordering': '-title', 'author': self.ada.pk, 'facets': 'author'})
+
+    def test_plain_list_and_unknown_facets(self):
+        self.assertIsInstance(self.client.get('/api/books/').data, list)
+        self.assertEqual(self.client.get('/api/books/', {'facets': 'pages'}).status_code, 400)
+
+
+class BulkBookTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='loader', password='pass12345')
+        self.client.force_login(self.user)
+        self.author = Author.objects.create(name='Ada')
+
+    def post(self, data, url='/api/books/'):
+        return self.client.post(url, data, content_type='application/json')
+
+    def test_creates_a_batch_with_one_insert(self):
+        books = [{'title': f'Book {i}', 'publication_year': 2000 + i, 'author': self.author.pk} for i in range(20)]
+        # session + user, the batch's authors, then one INSERT and the
+        # author's stats refresh inside a savepoint
+        with self.assertNumQueries(8), mock.patch('api.serializers.datetime') as clock:
+            clock.datetime.now.return_value.year = 2025
+            response = self.post(books)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Book.objects.count(), 20)
+        self.assertEqual(response.data['results'][3]['title'], 'Book 3')
+        # The per-item validator used the batch's year instead of asking the clock.
+        clock.datetime.now.assert_not_called()
+
+    def test_invalid_items_are_reported_and_the_rest_saved(self):
+        response = self.post([
+            {'title': 'Fine', 'publication_year': 2001, 'author': self.author.pk},
+            {'title': 'Future', 'publication_year': 3000, 'author': self.author.pk},
+            {'title': 'Orphan', 'publication_year': 2001, 'author': 999},
+        ], url='/api/books/create/')
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 2])
+        self.assertEqual(list(Book.objects.values_list('title', flat=True)), ['Fine'])
+
+    def test_atomic_mode_saves_nothing_on_error(self):
+        response = self.post([
+            {'title': 'Fine', 'publication_year': 2001, 'author': self.author.pk},
+            {'title': 'Future', 'publication_year': 3000, 'author': self.author.pk},
+        ], url='/api/books/?atomic=true')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Book.objects.exists())
+
+    def test_partial_update_of_a_batch(self):
+        first = Book.objects.create(title='One', publication_year=2001, author=self.author)
+        second = Book.objects.create(title='Two', publication_year=2002, author=self.author)
+        response = self.client.patch('/api/books/update/', [
+            {'id': first.pk, 'title': 'One, revised'},
+            {'id': second.pk, 'publication_year': 2003},
+            {'id': 12345, 'title': 'Missing'},
+        ], content_type='application/json')
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual(response.data['errors'][0]['index'], 2)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.title, second.publication_year), ('One, revised', 2003))
+
+    def test_malformed_ids_are_item_errors(self):
+        book = Book.objects.create(title='One', publication_year=2001, author=self.author)
+        response = self.client.patch('/api/books/update/', [
+            {'id': 'abc', 'title': 'Text id'},
+            {'id': [book.pk], 'title': 'List id'},
+            {'id': str(book.pk), 'title': 'One, revised'},
+        ], content_type='application/json')
+        self.assertEqual(response.status_code, 207)
+        self.assertEqual([(error['index'], list(error['errors'])) for error in response.data['errors']],
+                         [(0, ['id']), (1, ['id'])])
+        book.refresh_from_db()
+        self.assertEqual(book.title, 'One, revised')
+
+    def test_updates_only_reach_the_views_queryset(self):
+        book = Book.objects.create(title='One', publication_year=2001, author=self.author)
+        with mock.patch('api.views.BookUpdateView.queryset', Book.objects.exclude(pk=book.pk)):
+            response = self.client.patch('/api/books/update/', [{'id': book.pk, 'title': 'Hidden'}],
+                                         content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        book.refresh_from_db()
+        self.assertEqual(book.title, 'One')
+
+
+@override_settings(STREAM_CHUNK_SIZE=3, BOOK_PAGE_SIZE=4)
+class LargeBookListTests(TestCase):
+    def setUp(self):
+        author = Author.objects.create(name='Ada')
+        for i in range(10):
+            Book.objects.create(title=f'Book {i:02}', publication_year=2000 + i, author=author)
+
+    def test_plain_list_keeps_its_shape(self):
+        response = self.client.get('/api/books/')
+        self.assertIsInstance(response.data, list)
+        self.assertEqual(len(response.data), 10)
+
+    def test_stream_matches_the_plain_list(self):
+        plain = self.client.get('/api/books/', {'ordering': '-publication_year'})
+        streamed = self.client.get('/api/books/', {'ordering': '-publication_year', 'stream': 'true'})
+        self.assertTrue(streamed.streaming)
+        self.assertEqual(streamed['Content-Type'], 'application/json')
+        self.assertEqual(json.loads(b''.join(streamed.streaming_content)), json.loads(plain.content))
+
+    def test_stream_of_an_empty_list(self):
+        streamed = self.client.get('/api/books/', {'stream': 'true', 'publication_year': 1900})
+        self.assertEqual(b''.join(streamed.streaming_content), b'[]')
+
+    def test_cursor_pages_cover_every_book_once(self):
+        titles, url = [], '/api/books/?page_size=4'
+        while url:
+            data = self.client.get(url).data
+            titles += [book['title'] for book in data['results']]
+            url = data['next']
+        self.assertEqual(titles, [f'Book {i:02}' for i in range(10)])
+
+
+class CompressionTests(TestCase):
+    def setUp(self):
+        author = Author.objects.create(name='Ada')
+        for i in range(30):
+            Book.objects.create(title=f'Book number {i}', publication_year=2000, author=author)
+
+    def test_negotiation(self):
+        self.assertEqual(compression.negotiate('gzip, deflate', ('br', 'gzip')), 'gzip')
+        self.assertEqual(compression.negotiate('gzip;q=1, br;q=0.5', ('br', 'gzip')), 'gzip')
+        self.assertEqual(compression.negotiate('br, gzip', ('br', 'gzip')), 'br')
+        self.assertEqual(compression.negotiate('*', ('br', 'gzip')), 'br')
+        self.assertEqual(compression.negotiate('gzip;q=0, identity', ('br', 'gzip')), None)
+        self.assertEqual(compression.negotiate('', ('br', 'gzip')), None)
+
+    def test_gzip_list(self):
+        plain = self.client.get('/api/books/')
+        response = self.client.get('/api/books/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+
+    @unittest.skipIf(compression.brotli is None, 'Brotli is not installed')
+    def test_brotli_stream(self):
+        plain = self.client.get('/api/books/', {'stream': 'true'})
+        response = self.client.get('/api/books/', {'stream': 'true'}, HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(compression.brotli.decompress(b''.join(response.streaming_content)),
+                         b''.join(plain.streaming_content))
+
+    def test_small_bodies_and_disabled_routes_are_not_compressed(self):
+        response = self.client.get('/api/books/?publication_year=1900', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', response['Vary'])
+        with self.settings(COMPRESSION_ROUTE_LEVELS={'book-list': {'gzip': 0}}):
+            response = self.client.get('/api/books/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def compressed(self, response):
+        middleware = compression.CompressionMiddleware(lambda request: response)
+        return middleware(RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip'))
+
+    def test_event_streams_and_no_transform_responses_are_left_alone(self):
+        body = b'data: x\n\n' * 200
+        response = self.compressed(StreamingHttpResponse([body], content_type='text/event-stream'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(b''.join(response.streaming_content), body)
+
+        response = HttpResponse(b'x' * 2000, content_type='text/html')
+        response['Cache-Control'] = 'public, no-transform'
+        self.assertFalse(self.compressed(response).has_header('Content-Encoding'))
+
+    def test_runs_in_async_stacks_without_a_thread_hop(self):
+        async def get_response(request):
+            return HttpResponse(b'x' * 2000, content_type='text/html')
+
+        middleware = compression.CompressionMiddleware(get_response)
+        self.assertTrue(iscoroutinefunction(middleware))
+        response = async_to_sync(middleware)(RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip'))
+        self.assertEqual(gzip.decompress(response.content), b'x' * 2000)
+
+
+class ObjectCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = Author.objects.create(name='Ada')
+        self.book = Book.objects.create(title='Notes', publication_year=1843, author=self.author)
+        self.url = f'/api/books/{self.book.pk}/'
+
+    def test_detail_is_served_from_cache_until_the_book_changes(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(self.url).data['title'], 'Notes')
+        self.book.title = 'Notes, revised'
+        self.book.save()
+        self.assertEqual(self.client.get(self.url).data['title'], 'Notes, revised')
+        self.book.delete()
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_missing_ids_are_cached_until_created(self):
+        missing = self.book.pk + 1
+        self.assertEqual(self.client.get(f'/api/books/{missing}/').status_code, 404)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(f'/api/books/{missing}/').status_code, 404)
+        Book.objects.create(pk=missing, title='Later', publication_year=1900, author=self.author)
+        self.assertEqual(self.client.get(f'/api/books/{missing}/').data['title'], 'Later')
+
+    def test_expired_entry_is_served_while_another_worker_reloads(self):
+        objectcache.get(Book, self.book.pk)
+        key = objectcache.object_key(Book, self.book.pk)
+        cache.set(key, {**cache.get(key), 'fresh_until': 0})
+        cache.add(objectcache.lock_key(Book, self.book.pk), 1)
+        with self.assertNumQueries(0):
+            self.assertEqual(objectcache.get(Book, self.book.pk).title, 'Notes')
+
+    @override_settings(OBJECT_CACHE_WAIT=0.1)
+    def test_waiter_falls_back_to_the_database(self):
+        cache.add(objectcache.lock_key(Book, self.book.pk), 1)
+        with self.assertNumQueries(1):
+            self.assertEqual(objectcache.get(Book, self.book.pk), self.book)
+
+    def test_author_lookups_and_bulk_updates(self):
+        user = User.objects.create_user(username='loader', password='pass12345')
+        self.client.force_login(user)
+        objectcache.get(Author, self.author.pk)
+        with mock.patch.object(objectcache, 'load') as load:
+            self.client.post('/api/books/', {'title': 'B', 'publication_year': 1840, 'author': self.author.pk},
+                             content_type='application/json')
+        load.assert_not_called()
+
+        self.client.get(self.url)
+        self.client.patch('/api/books/update/', [{'id': self.book.pk, 'title': 'Bulk'}],
+                          content_type='application/json')
+        self.assertEqual(self.client.get(self.url).data['title'], 'Bulk')
+
+    def test_deploy_check_requires_a_shared_cache(self):
+        self.assertEqual([error.id for error in check_object_cache_backend(None)], ['api.E001'])
+        redis = {'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache'}}
+        with self.settings(CACHES=redis):
+            self.assertEqual(check_object_cache_backend(None), [])
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.author = Author.objects.create(name='Ada')
+        for i in range(3):
+            Book.objects.create(title=f'Book {i}', publication_year=2000 + i, author=self.author)
+
+    def test_fields_trim_the_response_and_the_select(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/books/', {'fields': 'id,title'})
+        self.assertEqual([set(book) for book in response.data], [{'id', 'title'}] * 3)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('publication_year', queries[0]['sql'].split(' FROM ')[0])
+
+    def test_exclude_and_unknown_fields(self):
+        response = self.client.get('/api/books/', {'exclude': 'author'})
+        self.assertEqual(set(response.data[0]), {'id', 'title', 'publication_year'})
+        self.assertEqual(self.client.get('/api/books/', {'fields': 'id,isbn'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/books/', {'fields': ''}).status_code, 400)
+
+    def test_streamed_and_cursor_pages_are_trimmed_too(self):
+        streamed = self.client.get('/api/books/', {'fields': 'title', 'stream': 'true'})
+        self.assertEqual(json.loads(b''.join(streamed.streaming_content))[0], {'title': 'Book 0'})
+        with self.assertNumQueries(1):
+            page = self.client.get('/api/books/', {'fields': 'id', 'page_size': 2}).data
+        self.assertEqual(page['results'], [{'id': book.pk} for book in Book.objects.order_by('title')[:2]])
+        self.assertEqual(len(self.client.get(page['next']).data['results']), 1)
+
+    def test_authors_without_books_skip_the_prefetch(self):
+        with self.assertNumQueries(1):
+            response = self.client.get('/api/authors/', {'fields': 'id,name'})
+        self.assertEqual(response.data, [{'id': self.author.pk, 'name': 'Ada'}])
+
+    def test_writes_are_not_trimmed(self):
+        self.client.force_login(User.objects.create_user(username='writer', password='pass12345'))
+        response = self.client.post('/api/books/?fields=id', {'title': 'New', 'publication_year': 2001},
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('author', response.data)
+
+
+class AuthorStatsTests(TestCase):
+    def setUp(self):
+        self.ada = Author.objects.create(name='Ada')
+        self.bo = Author.objects.create(name='Bo')
+        self.books = [Book.objects.create(title=f'A{year}', publication_year=year, author=self.ada)
+                      for year in (1990, 2000, 2010)]
+
+    def stats_of(self, author):
+        row = AuthorStats.objects.get(author=author)
+        return row.book_count, row.earliest_year, row.latest_year
+
+    def test_signals_keep_the_stats_current(self):
+        self.assertEqual(self.stats_of(self.ada), (3, 1990, 2010))
+        self.assertEqual(self.stats_of(self.bo), (0, None, None))
+        self.books[1].delete()
+        self.assertEqual(self.stats_of(self.ada), (2, 1990, 2010))
+        self.books[0].delete()
+        self.assertEqual(self.stats_of(self.ada), (1, 2010, 2010))
+        self.books[2].author = self.bo
+        self.books[2].save()
+        self.assertEqual(self.stats_of(self.ada), (0, None, None))
+        self.assertEqual(self.stats_of(self.bo), (1, 2010, 2010))
+
+    def test_saves_compare_against_the_loaded_row(self):
+        book = Book.objects.get(pk=self.books[0].pk)
+        with self.assertNumQueries(1):  # the UPDATE, no re-read of the row
+            book.title = 'Renamed'
+            book.save()
+        with self.assertNumQueries(3):  # the UPDATE, one GROUP BY, one bulk UPDATE
+            book.author = self.bo
+            book.save()
+        self.assertEqual(self.stats_of(self.ada), (2, 2000, 2010))
+        self.assertEqual(self.stats_of(self.bo), (1, 1990, 1990))
+
+    def test_first_book_of_an_author_without_stats(self):
+        AuthorStats.objects.filter(author=self.ada).delete()
+        Book.objects.create(title='A2020', publication_year=2020, author=self.ada)
+        self.assertEqual(self.stats_of(self.ada), (4, 1990, 2020))
+
+    def test_bulk_writes_refresh_the_stats(self):
+        self.client.force_login(User.objects.create_user(username='loader', password='pass12345'))
+        self.client.post('/api/books/', [{'title': 'B', 'publication_year': 1980, 'author': self.bo.pk}],
+                         content_type='application/json')
+        self.client.patch('/api/books/update/', [{'id': self.books[0].pk, 'author': self.bo.pk}],
+                          content_type='application/json')
+        self.assertEqual(self.stats_of(self.ada), (2, 2000, 2010))
+        self.assertEqual(self.stats_of(self.bo), (2, 1980, 1990))
+
+    def test_rebuild_repairs_drift(self):
+        AuthorStats.objects.filter(author=self.ada).update(book_count=99)
+        AuthorStats.objects.filter(author=self.bo).delete()
+        with self.assertNumQueries(4):  # read stats, one GROUP BY, insert, update
+            self.assertEqual(stats.rebuild(), (1, 1))
+        self.assertEqual(self.stats_of(self.ada), (3, 1990, 2010))
+        self.assertEqual(self.stats_of(self.bo), (0, None, None))
+
+    def test_author_list_sorts_and_filters_on_the_stats(self):
+        response = self.client.get('/api/authors/', {'ordering': '-book_count', 'fields': 'name,book_count'})
+        self.assertEqual(response.data, [{'name': 'Ada', 'book_count': 3}, {'name': 'Bo', 'book_count': 0}])
+        response = self.client.get('/api/authors/', {'book_count_min': 1, 'latest_year_max': 2010})
+        self.assertEqual([author['name'] for author in response.data], ['Ada'])
+        self.assertEqual((response.data[0]['earliest_year'], response.data[0]['latest_year']), (1990, 2010))
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get('/api/authors/', {'ordering': 'latest_year', 'fields': 'id'})
+        self.assertNotIn('COUNT(', queries[0]['sql'])
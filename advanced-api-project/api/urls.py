@@ -5,6 +5,8 @@ from .views import (
     BookCreateView,
     BookUpdateView,
     BookDeleteView,
+    AuthorListView,
+    AuthorDetailView,
 )
 urlpatterns = [
     path('books/', BookListView.as_view(), name='book-list'),              # GET, POST
@@ -12,4 +14,6 @@ urlpatterns = [
     path('books/<int:pk>/', BookDetailView.as_view(), name='book-detail'),# GET
     path('books/update/', BookUpdateView.as_view(), name='book-update'),  # PUT (Checker wants this)
     path('books/delete/', BookDeleteView.as_view(), name='book-delete'),  # DELETE (Checker wants this)
+    path('authors/', AuthorListView.as_view(), name='author-list'),          # GET
+    path('authors/<int:pk>/', AuthorDetailView.as_view(), name='author-detail'),  # GET
 ]
\ No newline at end of file
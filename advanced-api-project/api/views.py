@@ -1,14 +1,34 @@
 from django.shortcuts import render
 from rest_framework import generics, filters
-from .models import Book
-from .serializers import BookSerializer
+from .models import Author, Book
+from .bulk import BulkWriteMixin
+from .objectcache import CachedObjectMixin
+from .fieldsets import SparseFieldsMixin
+from . import stats
+from .filters import AuthorFilter
+from .facets import Facet, facet_counts, parse_facets
+from .query_plan import QueryPlanMixin, plan_for
+from .streaming import OptInCursorPagination, StreamingListMixin, wants_stream
+from rest_framework.response import Response
+from .serializers import AuthorSerializer, BookSerializer
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter,OrderingFilter
 from django_filters import rest_framework
+from django.conf import settings
+from django.db.models import F, Prefetch
+from rest_framework.exceptions import ValidationError
+
+class BookBulkWriteMixin(BulkWriteMixin):
+    bulk_related_fields = ['author']
+
+    def bulk_written(self, objects, originals):
+        # api.signals keeps the author stats current for single saves only.
+        stats.refresh({book.author_id for book in [*objects, *originals]})
+
 
 # This List all books
-class BookListView(generics.ListCreateAPIView):
+class BookListView(SparseFieldsMixin, QueryPlanMixin, BookBulkWriteMixin, StreamingListMixin, generics.ListCreateAPIView):
     """
     API view to retrieve list of books or create a new book.
 
@@ -21,6 +41,17 @@ class BookListView(generics.ListCreateAPIView):
     - /api/books/?title=Happiness
     - /api/books/?search=Fatherhood
     - /api/books/?ordering=-publication_year
+    - /api/books/?author=3&facets=publication_year,author
+    - /api/books/?fields=id,title (or ?exclude=author): only these fields and columns
+
+    POSTing a list creates the books in bulk (see BulkWriteMixin).
+
+    With ?facets= the response becomes {"results": [...], "facets": {...}},
+    where each facet lists match counts per value of that field.
+
+    Large lists:
+    - /api/books/?stream=true streams the same JSON array (see StreamingListMixin)
+    - /api/books/?page_size=100 returns cursor pages; follow "next" for the rest
     """
     queryset = Book.objects.all()
     serializer_class = BookSerializer
@@ -42,25 +73,70 @@ class BookListView(generics.ListCreateAPIView):
      # Orderable fields
     ordering_fields = ['title', 'publication_year']
 
-    ordering = ['title']
-# This Retrieve a single book by ID
-class BookDetailView(generics.RetrieveAPIView):
+    # id breaks ties between equal titles so cursor pages never skip a book
+    ordering = ['title', 'id']
+
+    pagination_class = OptInCursorPagination
+
+    # Facets clients can ask for with ?facets=
+    facets = {
+        'publication_year': Facet('publication_year'),
+        'author': Facet('author', label='author__name'),
+    }
+
+
+    def create(self, request, *args, **kwargs):
+        if isinstance(request.data, list):
+            return self.bulk_create(request)
+        return super().create(request, *args, **kwargs)
+
+    def list(self, request, *args, **kwargs):
+        names = parse_facets(request, self.facets)
+        if not names:
+            if wants_stream(request):
+                return self.stream_list(self.filter_queryset(self.get_queryset()))
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        counts = facet_counts(request, queryset, self.facets, names)
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            response = self.get_paginated_response(self.get_serializer(page, many=True).data)
+            response.data['facets'] = counts
+            return response
+        return Response({'results': self.get_serializer(queryset, many=True).data, 'facets': counts})
+
+
+# This Retrieve a single book by ID, through the object cache
+# (?fields= trims the response; the cached book itself is loaded whole)
+class BookDetailView(SparseFieldsMixin, CachedObjectMixin, QueryPlanMixin, generics.RetrieveAPIView):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
-# This Create a new book
-class BookCreateView(generics.CreateAPIView):
+# This Create a new book, or many at once when given a list
+class BookCreateView(BookBulkWriteMixin, generics.CreateAPIView):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
-# This Update an existing book
-class BookUpdateView(generics.UpdateAPIView):
+    def create(self, request, *args, **kwargs):
+        if isinstance(request.data, list):
+            return self.bulk_create(request)
+        return super().create(request, *args, **kwargs)
+
+# This Update an existing book, or many at once when given a list of
+# objects with their "id" (PATCH for partial updates)
+class BookUpdateView(BookBulkWriteMixin, generics.UpdateAPIView):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
+    def update(self, request, *args, **kwargs):
+        if isinstance(request.data, list):
+            return self.bulk_update(request, partial=kwargs.get('partial', False))
+        return super().update(request, *args, **kwargs)
+
 
 # And this Delete a book
 class BookDeleteView(generics.DestroyAPIView):
@@ -69,4 +145,88 @@ class BookDeleteView(generics.DestroyAPIView):
     permission_classes = [IsAuthenticatedOrReadOnly]
 
 
+# Orderings allowed for the books embedded in an author (?books_ordering=)
+TOP_BOOKS_ORDERINGS = {
+    '-publication_year': ['-publication_year', 'title', 'id'],
+    'publication_year': ['publication_year', 'title', 'id'],
+    'title': ['title', 'id'],
+    '-title': ['-title', '-id'],
+}
 
+
+class AuthorBooksMixin(QueryPlanMixin):
+    """
+    Embeds only the top N books of each author.
+
+    The books of the whole page of authors come from a single query: Django
+    turns the sliced Prefetch into ROW_NUMBER() OVER (PARTITION BY author_id)
+    and keeps the first N rows per author. book_count and the year range come
+    from AuthorStats, joined by the query plan.
+
+    Query parameters:
+    - books_limit: books per author (default AUTHOR_TOP_BOOKS, at most AUTHOR_TOP_BOOKS_MAX)
+    - books_ordering: -publication_year (default), publication_year, title or -title
+    """
+
+    def get_books_limit(self):
+        default = getattr(settings, 'AUTHOR_TOP_BOOKS', 5)
+        maximum = getattr(settings, 'AUTHOR_TOP_BOOKS_MAX', 50)
+        value = self.request.query_params.get('books_limit', default)
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            raise ValidationError({'books_limit': 'Must be a number.'})
+        if not 1 <= value <= maximum:
+            raise ValidationError({'books_limit': f'Must be between 1 and {maximum}.'})
+        return value
+
+    def get_books_ordering(self):
+        value = self.request.query_params.get('books_ordering', '-publication_year')
+        if value not in TOP_BOOKS_ORDERINGS:
+            raise ValidationError({'books_ordering': f'Choose one of: {", ".join(TOP_BOOKS_ORDERINGS)}.'})
+        return TOP_BOOKS_ORDERINGS[value]
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        # Not needed when ?fields= / ?exclude= leaves the books out.
+        if 'books' in self.get_serializer().fields:
+            books = plan_for(BookSerializer()).apply(Book.objects.all())
+            books = books.order_by(*self.get_books_ordering())[:self.get_books_limit()]
+            queryset = queryset.prefetch_related(Prefetch('books', queryset=books, to_attr='top_books'))
+        return queryset
+
+
+# List authors with their top books
+class AuthorListView(SparseFieldsMixin, AuthorBooksMixin, generics.ListAPIView):
+    """
+    API view to list authors with their top books.
+
+    Example queries:
+    - /api/authors/?books_limit=3
+    - /api/authors/?books_ordering=title
+    - /api/authors/?ordering=-book_count
+    - /api/authors/?book_count_min=3&latest_year_min=2000
+    """
+    queryset = Author.objects.all()
+    serializer_class = AuthorSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
+    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    filterset_class = AuthorFilter
+    search_fields = ['name']
+    ordering_fields = ['name', 'book_count', 'earliest_year', 'latest_year']
+    ordering = ['name']
+
+    def get_queryset(self):
+        # Names for the indexed AuthorStats columns in ?ordering= and the filters.
+        return super().get_queryset().alias(
+            book_count=F('stats__book_count'),
+            earliest_year=F('stats__earliest_year'),
+            latest_year=F('stats__latest_year'),
+        )
+
+
+# Retrieve a single author with their top books
+class AuthorDetailView(SparseFieldsMixin, AuthorBooksMixin, generics.RetrieveAPIView):
+    queryset = Author.objects.all()
+    serializer_class = AuthorSerializer
+    permission_classes = [IsAuthenticatedOrReadOnly]
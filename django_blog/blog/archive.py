@@ -0,0 +1,104 @@
+# blog/archive.py
+import datetime
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .models import MonthlyPostCount, Post
+
+SIDEBAR_KEY = 'blog:archive:sidebar'
+
+
+class ArchiveMonth(NamedTuple):
+    year: int
+    month: int
+    count: int
+
+    @property
+    def date(self):
+        return datetime.date(self.year, self.month, 1)
+
+
+def month_bounds(year, month):
+    start = datetime.datetime(year, month, 1)
+    end = datetime.datetime(year + month // 12, month % 12 + 1, 1)
+    if settings.USE_TZ:
+        start, end = timezone.make_aware(start), timezone.make_aware(end)
+    return start, end
+
+
+def published_in(start, end):
+    # Served by post_status_date_idx.
+    return Post.objects.filter(status='published', published_date__gte=start, published_date__lt=end)
+
+
+def local_month(published):
+    if settings.USE_TZ:
+        published = timezone.localtime(published)
+    return published.year, published.month
+
+
+def recount_month(year, month):
+    """
+    Recount one month's published posts and store the result. Counting the
+    month again (an index range scan) instead of adding or subtracting one
+    means callers don't need to know what the post looked like before.
+    Returns True if the stored count changed.
+    """
+    count = published_in(*month_bounds(year, month)).count()
+    stored = MonthlyPostCount.objects.filter(year=year, month=month).first()
+    if (stored.count if stored else 0) == count:
+        return False
+    if count:
+        MonthlyPostCount.objects.update_or_create(year=year, month=month, defaults={'count': count})
+    else:
+        stored.delete()
+    transaction.on_commit(invalidate)
+    return True
+
+
+def sync_post(post):
+    return recount_month(*local_month(post.published_date))
+
+
+def rebuild():
+    """
+    Recompute every month from scratch.
+    """
+    counts = {}
+    dates = Post.objects.filter(status='published').values_list('published_date', flat=True)
+    for published in dates.iterator():
+        month = local_month(published)
+        counts[month] = counts.get(month, 0) + 1
+    with transaction.atomic():
+        MonthlyPostCount.objects.all().delete()
+        MonthlyPostCount.objects.bulk_create(
+            MonthlyPostCount(year=year, month=month, count=count)
+            for (year, month), count in counts.items()
+        )
+    transaction.on_commit(invalidate)
+
+
+def sidebar_months():
+    """
+    The most recent months with published posts, cached until the next change.
+    """
+    months = cache.get(SIDEBAR_KEY)
+    if months is None:
+        limit = getattr(settings, 'BLOG_ARCHIVE_SIDEBAR_MONTHS', 12)
+        months = [ArchiveMonth(*row) for row in
+                  MonthlyPostCount.objects.values_list('year', 'month', 'count')[:limit]]
+        cache.set(SIDEBAR_KEY, months, None)
+    return months
+
+
+def year_months(year):
+    return [ArchiveMonth(*row) for row in
+            MonthlyPostCount.objects.filter(year=year).values_list('year', 'month', 'count')]
+
+
+def invalidate():
+    cache.delete(SIDEBAR_KEY)
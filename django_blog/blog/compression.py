@@ -0,0 +1,187 @@
+# Each project that compresses responses (advanced-api-project, social_media_api,
+# django_blog) is deployed on its own and carries this same module; change
+# the copies together.
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:  # Brotli is optional; without it only gzip is offered.
+    brotli = None
+
+DEFAULT_TYPES = (
+    'text/', 'application/json', 'application/xml', 'application/javascript',
+    'application/rss+xml', 'application/atom+xml', 'image/svg+xml',
+)
+# Server-sent events: EventSource clients and proxies in between expect them as is.
+EXCLUDED_TYPES = ('text/event-stream',)
+DEFAULT_LEVELS = {'br': 4, 'gzip': 6}
+
+
+def available_encodings():
+    # In order of preference when the client accepts several equally.
+    return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+
+def negotiate(accept_encoding, encodings=None):
+    """
+    Pick 'br', 'gzip' or None (identity) from an Accept-Encoding header,
+    honouring q-values and '*'.
+    """
+    encodings = encodings or available_encodings()
+    weights = {}
+    for part in accept_encoding.split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[name] = q
+
+    best, best_q = None, 0.0
+    for encoding in encodings:
+        q = weights.get(encoding, weights.get('*', 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class GzipStream:
+    def __init__(self, level):
+        # wbits 31: zlib stream with a gzip header and trailer.
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        # Sync flush so every chunk reaches the client as soon as it is produced.
+        return self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self.compressor.flush(zlib.Z_FINISH)
+
+
+class BrotliStream:
+    def __init__(self, level):
+        self.compressor = brotli.Compressor(quality=level)
+
+    def compress(self, data):
+        return self.compressor.process(data) + self.compressor.flush()
+
+    def finish(self):
+        return self.compressor.finish()
+
+
+STREAMS = {'gzip': GzipStream, 'br': BrotliStream}
+
+
+def compress(encoding, level, content):
+    stream = STREAMS[encoding](level)
+    return stream.compress(content) + stream.finish()
+
+
+def compress_chunks(encoding, level, chunks):
+    stream = STREAMS[encoding](level)
+    for chunk in chunks:
+        data = stream.compress(chunk)
+        if data:
+            yield data
+    yield stream.finish()
+
+
+async def compress_chunks_async(encoding, level, chunks):
+    stream = STREAMS[encoding](level)
+    async for chunk in chunks:
+        data = stream.compress(chunk)
+        if data:
+            yield data
+    yield stream.finish()
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """
+    Compresses responses with br or gzip, whichever the client prefers.
+
+    Settings:
+    - COMPRESSION_MIN_SIZE: smaller bodies are sent as they are (the header
+      and CPU overhead outweigh the savings)
+    - COMPRESSION_TYPES: content type prefixes worth compressing
+      (text/event-stream never is)
+    - COMPRESSION_LEVELS: {'br': 4, 'gzip': 6}
+    - COMPRESSION_ROUTE_LEVELS: per URL name overrides, e.g.
+      {'<url name>': {'br': 5}}; a level of 0 turns compression off there
+    - COMPRESSION_SKIP_AUTHENTICATED: leave responses to logged-in users
+      alone, for sites whose pages mix their secrets with reflected input
+      (BREACH)
+
+    Streaming responses are compressed chunk by chunk as they are sent.
+    Responses marked Cache-Control: no-transform are left alone.
+    """
+
+    def content_type_allowed(self, response):
+        content_type = response.get('Content-Type', '').split(';')[0].strip().lower()
+        if content_type in EXCLUDED_TYPES:
+            return False
+        types = getattr(settings, 'COMPRESSION_TYPES', DEFAULT_TYPES)
+        return any(content_type.startswith(prefix) for prefix in types)
+
+    def skipped(self, request, response):
+        if response.has_header('Content-Encoding') or not self.content_type_allowed(response):
+            return True
+        if 'no-transform' in response.get('Cache-Control', '').lower():
+            return True
+        user = getattr(request, 'user', None)
+        return bool(getattr(settings, 'COMPRESSION_SKIP_AUTHENTICATED', False)
+                    and user is not None and user.is_authenticated)
+
+    def route_level(self, request, encoding):
+        levels = {**DEFAULT_LEVELS, **getattr(settings, 'COMPRESSION_LEVELS', {})}
+        match = getattr(request, 'resolver_match', None)
+        if match is not None and match.view_name:
+            routes = getattr(settings, 'COMPRESSION_ROUTE_LEVELS', {})
+            levels.update(routes.get(match.view_name, {}))
+        return levels[encoding]
+
+    def process_response(self, request, response):
+        if self.skipped(request, response):
+            return response
+        # The body differs by Accept-Encoding from here on, compressed or not.
+        patch_vary_headers(response, ('Accept-Encoding',))
+
+        if not response.streaming and len(response.content) < getattr(settings, 'COMPRESSION_MIN_SIZE', 860):
+            return response
+        encoding = negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+        level = self.route_level(request, encoding)
+        if not level:
+            return response
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = compress_chunks_async(encoding, level, response.streaming_content)
+            else:
+                response.streaming_content = compress_chunks(encoding, level, response.streaming_content)
+            # The compressed length is unknown until the stream ends.
+            del response.headers['Content-Length']
+        else:
+            compressed = compress(encoding, level, response.content)
+            if len(compressed) >= len(response.content):
+                return response
+            response.content = compressed
+            response.headers['Content-Length'] = str(len(compressed))
+
+        # The same strong ETag must not name two different byte sequences.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = encoding
+        return response
@@ -0,0 +1,9 @@
+# blog/context_processors.py
+from django.utils.functional import SimpleLazyObject
+
+from . import archive
+
+
+def archive_sidebar(request):
+    # Lazy, so pages that don't show the sidebar don't touch the cache.
+    return {'archive_months': SimpleLazyObject(archive.sidebar_months)}
@@ -0,0 +1,141 @@
+# blog/feeds.py
+import hashlib
+import time
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import http_date, quote_etag
+
+from . import pagecache
+from .models import Post, Tag
+
+FEED_KEY = 'blog:feed:%s'
+
+# Every change to a post or tag already purges this (blog.signals).
+FEED_DEPENDENCIES = ['post-list']
+
+
+def feed_size():
+    return getattr(settings, 'BLOG_FEED_ITEMS', 20)
+
+
+class LatestPostsFeed(Feed):
+    title = 'Django Blog'
+    description = 'Latest posts on Django Blog.'
+
+    def link(self):
+        return reverse('post_list')
+
+    def items(self):
+        return (Post.objects.filter(status='published')
+                .select_related('author')
+                .only('pk', 'title', 'excerpt', 'published_date', 'author__username')
+                .order_by('-published_date', '-id')[:feed_size()])
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.excerpt
+
+    def item_pubdate(self, item):
+        return item.published_date
+
+    def item_author_name(self, item):
+        return item.author.username
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
+
+
+class TagFeed(LatestPostsFeed):
+    def get_object(self, request, tag_name):
+        return get_object_or_404(Tag, name=tag_name)
+
+    def title(self, tag):
+        return f'Django Blog: posts tagged "{tag.name}"'
+
+    def description(self, tag):
+        return f'Latest posts tagged "{tag.name}" on Django Blog.'
+
+    def link(self, tag):
+        return reverse('posts-by-tag', kwargs={'tag_name': tag.name})
+
+    def items(self, tag):
+        # Read through the precomputed tag index (blog.tagindex).
+        return (Post.objects.filter(tag_entries__tag=tag)
+                .select_related('author')
+                .only('pk', 'title', 'excerpt', 'published_date', 'author__username')
+                .order_by('-tag_entries__published_date', '-tag_entries__post')[:feed_size()])
+
+
+class TagAtomFeed(TagFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, tag):
+        return self.description(tag)
+
+
+def feed_key(request):
+    # Links in the feed are absolute, so the host is part of the key.
+    location = f'{request.get_host()}{request.path}'
+    return FEED_KEY % hashlib.md5(location.encode(), usedforsecurity=False).hexdigest()
+
+
+def build_entry(feed, request, versions, **kwargs):
+    response = feed(request, **kwargs)
+    content = response.content
+    return {
+        'versions': versions,
+        'content': content,
+        'content_type': response['Content-Type'],
+        'etag': quote_etag(hashlib.md5(content, usedforsecurity=False).hexdigest()),
+        'last_modified': int(time.time()),
+    }
+
+
+def cached_feed(feed_class):
+    """
+    Serve a feed from bytes rendered once per content change.
+
+    The rendered feed is stored with its ETag and generation time and reused
+    until blog.signals purges FEED_DEPENDENCIES. Conditional requests from
+    feed readers are then answered with a 304 without touching the database.
+    """
+    feed = feed_class()
+
+    def view(request, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return HttpResponse(status=405, headers={'Allow': 'GET, HEAD'})
+        key = feed_key(request)
+        versions = pagecache.dependency_versions(FEED_DEPENDENCIES)
+        entry = cache.get(key)
+        if entry is None or entry['versions'] != versions:
+            entry = build_entry(feed, request, versions, **kwargs)
+            cache.set(key, entry, getattr(settings, 'BLOG_FEED_CACHE_TIMEOUT', 3600))
+
+        response = get_conditional_response(
+            request, etag=entry['etag'], last_modified=entry['last_modified'],
+        )
+        if response is None:
+            response = HttpResponse(entry['content'], content_type=entry['content_type'])
+        response['ETag'] = entry['etag']
+        response['Last-Modified'] = http_date(entry['last_modified'])
+        patch_cache_control(response, public=True, max_age=getattr(settings, 'BLOG_FEED_MAX_AGE', 300))
+        return response
+
+    return view
+
+
+latest_posts_rss = cached_feed(LatestPostsFeed)
+latest_posts_atom = cached_feed(LatestPostsAtomFeed)
+tag_posts_rss = cached_feed(TagFeed)
+tag_posts_atom = cached_feed(TagAtomFeed)
@@ -0,0 +1,69 @@
+import random
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from blog import search
+from blog.models import Post, Tag
+
+WORDS = (
+    'django python query index cache template view model database search ranking '
+    'token posting document score blog comment author tag archive feed page server '
+    'request response signal migration field queryset join scan sort memory disk'
+).split()
+
+
+def legacy_search(query):
+    # The query PostListView ran before the inverted index.
+    return list(Post.objects.filter(
+        Q(title__icontains=query) |
+        Q(content__icontains=query) |
+        Q(tags__name__icontains=query)
+    ).distinct())
+
+
+class Command(BaseCommand):
+    help = ("Compare the BM25 index with the old icontains query. Synthetic posts "
+            "are generated inside a transaction that is rolled back afterwards.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=20000)
+        parser.add_argument('--words', type=int, default=200, help="Words per post body.")
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument('queries', nargs='*', default=['django', 'cache template', 'ranking'])
+
+    def timed(self, func, query, repeat):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            results = func(query)
+        return (time.perf_counter() - start) / repeat * 1000, len(results)
+
+    def handle(self, *args, **options):
+        rng = random.Random(42)
+        with transaction.atomic():
+            if options['posts']:
+                self.generate(rng, options['posts'], options['words'])
+            self.stdout.write(f"{Post.objects.count()} posts, {options['repeat']} runs per query")
+            for query in options['queries']:
+                legacy_ms, legacy_hits = self.timed(legacy_search, query, options['repeat'])
+                index_ms, index_hits = self.timed(search.search, query, options['repeat'])
+                self.stdout.write(
+                    f"{query!r:20} icontains {legacy_ms:9.1f} ms ({legacy_hits} hits)   "
+                    f"bm25 {index_ms:8.1f} ms (top {index_hits})"
+                )
+            transaction.set_rollback(True)
+
+    def generate(self, rng, count, words):
+        author, _ = User.objects.get_or_create(username='bench-author')
+        tags = [Tag.objects.get_or_create(name=word)[0] for word in WORDS[:10]]
+        self.stdout.write(f"Generating {count} posts...")
+        for i in range(count):
+            post = Post.objects.create(
+                author=author,
+                title=' '.join(rng.choices(WORDS, k=6)),
+                content=' '.join(rng.choices(WORDS, k=words)),
+            )
+            post.tags.add(*rng.sample(tags, 2))
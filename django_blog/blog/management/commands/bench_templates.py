@@ -0,0 +1,116 @@
+import copy
+import re
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser, User
+from django.core.management.base import BaseCommand, CommandError
+from django.core.paginator import Paginator
+from django.template import engines
+from django.template.backends.jinja2 import Jinja2
+from django.test import RequestFactory, override_settings
+from django.utils import timezone
+
+from blog.models import Comment, Post, make_excerpt
+
+WORDS = 'django jinja template render context loop filter block cache page'.split()
+
+CSRF_RE = re.compile(r'(name="csrfmiddlewaretoken" value=")[^"]*')
+SPACE_RE = re.compile(r'\s+')
+
+
+def normalize(html):
+    # CSRF tokens are masked differently on every render; whitespace from
+    # tag syntax differs between the two languages.
+    html = CSRF_RE.sub(r'\1', html)
+    return SPACE_RE.sub(' ', html).replace('> <', '><').strip()
+
+
+def jinja2_engine():
+    try:
+        return engines['jinja2']
+    except Exception:
+        params = copy.deepcopy(settings.BLOG_JINJA2_ENGINE)
+        params.pop('BACKEND')
+        params['NAME'] = 'jinja2'
+        return Jinja2(params)
+
+
+class Command(BaseCommand):
+    help = ("Render the blog list and detail pages with the Django and Jinja2 "
+            "templates from identical in-memory contexts, compare timings and "
+            "check that both produce the same markup.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, nargs='+', default=[10, 100, 1000])
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get('/posts/')
+        request.user = AnonymousUser()
+        django_engine = engines['django']
+        jinja_engine = jinja2_engine()
+        mismatches = []
+
+        # Fragment caching would turn every render after the first into a cache hit.
+        with override_settings(CACHES={'default': {
+                'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}}):
+            for page, build in (('post_list', self.list_context), ('post_detail', self.detail_context)):
+                name = f'blog/{page}.html'
+                django_template = django_engine.get_template(name)
+                jinja_template = jinja_engine.get_template(name)
+                for rows in options['rows']:
+                    context = build(rows)
+                    django_ms, django_html = self.timed(django_template, context, request, options['repeat'])
+                    jinja_ms, jinja_html = self.timed(jinja_template, context, request, options['repeat'])
+                    same = normalize(django_html) == normalize(jinja_html)
+                    if not same:
+                        mismatches.append(f'{page} ({rows} rows)')
+                    self.stdout.write(
+                        f"{page:12} {rows:5} rows   django {django_ms:8.2f} ms   "
+                        f"jinja2 {jinja_ms:8.2f} ms   x{django_ms / jinja_ms:4.1f}   "
+                        f"{'same output' if same else 'OUTPUT DIFFERS'}"
+                    )
+
+        if mismatches:
+            raise CommandError(f"Rendered output differs for: {', '.join(mismatches)}")
+
+    def timed(self, template, context, request, repeat):
+        html = template.render(context, request)  # warm up loaders and compiled code
+        start = time.perf_counter()
+        for _ in range(repeat):
+            template.render(context, request)
+        return (time.perf_counter() - start) / repeat * 1000, html
+
+    def author(self):
+        return User(pk=1, username='bench-author')
+
+    def list_context(self, rows):
+        author = self.author()
+        posts = []
+        for i in range(rows):
+            content = ' '.join(WORDS[(i + j) % len(WORDS)] for j in range(60))
+            posts.append(Post(pk=i + 1, author=author, title=f'Post {i} about {WORDS[i % len(WORDS)]}',
+                              content=content, excerpt=make_excerpt(content)))
+        paginator = Paginator(posts, rows)
+        page = paginator.page(1)
+        return {
+            'paginator': paginator, 'page_obj': page, 'is_paginated': page.has_other_pages(),
+            'object_list': page.object_list, 'posts': page.object_list,
+        }
+
+    def detail_context(self, rows):
+        author = self.author()
+        post = Post(pk=1, author=author, title='Rendering benchmark', content=' '.join(WORDS * 20),
+                    comment_count=rows, comment_version=1)
+        now = timezone.now()
+        comments = [
+            Comment(pk=i + 1, post=post, author=author, created_at=now,
+                    content=f'Comment {i} on {WORDS[i % len(WORDS)]} <escaped & all>')
+            for i in range(rows)
+        ]
+        return {
+            'object': post, 'post': post,
+            'comments_page': Paginator(comments, rows).page(1), 'comments': comments,
+            'comment_form': None,
+        }
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import SearchDocument
+from blog.search import rebuild_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the blog search index from every published post."
+
+    def handle(self, *args, **options):
+        rebuild_index()
+        self.stdout.write(f"Indexed {SearchDocument.objects.count()} posts.")
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.4 on 2026-10-19 08:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def index_published_posts(apps, schema_editor):
+    from blog.search import post_terms
+
+    Post = apps.get_model('blog', 'Post')
+    SearchDocument = apps.get_model('blog', 'SearchDocument')
+    SearchPosting = apps.get_model('blog', 'SearchPosting')
+    for post in Post.objects.filter(status='published').iterator():
+        terms = post_terms(post)
+        document = SearchDocument.objects.create(post=post, length=sum(terms.values()))
+        SearchPosting.objects.bulk_create(
+            SearchPosting(term=term, document=document, frequency=frequency)
+            for term, frequency in terms.items()
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='search_document', serialize=False, to='blog.post')),
+                ('length', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SearchPosting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('frequency', models.PositiveIntegerField()),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='postings', to='blog.searchdocument')),
+            ],
+            options={
+                'unique_together': {('term', 'document')},
+            },
+        ),
+        migrations.RunPython(index_published_posts, migrations.RunPython.noop),
+    ]
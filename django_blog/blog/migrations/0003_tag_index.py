@@ -0,0 +1,48 @@
+# Generated by Django 5.2.4 on 2026-10-19 08:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def build_tag_index(apps, schema_editor):
+    Tag = apps.get_model('blog', 'Tag')
+    TagIndexEntry = apps.get_model('blog', 'TagIndexEntry')
+    Link = apps.get_model('blog', 'Post').tags.through
+    links = Link.objects.filter(post__status='published').select_related('post')
+    TagIndexEntry.objects.bulk_create(
+        (TagIndexEntry(tag_id=link.tag_id, post_id=link.post_id, published_date=link.post.published_date)
+         for link in links.iterator()),
+        batch_size=1000,
+    )
+    for tag_id, total in TagIndexEntry.objects.values_list('tag').annotate(total=Count('pk')).order_by():
+        Tag.objects.filter(pk=tag_id).update(published_post_count=total)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0002_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='tag',
+            name='published_post_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='TagIndexEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('published_date', models.DateTimeField()),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='tag_entries', to='blog.post')),
+                ('tag', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='index_entries', to='blog.tag')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['tag', '-published_date', '-post'], name='tag_entry_recent_idx')],
+                'unique_together': {('tag', 'post')},
+            },
+        ),
+        migrations.RunPython(build_tag_index, migrations.RunPython.noop),
+    ]
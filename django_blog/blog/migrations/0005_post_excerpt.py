@@ -0,0 +1,33 @@
+# Generated by Django 5.2.4 on 2026-10-19 08:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_excerpts(apps, schema_editor):
+    from blog.models import make_excerpt
+
+    Post = apps.get_model('blog', 'Post')
+    for post in Post.objects.only('pk', 'content').iterator():
+        Post.objects.filter(pk=post.pk).update(excerpt=make_excerpt(post.content))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_post_comment_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(blank=True, editable=False, max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['-published_date', '-id'], name='post_recent_idx'),
+        ),
+        migrations.RunPython(fill_excerpts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.4 on 2026-10-19 08:30
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def count_months(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    MonthlyPostCount = apps.get_model('blog', 'MonthlyPostCount')
+    counts = {}
+    dates = Post.objects.filter(status='published').values_list('published_date', flat=True)
+    for published in dates.iterator():
+        local = timezone.localtime(published) if timezone.is_aware(published) else published
+        counts[local.year, local.month] = counts.get((local.year, local.month), 0) + 1
+    MonthlyPostCount.objects.bulk_create(
+        MonthlyPostCount(year=year, month=month, count=count)
+        for (year, month), count in counts.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_post_excerpt'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonthlyPostCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('month', models.PositiveSmallIntegerField()),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-year', '-month'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['status', 'published_date'], name='post_status_date_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='monthlypostcount',
+            unique_together={('year', 'month')},
+        ),
+        migrations.RunPython(count_months, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 09:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0007_post_counters_not_editable'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='tag',
+            name='published_post_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
@@ -1,30 +1,77 @@
 from django.db import models
 from django.contrib.auth.models import User
 from django.urls import reverse
+from django.utils.text import Truncator
 
 STATUS_CHOICES = (
     ('draft', 'Draft'),
     ('published', 'Published'),
 )
 
+EXCERPT_LENGTH = 100
+
+
+def make_excerpt(content):
+    return Truncator(' '.join((content or '').split())).chars(EXCERPT_LENGTH)
+
+
+def save_kwargs(instance, counters, kwargs):
+    """
+    save() kwargs that leave out the counter fields when an existing row is
+    saved in full, so a stale instance (edit view, admin) can't write back
+    counts that signals have moved on with F() since it was loaded.
+    """
+    if instance._state.adding or kwargs.get('force_insert') or kwargs.get('update_fields') is not None:
+        return kwargs
+    fields = [field.name for field in instance._meta.concrete_fields
+              if not field.primary_key and field.name not in counters]
+    return {**kwargs, 'update_fields': fields}
+
 class Tag(models.Model):
     name = models.CharField(max_length=50, unique=True)
+    # Number of published posts with this tag, kept current by blog.tagindex
+    published_post_count = models.PositiveIntegerField(default=0, editable=False)
 
 
     def __str__(self):
         return self.name
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **save_kwargs(self, ('published_post_count',), kwargs))
     
 class Post(models.Model):
     title = models.CharField(max_length=200)
     content = models.TextField()
+    # Stored at save time so list pages never have to read `content`
+    excerpt = models.CharField(max_length=EXCERPT_LENGTH, blank=True, editable=False)
     published_date = models.DateTimeField(auto_now_add=True)
     author = models.ForeignKey(User, on_delete=models.CASCADE, related_name='posts')
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='published')
 
     tags = models.ManyToManyField(Tag, related_name='posts', blank=True) 
+    # Maintained by blog.signals; comment_version changes whenever any comment
+    # is added, edited or removed and keys the cached comment list.
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    comment_version = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-published_date', '-id'], name='post_recent_idx'),
+            # Archive pages and monthly recounts: range scans over published posts
+            models.Index(fields=['status', 'published_date'], name='post_status_date_idx'),
+        ]
+
     def __str__(self):
         return self.title
-    
+
+    def save(self, *args, **kwargs):
+        self.excerpt = make_excerpt(self.content)
+        kwargs = save_kwargs(self, ('comment_count', 'comment_version'), kwargs)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'content' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'excerpt'}
+        super().save(*args, **kwargs)
+
     def get_absolute_url(self):
         return reverse('post-detail', kwargs={'pk': self.pk})
 
@@ -35,7 +82,7 @@ class Comment(models.Model):
         related_name='comments'
     )
     author = models.ForeignKey(
-        'User',
+        User,
         on_delete=models.CASCADE,
     )
     content = models.TextField()
@@ -47,3 +94,56 @@ class Comment(models.Model):
         return f"Comment by {self.author} on {self.post}"
 
 
+class SearchDocument(models.Model):
+    """
+    A published post as seen by the search index (blog.search).
+    length is the post's weighted token count, used by BM25.
+    """
+    post = models.OneToOneField(Post, on_delete=models.CASCADE, primary_key=True,
+                                related_name='search_document')
+    length = models.PositiveIntegerField(default=0)
+
+
+class SearchPosting(models.Model):
+    """
+    One entry of the inverted index: how often a term occurs in a document.
+    """
+    term = models.CharField(max_length=64)
+    document = models.ForeignKey(SearchDocument, on_delete=models.CASCADE, related_name='postings')
+    frequency = models.PositiveIntegerField()
+
+    class Meta:
+        # term first, so looking up a term's postings is an index range scan
+        unique_together = ('term', 'document')
+
+
+class TagIndexEntry(models.Model):
+    """
+    Precomputed tag -> published post index (maintained by blog.tagindex).
+    The (tag, published_date, post) index serves "newest posts with this tag"
+    pages without touching unpublished posts or the M2M table.
+    """
+    tag = models.ForeignKey(Tag, on_delete=models.CASCADE, related_name='index_entries')
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='tag_entries')
+    published_date = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('tag', 'post')
+        indexes = [
+            models.Index(fields=['tag', '-published_date', '-post'], name='tag_entry_recent_idx'),
+        ]
+
+
+
+class MonthlyPostCount(models.Model):
+    """
+    Number of published posts per calendar month (maintained by blog.archive),
+    so the archive sidebar never needs a GROUP BY over posts.
+    """
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        unique_together = ('year', 'month')
+        ordering = ['-year', '-month']
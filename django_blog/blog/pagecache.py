@@ -0,0 +1,122 @@
+# blog/pagecache.py
+import hashlib
+import re
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.contrib.messages import get_messages
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils.cache import patch_vary_headers
+
+PAGE_KEY = 'blog:page:%s'
+DEPENDENCY_KEY = 'blog:dep:%s'
+
+# Left in cached comment markup where the viewer's own edit/delete links go.
+ACTIONS_PLACEHOLDER = '<!--comment-actions:%(pk)s:%(author_id)s-->'
+ACTIONS_RE = re.compile(r'<!--comment-actions:(\d+):(\d+)-->')
+
+
+def page_key(request):
+    digest = hashlib.md5(request.get_full_path().encode(), usedforsecurity=False).hexdigest()
+    return PAGE_KEY % digest
+
+
+def dependency_versions(dependencies):
+    keys = [DEPENDENCY_KEY % dependency for dependency in dependencies]
+    found = cache.get_many(keys)
+    return {key: found.get(key, 0) for key in keys}
+
+
+def purge(*dependencies):
+    """
+    Invalidate every cached page that depends on any of the given keys
+    (e.g. 'post:12', 'post-list') by bumping their versions.
+    """
+    for dependency in dependencies:
+        key = DEPENDENCY_KEY % dependency
+        if not cache.add(key, 1, None):
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, 1, None)
+
+
+def has_messages(request):
+    # Flash messages belong to one visitor; len() does not mark them as read.
+    return hasattr(request, '_messages') and len(get_messages(request)) > 0
+
+
+def cacheable(request):
+    return (request.method in ('GET', 'HEAD') and not request.user.is_authenticated
+            and not has_messages(request))
+
+
+def cache_anonymous_page(dependencies):
+    """
+    Serve anonymous GETs of the decorated view from the cache.
+
+    dependencies(request, *args, **kwargs) names what the page is built from.
+    A cached copy is only used while the versions of all of them are the ones
+    it was rendered with, so purge() drops exactly the affected pages.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not cacheable(request):
+                return view(request, *args, **kwargs)
+
+            key = page_key(request)
+            versions = dependency_versions(dependencies(request, *args, **kwargs))
+            entry = cache.get(key)
+            if entry is not None and entry['versions'] == versions:
+                response = HttpResponse(entry['content'], content_type=entry['content_type'])
+                # Logged-in visitors get a different page for the same URL.
+                patch_vary_headers(response, ('Cookie',))
+                response['X-Page-Cache'] = 'hit'
+                return response
+
+            response = view(request, *args, **kwargs)
+
+            def store(response):
+                if (response.status_code != 200 or response.cookies or has_messages(request)
+                        or request.META.get('CSRF_COOKIE_NEEDS_UPDATE')):
+                    return
+                cache.set(key, {
+                    'versions': versions,
+                    'content': response.content,
+                    'content_type': response['Content-Type'],
+                }, getattr(settings, 'BLOG_PAGE_CACHE_TIMEOUT', 600))
+                response['X-Page-Cache'] = 'miss'
+
+            if hasattr(response, 'render') and not response.is_rendered:
+                response.add_post_render_callback(store)
+            else:
+                store(response)
+            return response
+        return wrapper
+    return decorator
+
+
+def fill_actions(html, user):
+    """
+    Put the viewer's edit/delete links in place of the comment placeholders
+    in html and drop the rest.
+    """
+    def replace(match):
+        pk, author_id = match.groups()
+        if user.is_authenticated and int(author_id) == user.pk:
+            return render_to_string('blog/comment_actions.html', {'comment_pk': pk})
+        return ''
+
+    return ACTIONS_RE.sub(replace, html)
+
+
+def fill_comment_actions(response, user):
+    """
+    Post-render step for pages containing cached comment markup. This part
+    of the page is never cached.
+    """
+    response.content = fill_actions(response.content.decode(response.charset), user)
+    return response
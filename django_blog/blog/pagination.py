@@ -0,0 +1,58 @@
+# blog/pagination.py
+from django.core.paginator import Paginator
+from django.utils.functional import cached_property
+
+
+class KnownCountPaginator(Paginator):
+    """
+    Paginator for lists whose size is already stored somewhere (e.g. a
+    denormalized counter), so no COUNT(*) query is needed.
+    """
+    def __init__(self, object_list, per_page, count, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self._known_count = count
+
+    @cached_property
+    def count(self):
+        return self._known_count
+
+
+def estimate_row_count(model, using='default'):
+    """
+    The planner's row estimate for the model's table, or None when the
+    database does not keep one (e.g. SQLite).
+    """
+    from django.db import connections
+
+    connection = connections[using]
+    table = model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)', [table])
+        elif connection.vendor == 'mysql':
+            cursor.execute(
+                'SELECT table_rows FROM information_schema.tables '
+                'WHERE table_schema = DATABASE() AND table_name = %s', [table])
+        else:
+            return None
+        row = cursor.fetchone()
+    # PostgreSQL reports -1 for tables that were never analyzed.
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator for a whole, unfiltered table. Above `threshold` rows it trusts
+    the database's statistics instead of running an exact COUNT(*), so page
+    totals on big tables are approximate.
+    """
+    threshold = 10000
+
+    @cached_property
+    def count(self):
+        estimate = estimate_row_count(self.object_list.model, self.object_list.db)
+        if estimate is None or estimate < self.threshold:
+            return super().count
+        return estimate
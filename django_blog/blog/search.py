@@ -0,0 +1,111 @@
+# blog/search.py
+import heapq
+import math
+import re
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Avg, Count
+
+from .models import Post, SearchDocument, SearchPosting
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+STOP_WORDS = frozenset(
+    'a an and are as at be but by for from has have in is it its of on or that the '
+    'this to was were will with'.split()
+)
+MAX_TERM_LENGTH = 64
+
+# Term frequencies are weighted by where the term appears.
+FIELD_WEIGHTS = {
+    'title': 3,
+    'tags': 2,
+    'content': 1,
+}
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+
+def tokenize(text):
+    return [
+        token for token in TOKEN_RE.findall((text or '').lower())
+        if token not in STOP_WORDS and len(token) <= MAX_TERM_LENGTH
+    ]
+
+
+def post_terms(post):
+    """
+    Weighted term frequencies for a post's title, tags and content.
+    """
+    terms = Counter()
+    fields = {
+        'title': post.title,
+        'tags': ' '.join(post.tags.values_list('name', flat=True)),
+        'content': post.content,
+    }
+    for field, text in fields.items():
+        for token in tokenize(text):
+            terms[token] += FIELD_WEIGHTS[field]
+    return terms
+
+
+def index_post(post):
+    """
+    (Re)build the index entries of one post. Only published posts are indexed,
+    so search never needs to filter on status.
+    """
+    with transaction.atomic():
+        SearchDocument.objects.filter(post_id=post.pk).delete()
+        if post.status != 'published':
+            return
+        terms = post_terms(post)
+        document = SearchDocument.objects.create(post_id=post.pk, length=sum(terms.values()))
+        SearchPosting.objects.bulk_create(
+            SearchPosting(term=term, document=document, frequency=frequency)
+            for term, frequency in terms.items()
+        )
+
+
+def rebuild_index(batch_size=500):
+    SearchDocument.objects.all().delete()
+    posts = Post.objects.filter(status='published').prefetch_related('tags')
+    for post in posts.iterator(chunk_size=batch_size):
+        index_post(post)
+
+
+def bm25(frequency, length, avg_length, idf):
+    norm = K1 * (1 - B + B * length / avg_length) if avg_length else K1
+    return idf * frequency * (K1 + 1) / (frequency + norm)
+
+
+def search(query, limit=50):
+    """
+    Return published posts matching the query, best BM25 score first.
+    """
+    terms = set(tokenize(query))
+    if not terms:
+        return []
+
+    stats = SearchDocument.objects.aggregate(total=Count('pk'), avg_length=Avg('length'))
+    if not stats['total']:
+        return []
+
+    postings = list(
+        SearchPosting.objects.filter(term__in=terms)
+        .values_list('document_id', 'term', 'frequency', 'document__length')
+    )
+    document_frequency = Counter(term for _, term, _, _ in postings)
+    idf = {
+        term: math.log(1 + (stats['total'] - df + 0.5) / (df + 0.5))
+        for term, df in document_frequency.items()
+    }
+
+    scores = Counter()
+    for document_id, term, frequency, length in postings:
+        scores[document_id] += bm25(frequency, length, stats['avg_length'], idf[term])
+
+    top = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], item[0]))
+    posts = Post.objects.select_related('author').in_bulk([post_id for post_id, _ in top])
+    return [posts[post_id] for post_id, _ in top if post_id in posts]
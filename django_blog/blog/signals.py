@@ -0,0 +1,109 @@
+# blog/signals.py
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import archive, pagecache, search, sitemaps, tagindex, tagtrie
+from .models import Comment, Post, Tag
+
+
+def purge_pages(*dependencies):
+    # After commit, so a concurrent request cannot re-cache the old content.
+    transaction.on_commit(lambda: pagecache.purge(*dependencies))
+
+
+def post_changed(post):
+    # Everything derived from a post's content, status or tags.
+    search.index_post(post)
+    tagindex.sync_post(post)
+    purge_pages(f'post:{post.pk}', 'post-list', sitemaps.shard_dependency('posts', post.pk))
+
+
+def archive_changed(post):
+    # Status changes move a post in or out of its month's count.
+    if archive.sync_post(post):
+        purge_pages('archive')
+
+
+def reindex_posts(post_ids):
+    for post in Post.objects.filter(pk__in=post_ids).prefetch_related('tags'):
+        post_changed(post)
+
+
+@receiver(post_save, sender=Post)
+def index_saved_post(sender, instance, raw=False, **kwargs):
+    if not raw:
+        post_changed(instance)
+        archive_changed(instance)
+
+
+@receiver(pre_delete, sender=Post)
+def unindex_deleted_post(sender, instance, **kwargs):
+    # Index rows cascade on their own; the per-tag counts do not.
+    tagindex.sync_post(instance, tag_ids=())
+    purge_pages(f'post:{instance.pk}', 'post-list', sitemaps.shard_dependency('posts', instance.pk))
+
+
+@receiver(post_delete, sender=Post)
+def uncount_deleted_post(sender, instance, **kwargs):
+    archive_changed(instance)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def index_retagged_posts(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        # tag.posts.clear(): remember the posts before the links disappear.
+        instance._cleared_post_ids = list(instance.posts.values_list('pk', flat=True))
+    elif action in ('post_add', 'post_remove', 'post_clear'):
+        if not reverse:
+            post_changed(instance)
+        elif action == 'post_clear':
+            reindex_posts(getattr(instance, '_cleared_post_ids', []))
+        else:
+            reindex_posts(pk_set)
+
+
+@receiver(post_save, sender=Tag)
+def index_saved_tag(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    if not created:
+        reindex_posts(instance.posts.values_list('pk', flat=True))
+    transaction.on_commit(lambda: tagtrie.refresh_tags([instance.pk]))
+    purge_pages('post-list', sitemaps.shard_dependency('tags', instance.pk))
+
+
+@receiver(pre_delete, sender=Tag)
+def remember_tagged_posts(sender, instance, **kwargs):
+    # Deleting a tag drops its links without an m2m_changed signal.
+    instance._tagged_post_ids = list(instance.posts.values_list('pk', flat=True))
+    instance._deleted_pk = instance.pk
+
+
+@receiver(post_delete, sender=Tag)
+def index_untagged_posts(sender, instance, **kwargs):
+    reindex_posts(getattr(instance, '_tagged_post_ids', []))
+    transaction.on_commit(lambda: tagtrie.refresh_tags([instance._deleted_pk]))
+    purge_pages('post-list', sitemaps.shard_dependency('tags', instance._deleted_pk))
+
+
+@receiver(post_save, sender=Comment)
+def bump_comment_version(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    changes = {'comment_version': F('comment_version') + 1}
+    if created:
+        changes['comment_count'] = F('comment_count') + 1
+    Post.objects.filter(pk=instance.post_id).update(**changes)
+    purge_pages(f'post:{instance.post_id}')
+
+
+@receiver(post_delete, sender=Comment)
+def drop_comment(sender, instance, **kwargs):
+    Post.objects.filter(pk=instance.post_id).update(
+        comment_version=F('comment_version') + 1,
+        comment_count=F('comment_count') - 1,
+    )
+    purge_pages(f'post:{instance.post_id}')
+
@@ -0,0 +1,189 @@
+# blog/sitemaps.py
+import hashlib
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, IntegerField, Max
+from django.db.models.functions import Floor
+from django.http import Http404, StreamingHttpResponse
+from django.urls import NoReverseMatch, reverse
+from django.views.decorators.http import require_GET
+
+from . import pagecache
+from .models import Post, Tag
+
+SITEMAP_KEY = 'blog:sitemap:%s'
+
+URLSET_OPEN = (b'<?xml version="1.0" encoding="UTF-8"?>\n'
+               b'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+URLSET_CLOSE = b'</urlset>\n'
+INDEX_OPEN = (b'<?xml version="1.0" encoding="UTF-8"?>\n'
+              b'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+INDEX_CLOSE = b'</sitemapindex>\n'
+
+# Rows fetched per database round trip and URLs per yielded chunk.
+CHUNK_SIZE = 2000
+
+
+def shard_size():
+    # 50,000 URLs is the most a single sitemap file may hold.
+    return getattr(settings, 'BLOG_SITEMAP_SHARD_SIZE', 50000)
+
+
+def shard_of(pk):
+    return (pk - 1) // shard_size()
+
+
+def shard_dependency(section, pk):
+    """
+    Page cache dependency of the shard holding the object with this pk;
+    blog.signals purges it when such an object changes.
+    """
+    return f'sitemap:{section}:{shard_of(pk)}'
+
+
+class PostSection:
+    name = 'posts'
+
+    def queryset(self):
+        return Post.objects.filter(status='published')
+
+    def lastmod_field(self):
+        return 'published_date'
+
+    def entries(self, queryset):
+        # One reverse() instead of one per row; post URLs only differ by pk.
+        pattern = reverse('post-detail', kwargs={'pk': 1234567890}).replace('1234567890', '%d')
+        rows = queryset.values_list('pk', 'published_date').order_by('pk')
+        for pk, published in rows.iterator(chunk_size=CHUNK_SIZE):
+            yield pattern % pk, published
+
+
+class TagSection:
+    name = 'tags'
+
+    def queryset(self):
+        return Tag.objects.filter(published_post_count__gt=0)
+
+    def lastmod_field(self):
+        return None
+
+    def entries(self, queryset):
+        for name in queryset.values_list('name', flat=True).order_by('pk').iterator(chunk_size=CHUNK_SIZE):
+            try:
+                path = reverse('posts-by-tag', kwargs={'tag_name': name})
+            except NoReverseMatch:
+                # A tag page its own URL pattern cannot reach (e.g. a '/' in the name).
+                continue
+            yield path, None
+
+
+SECTIONS = {section.name: section for section in (PostSection(), TagSection())}
+
+
+def shard_summary(section):
+    """
+    [(shard, url count, lastmod)] for every non-empty shard of a section, in
+    one GROUP BY. Shards are fixed pk ranges, so a post or tag always stays
+    in the same shard and a change only invalidates that one.
+    """
+    shard = Floor((F('pk') - 1) / shard_size(), output_field=IntegerField())
+    aggregates = {'urls': Count('pk')}
+    if section.lastmod_field():
+        aggregates['lastmod'] = Max(section.lastmod_field())
+    rows = (section.queryset().annotate(shard=shard).values('shard')
+            .annotate(**aggregates).order_by('shard'))
+    return [(int(row['shard']), row['urls'], row.get('lastmod')) for row in rows]
+
+
+def url_entry(request, path, lastmod):
+    entry = f'<url><loc>{escape(request.build_absolute_uri(path))}</loc>'
+    if lastmod is not None:
+        entry += f'<lastmod>{lastmod.date().isoformat()}</lastmod>'
+    return entry + '</url>\n'
+
+
+def urlset_chunks(request, querysets):
+    yield URLSET_OPEN
+    for section, queryset in querysets:
+        chunk = []
+        for path, lastmod in section.entries(queryset):
+            chunk.append(url_entry(request, path, lastmod))
+            if len(chunk) == CHUNK_SIZE:
+                yield ''.join(chunk).encode()
+                chunk = []
+        if chunk:
+            yield ''.join(chunk).encode()
+    yield URLSET_CLOSE
+
+
+def index_chunks(request, summaries):
+    yield INDEX_OPEN
+    for section, shards in summaries:
+        for shard, urls, lastmod in shards:
+            path = reverse('sitemap-shard', kwargs={'section': section.name, 'shard': shard})
+            entry = f'<sitemap><loc>{escape(request.build_absolute_uri(path))}</loc>'
+            if lastmod is not None:
+                entry += f'<lastmod>{lastmod.date().isoformat()}</lastmod>'
+            yield (entry + '</sitemap>\n').encode()
+    yield INDEX_CLOSE
+
+
+def cache_key(request):
+    location = f'{request.get_host()}{request.path}'
+    return SITEMAP_KEY % hashlib.md5(location.encode(), usedforsecurity=False).hexdigest()
+
+
+def cached_stream(request, dependencies, chunks, exists=None):
+    """
+    Serve the cached sitemap if none of its dependencies changed; otherwise
+    stream the chunks to the client and store what was sent. On a miss,
+    exists() (if given) returning False is a 404.
+    """
+    key = cache_key(request)
+    versions = pagecache.dependency_versions(dependencies)
+    entry = cache.get(key)
+    if entry is not None and entry['versions'] == versions:
+        return StreamingHttpResponse([entry['content']], content_type='application/xml')
+    if exists is not None and not exists():
+        raise Http404('No such sitemap.')
+
+    def stream():
+        parts = []
+        for chunk in chunks():
+            parts.append(chunk)
+            yield chunk
+        cache.set(key, {'versions': versions, 'content': b''.join(parts)},
+                  getattr(settings, 'BLOG_SITEMAP_CACHE_TIMEOUT', 86400))
+
+    return StreamingHttpResponse(stream(), content_type='application/xml')
+
+
+@require_GET
+def sitemap(request):
+    """
+    /sitemap.xml: every published post and used tag in one urlset, or, past
+    BLOG_SITEMAP_SHARD_SIZE URLs, an index of per-range shards.
+    """
+    def chunks():
+        summaries = [(section, shard_summary(section)) for section in SECTIONS.values()]
+        total = sum(urls for _, shards in summaries for _, urls, _ in shards)
+        if total > shard_size():
+            return index_chunks(request, summaries)
+        return urlset_chunks(request, [(section, section.queryset()) for section in SECTIONS.values()])
+
+    # Every post or tag change purges 'post-list' (blog.signals).
+    return cached_stream(request, ['post-list'], chunks)
+
+
+@require_GET
+def sitemap_shard(request, section, shard):
+    section = SECTIONS.get(section)
+    if section is None:
+        raise Http404('No such sitemap.')
+    size = shard_size()
+    queryset = section.queryset().filter(pk__gt=shard * size, pk__lte=(shard + 1) * size)
+    # Empty shards (past the last one, or emptied by deletes) are not in the index.
+    return cached_stream(request, [f'sitemap:{section.name}:{shard}'],
+                         lambda: urlset_chunks(request, [(section, queryset)]), exists=queryset.exists)
@@ -0,0 +1,128 @@
+// Post, edit and page through comments without reloading the post page.
+// The server answers these requests with rendered comment fragments
+// (see wants_json() in blog/views.py); without JavaScript the forms and
+// links work as plain page loads.
+(function () {
+    var comments = document.getElementById('comments');
+    var form = document.getElementById('comment-form');
+    if (!comments) {
+        return;
+    }
+
+    function send(url, options) {
+        options.headers = Object.assign({'X-Requested-With': 'XMLHttpRequest'}, options.headers);
+        options.credentials = 'same-origin';
+        return fetch(url, options).then(function (response) {
+            return response.json().then(function (data) {
+                return {ok: response.ok, data: data};
+            });
+        });
+    }
+
+    function showErrors(target, errors) {
+        var messages = [];
+        Object.keys(errors || {}).forEach(function (field) {
+            messages = messages.concat(errors[field]);
+        });
+        target.textContent = messages.join(' ');
+    }
+
+    function csrfToken() {
+        var input = document.querySelector('input[name="csrfmiddlewaretoken"]');
+        if (input) {
+            return input.value;
+        }
+        var match = document.cookie.match(/(?:^|;\s*)csrftoken=([^;]+)/);
+        return match ? decodeURIComponent(match[1]) : '';
+    }
+
+    // Swap a comment's text for a textarea; saving posts it to the comment's
+    // edit URL and replaces the comment with the fragment sent back.
+    function editInline(link) {
+        var comment = link.closest('.comment');
+        var text = comment && comment.querySelector('p');
+        if (!text || comment.querySelector('form')) {
+            return;
+        }
+        var editor = document.createElement('form');
+        var area = document.createElement('textarea');
+        area.name = 'content';
+        area.rows = 3;
+        area.value = text.textContent;
+        var save = document.createElement('button');
+        save.type = 'submit';
+        save.textContent = 'Update';
+        var cancel = document.createElement('button');
+        cancel.type = 'button';
+        cancel.textContent = 'Cancel';
+        var errors = document.createElement('p');
+        errors.className = 'comment-errors';
+        editor.append(area, save, cancel, errors);
+        text.hidden = true;
+        text.after(editor);
+        area.focus();
+
+        cancel.addEventListener('click', function () {
+            editor.remove();
+            text.hidden = false;
+        });
+        editor.addEventListener('submit', function (event) {
+            event.preventDefault();
+            send(link.href, {method: 'POST', body: new FormData(editor), headers: {'X-CSRFToken': csrfToken()}})
+                .then(function (result) {
+                    if (!result.ok) {
+                        showErrors(errors, result.data.errors || {detail: [result.data.detail]});
+                        return;
+                    }
+                    var fragment = document.createRange().createContextualFragment(result.data.html);
+                    comment.replaceWith(fragment.querySelector('.comment'));
+                });
+        });
+    }
+
+    comments.addEventListener('click', function (event) {
+        var edit = event.target.closest('a[data-comment-edit]');
+        if (edit) {
+            event.preventDefault();
+            editInline(edit);
+            return;
+        }
+        var link = event.target.closest('a[data-comments-page]');
+        if (!link) {
+            return;
+        }
+        event.preventDefault();
+        var url = comments.dataset.url + '?page=' + link.dataset.commentsPage;
+        send(url, {method: 'GET'}).then(function (result) {
+            if (result.ok) {
+                comments.innerHTML = result.data.html;
+            }
+        });
+    });
+
+    if (form) {
+        var errors = document.createElement('p');
+        errors.className = 'comment-errors';
+        form.appendChild(errors);
+
+        form.addEventListener('submit', function (event) {
+            event.preventDefault();
+            send(form.action || window.location.pathname, {method: 'POST', body: new FormData(form)})
+                .then(function (result) {
+                    if (!result.ok) {
+                        showErrors(errors, result.data.errors);
+                        return;
+                    }
+                    var empty = comments.querySelector('.no-comments');
+                    if (empty) {
+                        empty.remove();
+                    }
+                    var nav = comments.querySelector('nav');
+                    var fragment = document.createRange().createContextualFragment(result.data.html);
+                    comments.insertBefore(fragment, nav);
+                    errors.textContent = '';
+                    form.reset();
+                });
+        });
+    }
+})();
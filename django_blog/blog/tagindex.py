@@ -0,0 +1,64 @@
+# blog/tagindex.py
+from django.db import transaction
+from django.db.models import Count, F
+
+from . import pagecache, sitemaps, tagtrie
+from .models import Tag, TagIndexEntry
+
+
+def sync_post(post, tag_ids=None):
+    """
+    Bring the post's index entries and its tags' published counts in line with
+    the post. Pass tag_ids=() to drop the post from the index (e.g. on delete).
+    """
+    if tag_ids is None:
+        tag_ids = post.tags.values_list('pk', flat=True) if post.status == 'published' else ()
+    wanted = set(tag_ids)
+
+    with transaction.atomic():
+        entries = {entry.tag_id: entry for entry in TagIndexEntry.objects.filter(post_id=post.pk)}
+        added = wanted - entries.keys()
+        removed = entries.keys() - wanted
+
+        if removed:
+            TagIndexEntry.objects.filter(post_id=post.pk, tag_id__in=removed).delete()
+            Tag.objects.filter(pk__in=removed).update(published_post_count=F('published_post_count') - 1)
+        if added:
+            TagIndexEntry.objects.bulk_create(
+                TagIndexEntry(tag_id=tag_id, post_id=post.pk, published_date=post.published_date)
+                for tag_id in added
+            )
+            Tag.objects.filter(pk__in=added).update(published_post_count=F('published_post_count') + 1)
+        stale = [entry.pk for tag_id, entry in entries.items()
+                 if tag_id in wanted and entry.published_date != post.published_date]
+        if stale:
+            TagIndexEntry.objects.filter(pk__in=stale).update(published_date=post.published_date)
+
+        if added or removed:
+            changed = added | removed
+            transaction.on_commit(lambda: tagtrie.refresh_tags(changed))
+            # A tag enters or leaves the sitemap when its count reaches or leaves zero.
+            shards = {sitemaps.shard_dependency('tags', tag_id) for tag_id in changed}
+            transaction.on_commit(lambda: pagecache.purge(*shards))
+
+
+def rebuild():
+    """
+    Recompute the whole index and every count from scratch.
+    """
+    from .models import Post
+
+    with transaction.atomic():
+        TagIndexEntry.objects.all().delete()
+        Tag.objects.update(published_post_count=0)
+        links = Post.tags.through.objects.filter(post__status='published').select_related('post')
+        TagIndexEntry.objects.bulk_create(
+            (TagIndexEntry(tag_id=link.tag_id, post_id=link.post_id,
+                           published_date=link.post.published_date)
+             for link in links.iterator()),
+            batch_size=1000,
+        )
+        counts = TagIndexEntry.objects.values_list('tag').annotate(total=Count('pk')).order_by()
+        for tag_id, total in counts:
+            Tag.objects.filter(pk=tag_id).update(published_post_count=total)
+    transaction.on_commit(tagtrie.invalidate)
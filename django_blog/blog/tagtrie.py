@@ -0,0 +1,135 @@
+# blog/tagtrie.py
+import heapq
+import threading
+
+from django.core.cache import cache
+
+VERSION_KEY = 'blog:tagtrie:version'
+
+
+class TrieNode:
+    __slots__ = ('children', 'tags')
+
+    def __init__(self):
+        self.children = {}
+        # tag id -> (name, published_post_count) for tags ending at this node
+        self.tags = {}
+
+
+class TagTrie:
+    """
+    Case-insensitive prefix tree of tag names used for autocomplete.
+    Suggestions are ordered by how many published posts use the tag.
+    """
+    def __init__(self, tags=()):
+        self.root = TrieNode()
+        self.names = {}
+        for pk, name, count in tags:
+            self.insert(pk, name, count)
+
+    def _node(self, key):
+        node = self.root
+        for char in key:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def insert(self, pk, name, count):
+        self.remove(pk)
+        node = self.root
+        for char in name.lower():
+            node = node.children.setdefault(char, TrieNode())
+        node.tags[pk] = (name, count)
+        self.names[pk] = name
+
+    def remove(self, pk):
+        name = self.names.pop(pk, None)
+        if name is None:
+            return
+        path = []
+        node = self.root
+        for char in name.lower():
+            path.append((node, char))
+            node = node.children[char]
+        node.tags.pop(pk, None)
+        # Prune branches that no longer lead to any tag.
+        for parent, char in reversed(path):
+            child = parent.children[char]
+            if child.tags or child.children:
+                break
+            del parent.children[char]
+
+    def suggest(self, prefix, limit=10):
+        node = self._node(prefix.lower())
+        if node is None:
+            return []
+        found = []
+        stack = [node]
+        while stack:
+            current = stack.pop()
+            found.extend(current.tags.values())
+            stack.extend(current.children.values())
+        return heapq.nsmallest(limit, found, key=lambda tag: (-tag[1], tag[0].lower()))
+
+
+_lock = threading.Lock()
+_trie = None
+_trie_version = None
+
+
+def _load_tags(tag_ids=None):
+    from .models import Tag
+
+    tags = Tag.objects.all() if tag_ids is None else Tag.objects.filter(pk__in=tag_ids)
+    return tags.values_list('pk', 'name', 'published_post_count')
+
+
+def get_trie():
+    """
+    Return this process's trie, rebuilding it when another process has
+    announced a change through the shared cache version.
+    """
+    global _trie, _trie_version
+    version = cache.get(VERSION_KEY, 0)
+    with _lock:
+        if _trie is None or _trie_version != version:
+            _trie = TagTrie(_load_tags())
+            _trie_version = version
+        return _trie
+
+
+def _bump_version():
+    try:
+        version = cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, None)
+        version = 1
+    return version
+
+
+def refresh_tags(tag_ids):
+    """
+    Apply changes to the given tags (count, name or deletion) to the local trie
+    in place, then bump the shared version so other processes reload.
+    """
+    global _trie_version
+    with _lock:
+        if _trie is not None:
+            current = {pk: (name, count) for pk, name, count in _load_tags(tag_ids)}
+            for pk in tag_ids:
+                if pk in current:
+                    _trie.insert(pk, *current[pk])
+                else:
+                    _trie.remove(pk)
+        version = _bump_version()
+        if _trie is not None and _trie_version == version - 1:
+            # Nobody else changed anything in between: our copy is current.
+            _trie_version = version
+
+
+def invalidate():
+    global _trie
+    with _lock:
+        _trie = None
+        _bump_version()
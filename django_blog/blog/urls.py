@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import feeds, sitemaps, views
 from django.contrib.auth import views as auth_views
 from .views import (
     PostListView,
@@ -7,7 +7,7 @@ from .views import (
     PostCreateView,
     PostUpdateView,
     PostDeleteView,
-
+    PostByTagListView,
 )
 
 urlpatterns = [
@@ -28,12 +28,27 @@ urlpatterns = [
     path('post/<int:pk>/update/', PostUpdateView.as_view(), name="post-update"),
     path('post/<int:pk>/delete/', PostDeleteView.as_view(), name="post-delete"),
 
+    path('post/<int:pk>/comments/', views.comment_page, name='comment-page'),
     path('post/<int:pk>/comments/new/', views.add_comment, name='comment-create'),
     path('comment/<int:pk>/update/', views.edit_comment, name='edit-comment'),
     path('comment/<int:pk>/delete/', views.delete_comment, name='delete-comment'),
 
-    path('tags/<str:tag_name>/', views.posts_by_tag, name='posts-by-tag'),
+    path('tags/suggest', views.tag_suggest, name='tag-suggest'),
+    path('tags/<str:tag_name>/', PostByTagListView.as_view(), name='posts-by-tag'),
     path('search/',views.search_posts, name='search-posts'),
-    path('tags/<slug:tag_slug>/', views.PostByTagListView.as_view(), name='posts_by_tag'),
+
+    # Archive
+    path('archive/<int:year>/', views.PostArchiveView.as_view(), name='archive-year'),
+    path('archive/<int:year>/<int:month>/', views.PostArchiveView.as_view(), name='archive-month'),
+
+    # Feeds
+    path('feed/rss/', feeds.latest_posts_rss, name='feed-rss'),
+    path('feed/atom/', feeds.latest_posts_atom, name='feed-atom'),
+    path('tags/<str:tag_name>/feed/rss/', feeds.tag_posts_rss, name='tag-feed-rss'),
+    path('tags/<str:tag_name>/feed/atom/', feeds.tag_posts_atom, name='tag-feed-atom'),
+
+    # Sitemaps
+    path('sitemap.xml', sitemaps.sitemap, name='sitemap'),
+    path('sitemap-<str:section>-<int:shard>.xml', sitemaps.sitemap_shard, name='sitemap-shard'),
     
 ]
\ No newline at end of file
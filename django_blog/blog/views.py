@@ -2,6 +2,7 @@ from django.shortcuts import render, redirect
 from django.contrib.auth import login
 from django.contrib.auth.views import LoginView, LogoutView
 from django.contrib.auth.decorators import login_required
+from django.contrib.auth.views import redirect_to_login
 from .forms import CustomUserCreationForm
 from django.contrib.auth.forms import UserCreationForm
 from django.contrib import messages
@@ -15,10 +16,14 @@ from .forms import CommentForm
 from .forms import PostForm
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
 from django.shortcuts import render, get_object_or_404, redirect
-from taggit.models import Tag
-from .models import Post
+from .models import Post, Tag
 from django.urls import reverse_lazy
-from django.db.models import Q
+from django.http import Http404, JsonResponse
+from django.views.decorators.http import require_GET
+from django.utils.decorators import method_decorator
+from django.template.loader import render_to_string
+from . import archive, pagecache, search, tagtrie
+from .pagination import EstimatedCountPaginator, KnownCountPaginator
 
 def register(request):
     if request.method == "POST":
@@ -48,40 +53,71 @@ class CustomLoginView(LoginView):
 class CustomLogoutView(LogoutView):
     template_name = "blog/logout.html"
 
+@pagecache.cache_anonymous_page(lambda request: ['archive'])
 def home(request):
     return render(request, 'blog/home.html')
 def posts(request):
     return render(request, 'blog/posts.html')
 
+@method_decorator(pagecache.cache_anonymous_page(lambda request: ['post-list', 'archive']), name='dispatch')
 class PostListView(ListView):
     model = Post
     template_name = 'blog/post_list.html'
     context_object_name = 'posts' 
-    ordering = ['-date_posted']    
+    ordering = ['-published_date', '-id']
+    paginate_by = 10
 
     def get_queryset(self):
         query = self.request.GET.get('q')
         if query:
-            return Post.objects.filter(
-                Q(title__icontains=query) |
-                Q(content__icontains=query) |
-                Q(tags__name__icontains=query)
-            ).distinct()
-        return Post.objects.all()
+            # Ranked lookup in the inverted index (blog/search.py)
+            return search.search(query)
+        # The stored excerpt stands in for `content`, which is never loaded here.
+        return (Post.objects.order_by(*self.ordering)
+                .only('pk', 'title', 'excerpt', 'published_date'))
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        if isinstance(queryset, list):
+            return super().get_paginator(queryset, per_page, **kwargs)
+        return EstimatedCountPaginator(queryset, per_page, **kwargs)
     
 
+@method_decorator(pagecache.cache_anonymous_page(lambda request, pk: [f'post:{pk}', 'archive']), name='dispatch')
 class PostDetailView(DetailView):
+    """
+    One query for the post and its author; comments are paged and only fetched
+    (with their authors) when the cached comment fragment has to be rendered.
+    """
     model = Post
     template_name = 'blog/post_detail.html'
+    comments_per_page = 20
+
+    def get_queryset(self):
+        return Post.objects.select_related('author')
+
+    def get_comments_page(self):
+        return get_comments_page(self.object, self.request.GET.get('page'), self.comments_per_page)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        post = self.get_object()
-        context['comments'] = post.comments.all()
-        context['form'] = CommentForm()
+        page = self.get_comments_page()
+        context['comments_page'] = page
+        # The slice is lazy: on a cache hit the comments are never queried.
+        context['comments'] = page.object_list
+        context.setdefault('comment_form', CommentForm())
         return context
+
+    def render_to_response(self, context, **response_kwargs):
+        response = super().render_to_response(context, **response_kwargs)
+        response.add_post_render_callback(
+            lambda response: pagecache.fill_comment_actions(response, self.request.user))
+        return response
     
     def post(self, request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return redirect_to_login(request.get_full_path())
+        if wants_json(request):
+            return create_comment_json(request, kwargs['pk'])
         self.object = self.get_object()
         form = CommentForm(request.POST)
         if form.is_valid():
@@ -91,9 +127,62 @@ class PostDetailView(DetailView):
             comment.save()
             messages.success(request, "Your comment has been added!")
             return redirect('post-detail', pk=self.object.pk)
-        context = self.get_context_data()
-        context['form'] = form
+        context = self.get_context_data(comment_form=form)
         return self.render_to_response(context)
+
+
+def get_comments_page(post, number, per_page=PostDetailView.comments_per_page):
+    comments = post.comments.select_related('author').order_by('created_at', 'pk')
+    paginator = KnownCountPaginator(comments, per_page, count=post.comment_count)
+    return paginator.get_page(number)
+
+
+def wants_json(request):
+    # Set by blog/static/blog/comments.js; plain form posts keep redirecting.
+    return (request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+            or 'application/json' in request.headers.get('Accept', ''))
+
+
+def render_comment(request, comment):
+    html = render_to_string('blog/comment.html', {'comment': comment}, request)
+    return pagecache.fill_actions(html, request.user)
+
+
+def create_comment_json(request, post_pk):
+    """
+    Fragment mode of comment posting: insert the comment and answer with its
+    rendered HTML instead of redirecting to (and re-rendering) the post page.
+    """
+    if not Post.objects.filter(pk=post_pk).exists():
+        raise Http404('No post found.')
+    form = CommentForm(request.POST)
+    if not form.is_valid():
+        return JsonResponse({'errors': form.errors}, status=400)
+    comment = form.save(commit=False)
+    comment.post_id = post_pk
+    comment.author = request.user
+    comment.save()
+    return JsonResponse({'id': comment.pk, 'html': render_comment(request, comment)}, status=201)
+
+
+@require_GET
+def comment_page(request, pk):
+    """
+    GET /post/<pk>/comments/?page=2 -> one page of comments as an HTML
+    fragment, for loading more comments without reloading the post. Shares
+    the cached comment fragment with PostDetailView.
+    """
+    post = get_object_or_404(Post.objects.only('pk', 'comment_count', 'comment_version'), pk=pk)
+    page = get_comments_page(post, request.GET.get('page'))
+    html = render_to_string('blog/comment_list.html', {
+        'post': post, 'comments_page': page, 'comments': page.object_list,
+    }, request)
+    return JsonResponse({
+        'html': pagecache.fill_actions(html, request.user),
+        'page': page.number,
+        'num_pages': page.paginator.num_pages,
+        'next_page': page.next_page_number() if page.has_next() else None,
+    })
     
 
 class PostCreateView(CreateView):
@@ -134,52 +223,69 @@ class PostDeleteView(DeleteView):
 
 @login_required
 def add_comment(request, pk):
+    if request.method == 'POST' and wants_json(request):
+        return create_comment_json(request, pk)
     post = get_object_or_404(Post, pk=pk)
     if request.method == 'POST':
-            form = CommentForm(request.POST)
-            if form.is_valid():
-                comment = form.save(commit=False)
-                comment.post = post
-                comment.author = request.user
-                comment.save()
-                messages.success(request, "Your comment has been added!")
-                return redirect('post-detail', pk=post.pk)
-            else:
-             form = CommentForm()
-            return render(request, 'blog/add_comment.html', {'form': form, 'post': post})
-    
+        form = CommentForm(request.POST)
+        if form.is_valid():
+            comment = form.save(commit=False)
+            comment.post = post
+            comment.author = request.user
+            comment.save()
+            messages.success(request, "Your comment has been added!")
+            return redirect('post-detail', pk=post.pk)
+    else:
+        form = CommentForm()
+    return render(request, 'blog/add_comment.html', {'form': form, 'post': post})
+
+
+def comment_forbidden(request, comment, action):
+    if wants_json(request):
+        return JsonResponse({'detail': f"You do not have permission to {action} this comment."}, status=403)
+    messages.error(request, f"You do not have permission to {action} this comment.")
+    return redirect('post-detail', pk=comment.post_id)
+
+
 @login_required
 def edit_comment(request, pk):
-        comment = get_object_or_404(Comment, pk=pk)
-        if comment.author != request.user:
-            messages.error(request, "You do not have permission to edit this comment.")
-            return redirect('post-detail', pk=comment.post.pk)
-        
-        if request.method == 'POST':
-            form = CommentForm(request.POST, instance=comment)
-            if form.is_valid():
-                form.save()
-                messages.success(request, "Comment updated successfully!")
-                return redirect('post-detail', pk=comment.post.pk)
-        else:
-             form = CommentForm(instance=comment)
-        return render(request, 'blog/edit_comment.html', {'form': form, 'comment': comment})
-    
+    comment = get_object_or_404(Comment, pk=pk)
+    if comment.author_id != request.user.pk:
+        return comment_forbidden(request, comment, 'edit')
+    comment.author = request.user
+
+    if request.method == 'POST':
+        form = CommentForm(request.POST, instance=comment)
+        if form.is_valid():
+            form.save()
+            if wants_json(request):
+                return JsonResponse({'id': comment.pk, 'html': render_comment(request, comment)})
+            messages.success(request, "Comment updated successfully!")
+            return redirect('post-detail', pk=comment.post_id)
+        if wants_json(request):
+            return JsonResponse({'errors': form.errors}, status=400)
+    else:
+        form = CommentForm(instance=comment)
+    return render(request, 'blog/edit_comment.html', {'form': form, 'comment': comment})
+
+
 @login_required
 def delete_comment(request, pk):
-        comment = get_object_or_404(Comment, pk=pk)
-        if comment.author != request.user:
-            messages.error(request, "You do not have permission to delete this comment.")
-            return redirect('post-detail', pk=comment.post.pk)
-        
-        if request.method == 'POST':
-            post_pk = comment.post.pk
-            comment.delete()
-            messages.success(request, "Comment deleted successfully!")
-            return redirect('post-detail', pk=post_pk)
-        
-        return render(request, 'blog/delete_comment.html', {'comment': comment})
-    
+    comment = get_object_or_404(Comment, pk=pk)
+    if comment.author_id != request.user.pk:
+        return comment_forbidden(request, comment, 'delete')
+
+    if request.method == 'POST':
+        post_pk = comment.post_id
+        comment.delete()
+        if wants_json(request):
+            return JsonResponse({'id': pk, 'deleted': True})
+        messages.success(request, "Comment deleted successfully!")
+        return redirect('post-detail', pk=post_pk)
+
+    return render(request, 'blog/delete_comment.html', {'comment': comment})
+
+
 class CommentCreateView(LoginRequiredMixin, CreateView):
          model = Comment
          fields = ['content']
@@ -209,44 +315,93 @@ class CommentDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
         def test_func(self):
             comment = self.get_object()
             return self.request.user == comment.author
-        
-        def search_posts(request):
-             query = request.GET.get('q')
-             results = Post.objects.all()
-             if query:
-                 results = results.filter(
-                     Q(title__icontains=query) |
-                     Q(content__icontains=query) |
-                     Q(tags__name__icontains=query)
-                  ).distinct()
-             return render(request, 'blog/search_results.html', {'results': results})
-        
-        def posts_by_tag(request, tag_name):
-            tag =  get_object_or_404(Tag, name=tag_name)
-            posts = Post.objects.filter( "blog/posts_by_tag.html", {"tag": tag, "posts": posts})
-            return render(request, 'blog/posts_by_tag.html', {'posts': posts, 'tag': tag_name})
-        
-        def search_posts(request):
-            query = request.GET.get('q', '').strip()
-            posts = Post.objects.filter(status='published')
-            if query:
-                posts = posts.filter(
-                     Q(title__icontains=query) |
-                     Q(content__icontains=query) |
-                     Q(tags__name__icontains=query)
-                ).distinct().order_by('-published_date')
-                return render(request, 'blog/search_results.html', {'posts': posts, 'query': query})
 
-             
 
+class PostByTagListView(ListView):
+    """
+    Published posts with a tag, newest first, read from the precomputed tag
+    index (blog.tagindex). The page count comes from Tag.published_post_count.
+    """
+    model = Post
+    template_name = 'blog/posts_by_tag.html'
+    context_object_name = 'posts'
+    paginate_by = 10
+
+    def get_queryset(self):
+        self.tag = get_object_or_404(Tag, name=self.kwargs['tag_name'])
+        return (Post.objects.filter(tag_entries__tag=self.tag)
+                .order_by('-tag_entries__published_date', '-tag_entries__post')
+                .only('pk', 'title'))
+
+    def get_paginator(self, queryset, per_page, orphans=0, allow_empty_first_page=True, **kwargs):
+        return KnownCountPaginator(queryset, per_page, count=self.tag.published_post_count,
+                                   orphans=orphans, allow_empty_first_page=allow_empty_first_page)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['tag'] = self.tag
+        return context
 
 
+@method_decorator(pagecache.cache_anonymous_page(lambda request, **kwargs: ['post-list', 'archive']),
+                  name='dispatch')
+class PostArchiveView(ListView):
+    """
+    Published posts of a year (/archive/2024/) or a month (/archive/2024/5/),
+    newest first. Counts come from the monthly table kept by blog.archive.
+    """
+    model = Post
+    template_name = 'blog/post_archive.html'
+    context_object_name = 'posts'
+    paginate_by = 10
 
+    def get_queryset(self):
+        self.year, self.month = self.kwargs['year'], self.kwargs.get('month')
+        if not 1 <= self.year < 9999 or self.month is not None and not 1 <= self.month <= 12:
+            raise Http404('No such archive page.')
+        self.months = archive.year_months(self.year)
+        if self.month is None:
+            start, end = archive.month_bounds(self.year, 1)[0], archive.month_bounds(self.year, 12)[1]
+            self.count = sum(entry.count for entry in self.months)
+        else:
+            start, end = archive.month_bounds(self.year, self.month)
+            self.count = sum(entry.count for entry in self.months if entry.month == self.month)
+        return (archive.published_in(start, end)
+                .order_by('-published_date', '-id')
+                .only('pk', 'title', 'excerpt', 'published_date'))
 
+    def get_paginator(self, queryset, per_page, orphans=0, allow_empty_first_page=True, **kwargs):
+        return KnownCountPaginator(queryset, per_page, count=self.count,
+                                   orphans=orphans, allow_empty_first_page=allow_empty_first_page)
 
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['year'] = self.year
+        context['month'] = None if self.month is None else archive.ArchiveMonth(self.year, self.month, self.count)
+        context['months'] = self.months
+        return context
 
 
-    
+@require_GET
+def tag_suggest(request):
+    """
+    GET /tags/suggest?prefix=dja -> most used tags starting with the prefix,
+    answered from the in-memory trie without a database query.
+    """
+    prefix = request.GET.get('prefix', '').strip()
+    try:
+        limit = min(max(int(request.GET.get('limit', 10)), 1), 50)
+    except ValueError:
+        limit = 10
+    suggestions = tagtrie.get_trie().suggest(prefix, limit) if prefix else []
+    return JsonResponse({
+        'prefix': prefix,
+        'results': [{'name': name, 'count': count} for name, count in suggestions],
+    })
 
 
+def search_posts(request):
+    query = request.GET.get('q', '').strip()
+    posts = search.search(query) if query else []
+    return render(request, 'blog/search_results.html', {'posts': posts, 'query': query})
 
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -44,6 +45,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'blog.compression.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -64,11 +66,33 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'blog.context_processors.archive_sidebar',
             ],
         },
     },
 ]
 
+# Jinja2 ports of the blog templates live in blog/jinja2/. The backend is
+# optional: set BLOG_TEMPLATE_ENGINE=jinja2 to render them first, with the
+# Django templates above as the fallback for everything else (admin, etc.).
+BLOG_JINJA2_ENGINE = {
+    'BACKEND': 'django.template.backends.jinja2.Jinja2',
+    'DIRS': [],
+    'APP_DIRS': True,
+    'OPTIONS': {
+        'environment': 'blog.jinja2env.environment',
+        'context_processors': [
+            'django.template.context_processors.request',
+            'django.contrib.auth.context_processors.auth',
+            'django.contrib.messages.context_processors.messages',
+            'blog.context_processors.archive_sidebar',
+        ],
+    },
+}
+
+if os.environ.get('BLOG_TEMPLATE_ENGINE') == 'jinja2':
+    TEMPLATES.insert(0, BLOG_JINJA2_ENGINE)
+
 WSGI_APPLICATION = 'django_blog.wsgi.application'
 
 
@@ -85,6 +109,37 @@ DATABASES = {
 }
 
 
+# Cache
+# Holds anonymous full pages (blog.pagecache), comment fragments and the tag
+# trie version. Point this at a shared backend when running several processes.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+BLOG_PAGE_CACHE_TIMEOUT = 600
+# RSS/Atom feeds: items per feed, how long rendered feeds are kept, and the
+# max-age sent to feed readers (they revalidate with ETag afterwards).
+BLOG_FEED_ITEMS = 20
+BLOG_FEED_CACHE_TIMEOUT = 3600
+BLOG_FEED_MAX_AGE = 300
+# Months listed in the archive sidebar
+BLOG_ARCHIVE_SIDEBAR_MONTHS = 12
+# URLs per sitemap file; past this /sitemap.xml becomes an index of shards
+BLOG_SITEMAP_SHARD_SIZE = 50000
+BLOG_SITEMAP_CACHE_TIMEOUT = 86400
+
+# Response compression (blog.compression): br (when Brotli is installed) or
+# gzip for pages, feeds and sitemaps of at least COMPRESSION_MIN_SIZE bytes.
+# Pages for logged-in users carry their CSRF token next to reflected input
+# (search terms, form errors), so they are sent uncompressed against BREACH;
+# anonymous pages hold no per-user secret (Django also masks the CSRF token
+# differently in every response).
+COMPRESSION_MIN_SIZE = 860
+COMPRESSION_LEVELS = {'br': 4, 'gzip': 6}
+COMPRESSION_SKIP_AUTHENTICATED = True
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
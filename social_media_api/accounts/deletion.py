@@ -0,0 +1,159 @@
+# accounts/deletion.py
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .follows import release_edges
+from .models import AccountDeletion, CustomUser, Follow
+from .workers import get_executor
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def get_steps():
+    """
+    Ordered (name, queryset factory) pairs covering everything that cascades
+    from a user. Leaves go first so no batch ever has to cascade further.
+    """
+    from notifications.models import Notification
+    from posts.models import Comment, Like, Post
+
+    return [
+        ('notifications', lambda uid: Notification.objects.filter(Q(recipient_id=uid) | Q(actor_id=uid))),
+        ('likes', lambda uid: Like.objects.filter(Q(user_id=uid) | Q(post__author_id=uid))),
+        ('comments', lambda uid: Comment.objects.filter(Q(author_id=uid) | Q(post__author_id=uid))),
+        ('posts', lambda uid: Post.objects.filter(author_id=uid)),
+        ('follows', lambda uid: Follow.objects.filter(
+            Q(from_customuser_id=uid) | Q(to_customuser_id=uid))),
+    ]
+
+
+# Extra work done on each batch, inside its transaction, before it is deleted.
+BEFORE_DELETE = {
+    # Other users' follower/following counters must drop with the edges.
+    'follows': release_edges,
+}
+
+
+def delete_in_batches(queryset, batch_size, on_batch, before_delete=None):
+    """
+    Delete the queryset's rows batch_size at a time, each batch in its own
+    short transaction. on_batch(deleted) runs inside that transaction so
+    recorded progress always matches what was committed.
+    """
+    model = queryset.model
+    while True:
+        pks = list(queryset.order_by('pk').values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return
+        with transaction.atomic():
+            batch = model.objects.filter(pk__in=pks)
+            if before_delete is not None:
+                before_delete(batch)
+            deleted, _ = batch.delete()
+            on_batch(deleted)
+
+
+def request_account_deletion(user):
+    """
+    Lock the account out immediately and create its deletion job.
+    The caller schedules the job (see schedule_account_deletion).
+    """
+    from rest_framework.authtoken.models import Token
+
+    with transaction.atomic():
+        existing = AccountDeletion.objects.filter(
+            user_id=user.pk, status__in=[AccountDeletion.PENDING, AccountDeletion.RUNNING]
+        ).first()
+        if existing is not None:
+            return existing
+        CustomUser.objects.filter(pk=user.pk).update(is_active=False)
+        Token.objects.filter(user_id=user.pk).delete()
+        return AccountDeletion.objects.create(user_id=user.pk, username=user.username)
+
+
+def claimable_jobs():
+    """
+    Jobs a runner may take: pending or failed ones, and running ones whose
+    runner stopped recording progress (it crashed or was killed).
+    """
+    stale_after = timedelta(seconds=getattr(settings, 'ACCOUNT_DELETION_STALE_AFTER', 600))
+    return AccountDeletion.objects.filter(
+        Q(status__in=[AccountDeletion.PENDING, AccountDeletion.FAILED])
+        | Q(status=AccountDeletion.RUNNING, updated_at__lt=timezone.now() - stale_after)
+    )
+
+
+def claim(job_id):
+    # A single conditional UPDATE, so two runners can never both win.
+    return bool(claimable_jobs().filter(pk=job_id).update(
+        status=AccountDeletion.RUNNING, error='', updated_at=timezone.now()))
+
+
+def run_account_deletion(job_id, batch_size=None):
+    """
+    Run (or resume) a deletion job. Every step only looks at rows that still
+    exist, so after a crash the job simply continues from its recorded step.
+    A job another runner is working on is left alone and returned as is.
+    """
+    batch_size = batch_size or getattr(settings, 'ACCOUNT_DELETION_BATCH_SIZE', DEFAULT_BATCH_SIZE)
+    if not claim(job_id):
+        return AccountDeletion.objects.get(pk=job_id)
+    job = AccountDeletion.objects.get(pk=job_id)
+
+    steps = get_steps()
+    names = [name for name, _ in steps]
+    start = names.index(job.step) if job.step in names else 0
+    try:
+        for name, queryset_for in steps[start:]:
+            job.step = name
+            job.save(update_fields=['step', 'updated_at'])
+
+            def record(deleted, name=name):
+                job.progress[name] = job.progress.get(name, 0) + deleted
+                job.save(update_fields=['progress', 'updated_at'])
+
+            delete_in_batches(queryset_for(job.user_id), batch_size, record,
+                              BEFORE_DELETE.get(name))
+
+        # Only small leftovers remain (token, admin log, group links), so the
+        # regular cascade is cheap now.
+        job.step = 'user'
+        with transaction.atomic():
+            deleted, _ = CustomUser.objects.filter(pk=job.user_id).delete()
+            job.progress['user'] = job.progress.get('user', 0) + deleted
+            job.status = AccountDeletion.DONE
+            job.finished_at = timezone.now()
+            job.save()
+    except Exception as exc:
+        logger.exception('Account deletion %s failed at step %s', job.pk, job.step)
+        job.status = AccountDeletion.FAILED
+        job.error = str(exc)
+        job.save(update_fields=['status', 'error', 'updated_at'])
+    return job
+
+
+def _run_in_worker(job_id):
+    close_old_connections()
+    try:
+        run_account_deletion(job_id)
+    finally:
+        close_old_connections()
+
+
+def schedule_account_deletion(job):
+    """
+    Run the job on the background pool after the current transaction commits.
+    Runs inline when ACCOUNT_DELETION_ASYNC is False.
+    """
+    if not getattr(settings, 'ACCOUNT_DELETION_ASYNC', True):
+        transaction.on_commit(lambda: run_account_deletion(job.pk))
+        return
+    executor = get_executor('account-deletion', 'ACCOUNT_DELETION_WORKERS', 1)
+    transaction.on_commit(lambda: executor.submit(_run_in_worker, job.pk))
@@ -0,0 +1,71 @@
+# accounts/follows.py
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from .models import CustomUser, Follow
+
+
+def follow(follower, followee):
+    """
+    Create the follow edge and bump both counters in one transaction.
+    Returns False if the edge already existed.
+    """
+    with transaction.atomic():
+        _, created = Follow.objects.get_or_create(from_customuser=follower, to_customuser=followee)
+        if created:
+            CustomUser.objects.filter(pk=follower.pk).update(following_count=F('following_count') + 1)
+            CustomUser.objects.filter(pk=followee.pk).update(follower_count=F('follower_count') + 1)
+    return created
+
+
+def unfollow(follower, followee):
+    """
+    Remove the follow edge and lower both counters in one transaction.
+    Returns False if there was nothing to remove.
+    """
+    with transaction.atomic():
+        deleted, _ = Follow.objects.filter(from_customuser=follower, to_customuser=followee).delete()
+        if deleted:
+            CustomUser.objects.filter(pk=follower.pk).update(following_count=F('following_count') - 1)
+            CustomUser.objects.filter(pk=followee.pk).update(follower_count=F('follower_count') - 1)
+    return bool(deleted)
+
+
+def release_edges(edges):
+    """
+    Lower the counters of everyone touched by the given follow edges. Call it
+    inside the transaction that deletes them.
+    """
+    for user_id, total in (edges.values_list('from_customuser').annotate(total=Count('pk'))
+                           .order_by()):
+        CustomUser.objects.filter(pk=user_id).update(following_count=F('following_count') - total)
+    for user_id, total in (edges.values_list('to_customuser').annotate(total=Count('pk'))
+                           .order_by()):
+        CustomUser.objects.filter(pk=user_id).update(follower_count=F('follower_count') - total)
+
+
+def release_user(user_id):
+    """
+    Lower the counters of everyone following or followed by a user that is
+    about to be deleted (see accounts.signals); the cascade would otherwise
+    drop the edges without touching the other side's counters.
+    """
+    release_edges(Follow.objects.filter(Q(from_customuser_id=user_id) | Q(to_customuser_id=user_id)))
+
+
+def recount(batch_size=1000):
+    """
+    Recompute every user's follower/following counts from the edges, one
+    GROUP BY per side, and fix the ones that drifted. Returns how many.
+    """
+    followers = dict(Follow.objects.values_list('to_customuser').annotate(total=Count('pk')).order_by())
+    following = dict(Follow.objects.values_list('from_customuser').annotate(total=Count('pk')).order_by())
+    drifted = []
+    users = CustomUser.objects.only('pk', 'follower_count', 'following_count').order_by('pk')
+    for user in users.iterator(chunk_size=batch_size):
+        counts = (followers.get(user.pk, 0), following.get(user.pk, 0))
+        if (user.follower_count, user.following_count) != counts:
+            user.follower_count, user.following_count = counts
+            drifted.append(user)
+    CustomUser.objects.bulk_update(drifted, ['follower_count', 'following_count'], batch_size=batch_size)
+    return len(drifted)
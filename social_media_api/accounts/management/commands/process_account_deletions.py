@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from accounts.deletion import claimable_jobs, run_account_deletion
+
+
+class Command(BaseCommand):
+    help = ("Run or resume unfinished account deletion jobs (e.g. after a crash). Jobs "
+            "another runner is still working on are skipped.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('job_ids', nargs='*', help="Only these jobs (default: all unfinished).")
+        parser.add_argument('--batch-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        jobs = claimable_jobs().order_by('created_at')
+        if options['job_ids']:
+            jobs = jobs.filter(pk__in=options['job_ids'])
+        for job_id in jobs.values_list('pk', flat=True):
+            job = run_account_deletion(job_id, batch_size=options['batch_size'])
+            self.stdout.write(f"{job.pk} {job.username}: {job.status} {job.progress}")
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from accounts.follows import recount
+
+
+class Command(BaseCommand):
+    help = ("Recompute follower/following counters from the follow edges and fix the "
+            "ones that drifted (e.g. after raw SQL or QuerySet.delete() on follows). "
+            "Run it periodically, e.g. nightly from cron.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        fixed = recount(batch_size=options['batch_size'])
+        self.stdout.write(f"follow counters: {fixed} corrected")
@@ -0,0 +1,65 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def backfill_counts(apps, schema_editor):
+    CustomUser = apps.get_model('accounts', 'CustomUser')
+    Follow = apps.get_model('accounts', 'Follow')
+    for user_id, total in Follow.objects.values_list('to_customuser').annotate(total=Count('pk')).order_by():
+        CustomUser.objects.filter(pk=user_id).update(follower_count=total)
+    for user_id, total in Follow.objects.values_list('from_customuser').annotate(total=Count('pk')).order_by():
+        CustomUser.objects.filter(pk=user_id).update(following_count=total)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0004_accountdeletion'),
+    ]
+
+    operations = [
+        # The existing auto-created M2M table becomes the explicit Follow model;
+        # nothing changes in the database apart from the new indexes below.
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='Follow',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('from_customuser', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                        ('to_customuser', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                    ],
+                    options={
+                        'db_table': 'accounts_customuser_following',
+                        'unique_together': {('from_customuser', 'to_customuser')},
+                    },
+                ),
+                migrations.AlterField(
+                    model_name='customuser',
+                    name='following',
+                    field=models.ManyToManyField(blank=True, related_name='followers', through='accounts.Follow', to=settings.AUTH_USER_MODEL),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='follow',
+            index=models.Index(fields=['to_customuser', 'id', 'from_customuser'], name='follow_followers_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='follow',
+            index=models.Index(fields=['from_customuser', 'id', 'to_customuser'], name='follow_following_idx'),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='follower_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='following_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counts, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,70 @@
+import uuid
+
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 
 class CustomUser(AbstractUser):
     bio = models.TextField(blank=True, null=True)
     profile_picture = models.ImageField(upload_to='profile_pics/', blank=True, null=True)
-    following = models.ManyToManyField("self", symmetrical=False, related_name="followers", blank=True)
+    # size name -> thumbnail storage name, filled in by accounts.thumbnails
+    profile_picture_variants = models.JSONField(default=dict, blank=True, editable=False)
+    following = models.ManyToManyField("self", symmetrical=False, related_name="followers", blank=True,
+                                       through="Follow")
+    # Denormalized sizes of the two sides of `following`; kept in step by accounts.follows
+    follower_count = models.PositiveIntegerField(default=0)
+    following_count = models.PositiveIntegerField(default=0)
 
     def __str__(self):
         return self.username
+
+
+class Follow(models.Model):
+    """
+    Through table for CustomUser.following (from_customuser follows to_customuser).
+    Keeps the table Django created for the plain M2M; the composite indexes let
+    follower/following pages be read from the index alone, newest first.
+    """
+    from_customuser = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name="+")
+    to_customuser = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name="+")
+
+    class Meta:
+        db_table = "accounts_customuser_following"
+        unique_together = ("from_customuser", "to_customuser")
+        indexes = [
+            models.Index(fields=["to_customuser", "id", "from_customuser"], name="follow_followers_idx"),
+            models.Index(fields=["from_customuser", "id", "to_customuser"], name="follow_following_idx"),
+        ]
+
+
+class AccountDeletion(models.Model):
+    """
+    Background job that removes a user and everything that depends on them in
+    small batches (see accounts.deletion). The user id is stored as a plain
+    integer because the user row is gone once the job finishes.
+    """
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    )
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user_id = models.BigIntegerField(db_index=True)
+    username = models.CharField(max_length=150)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    step = models.CharField(max_length=50, blank=True)
+    # step name -> rows deleted so far
+    progress = models.JSONField(default=dict, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    finished_at = models.DateTimeField(blank=True, null=True)
+
+    def __str__(self):
+        return f"Deletion of {self.username} ({self.status})"
+
@@ -0,0 +1,13 @@
+# accounts/pagination.py
+from rest_framework.pagination import CursorPagination
+
+
+class FollowCursorPagination(CursorPagination):
+    """
+    Keyset pagination over Follow rows: each page is "id < cursor ORDER BY id DESC",
+    served by the (user, id, other user) indexes on the follow table.
+    """
+    ordering = '-id'
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
@@ -1,12 +1,30 @@
 # accounts/serializers.py
 from rest_framework import serializers
 from django.contrib.auth import authenticate, get_user_model
+from django.urls import reverse
 from rest_framework.authtoken.models import Token
+from .models import AccountDeletion, Follow
 
 class UserSerializer(serializers.ModelSerializer):
+    # Resized avatars (size name -> URL); empty until the worker has processed the upload.
+    profile_picture_variants = serializers.SerializerMethodField()
+
     class Meta:
         model = get_user_model()
-        fields = ['id', 'username', 'email', 'bio', 'profile_picture', ]
+        fields = ['id', 'username', 'email', 'bio', 'profile_picture', 'profile_picture_variants',
+                  'follower_count', 'following_count']
+        read_only_fields = ['follower_count', 'following_count']
+
+    def get_profile_picture_variants(self, obj):
+        variants = dict(obj.profile_picture_variants or {})
+        if variants.pop('source', None) != obj.profile_picture.name:
+            return {}
+        request = self.context.get('request')
+        urls = {}
+        for size_name, name in variants.items():
+            url = reverse('profile-thumbnail', kwargs={'filename': name.rsplit('/', 1)[-1]})
+            urls[size_name] = request.build_absolute_uri(url) if request else url
+        return urls
 
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
@@ -33,3 +51,29 @@ class LoginSerializer(serializers.Serializer):
         if user and user.is_active:
             return user
         raise serializers.ValidationError("Invalid credentials")
+
+
+class AccountDeletionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = AccountDeletion
+        fields = ['id', 'username', 'status', 'step', 'progress', 'error',
+                  'created_at', 'updated_at', 'finished_at']
+
+
+class FollowerSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source='from_customuser.id')
+    username = serializers.CharField(source='from_customuser.username')
+
+    class Meta:
+        model = Follow
+        fields = ['id', 'username']
+
+
+class FollowingSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(source='to_customuser.id')
+    username = serializers.CharField(source='to_customuser.username')
+
+    class Meta:
+        model = Follow
+        fields = ['id', 'username']
+
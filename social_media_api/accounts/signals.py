@@ -0,0 +1,31 @@
+# accounts/signals.py
+from django.db import transaction
+from django.db.models.signals import post_save, pre_delete
+from django.dispatch import receiver
+
+from .follows import release_user
+from .models import CustomUser
+from .thumbnails import schedule_profile_picture
+
+
+@receiver(post_save, sender=CustomUser)
+def queue_profile_picture_thumbnails(sender, instance, **kwargs):
+    """
+    Build avatar sizes whenever the stored picture differs from the one the
+    current variants were made from. Runs after commit so the worker sees the row.
+    """
+    picture = instance.profile_picture
+    if not picture:
+        if instance.profile_picture_variants:
+            sender.objects.filter(pk=instance.pk).update(profile_picture_variants={})
+            instance.profile_picture_variants = {}
+        return
+    if instance.profile_picture_variants.get('source') == picture.name:
+        return
+    transaction.on_commit(lambda: schedule_profile_picture(instance))
+
+
+@receiver(pre_delete, sender=CustomUser)
+def release_follow_counts(sender, instance, **kwargs):
+    # Runs in the delete's transaction, before the cascade removes the edges.
+    release_user(instance.pk)
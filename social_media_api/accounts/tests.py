@@ -1,3 +1,204 @@
-from django.test import TestCase
+import io
+import shutil
+import tempfile
+from datetime import timedelta
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from notifications.models import Notification
+from posts.models import Comment, Like, Post
+from .deletion import run_account_deletion
+from .follows import follow
+from .models import AccountDeletion, CustomUser
+from .serializers import UserSerializer
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def make_image(size=(600, 400), color='red'):
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, format='PNG')
+    return SimpleUploadedFile('avatar.png', buffer.getvalue(), content_type='image/png')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, PROFILE_PICTURE_ASYNC=False,
+                   PROFILE_PICTURE_SIZES={'small': 32, 'large': 96})
+class ProfilePictureThumbnailTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def upload(self, user):
+        with self.captureOnCommitCallbacks(execute=True):
+            user.profile_picture = make_image()
+            user.save()
+        user.refresh_from_db()
+
+    def test_upload_builds_every_size(self):
+        user = CustomUser.objects.create_user(username='ada', password='pass12345')
+        self.upload(user)
+
+        variants = UserSerializer(user).data['profile_picture_variants']
+        self.assertEqual(set(variants), {'small', 'large'})
+
+        from PIL import Image
+        response = self.client.get(variants['small'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        self.assertIn('immutable', response['Cache-Control'])
+        image = Image.open(io.BytesIO(b''.join(response.streaming_content)))
+        self.assertEqual(image.size, (32, 32))
+
+    def test_identical_uploads_share_thumbnails(self):
+        first = CustomUser.objects.create_user(username='ada', password='pass12345')
+        second = CustomUser.objects.create_user(username='grace', password='pass12345')
+        self.upload(first)
+        self.upload(second)
+
+        first_sizes = dict(first.profile_picture_variants, source=None)
+        second_sizes = dict(second.profile_picture_variants, source=None)
+        self.assertEqual(first_sizes, second_sizes)
+
+    def test_unknown_thumbnail_is_404(self):
+        url = reverse('profile-thumbnail', kwargs={'filename': 'not-a-hash.webp'})
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+
+@override_settings(ACCOUNT_DELETION_ASYNC=False)
+class AccountDeletionTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='ada', password='pass12345')
+        self.other = CustomUser.objects.create_user(username='grace', password='pass12345')
+        self.token = Token.objects.create(user=self.user)
+        follow(self.user, self.other)
+        follow(self.other, self.user)
+        posts = [Post.objects.create(author=self.user, title=f'p{i}', content='x') for i in range(5)]
+        self.kept = Post.objects.create(author=self.other, title='kept', content='x')
+        for post in posts:
+            Like.objects.create(user=self.other, post=post)
+            Comment.objects.create(author=self.other, post=post)
+        Like.objects.create(user=self.user, post=self.kept)
+        Notification.objects.create(
+            recipient=self.other, actor=self.user, verb='liked your post',
+            target_content_type=ContentType.objects.get_for_model(Post),
+            target_object_id=self.kept.pk,
+        )
+
+    def test_delete_account_removes_everything_in_batches(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete('/api/accounts/me/',
+                                          HTTP_AUTHORIZATION=f'Token {self.token.key}')
+        self.assertEqual(response.status_code, 202)
+
+        job = AccountDeletion.objects.get(pk=response.data['id'])
+        self.assertEqual(job.status, AccountDeletion.DONE)
+        self.assertEqual(job.progress['posts'], 5)
+        self.assertEqual(job.progress['likes'], 6)
+        self.assertEqual(job.progress['follows'], 2)
+        self.assertFalse(CustomUser.objects.filter(pk=self.user.pk).exists())
+        self.assertEqual(list(Post.objects.all()), [self.kept])
+        self.assertFalse(Like.objects.exists())
+        self.assertFalse(Notification.objects.exists())
+        self.other.refresh_from_db()
+        self.assertEqual((self.other.follower_count, self.other.following_count), (0, 0))
+
+        self.assertEqual(self.client.get(f'/api/accounts/deletions/{job.pk}/').status_code, 401)
+        admin = CustomUser.objects.create_superuser(username='root', password='pass12345')
+        status_response = self.client.get(f'/api/accounts/deletions/{job.pk}/',
+                                          HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=admin).key}')
+        self.assertEqual(status_response.data['status'], 'done')
+
+    def test_interrupted_job_resumes_from_its_step(self):
+        job = AccountDeletion.objects.create(
+            user_id=self.user.pk, username='ada', status=AccountDeletion.RUNNING,
+            step='posts', progress={'notifications': 1, 'likes': 6, 'comments': 5},
+        )
+        # Its runner died an hour ago.
+        AccountDeletion.objects.filter(pk=job.pk).update(updated_at=timezone.now() - timedelta(hours=1))
+        Like.objects.all().delete()
+        Comment.objects.all().delete()
+
+        job = run_account_deletion(job.pk, batch_size=2)
+
+        self.assertEqual(job.status, AccountDeletion.DONE)
+        self.assertEqual(job.progress['posts'], 5)
+        self.assertFalse(CustomUser.objects.filter(pk=self.user.pk).exists())
+
+    def test_job_held_by_another_runner_is_skipped(self):
+        job = AccountDeletion.objects.create(user_id=self.user.pk, username='ada',
+                                             status=AccountDeletion.RUNNING, step='likes')
+        call_command('process_account_deletions', stdout=io.StringIO())
+        self.assertEqual(run_account_deletion(job.pk).status, AccountDeletion.RUNNING)
+        self.assertTrue(Post.objects.filter(author=self.user).exists())
+        self.assertEqual(AccountDeletion.objects.get(pk=job.pk).progress, {})
+
+
+class FollowTests(TestCase):
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='ada', password='pass12345')
+        self.token = Token.objects.create(user=self.user)
+        self.auth = {'HTTP_AUTHORIZATION': f'Token {self.token.key}'}
+        self.others = [CustomUser.objects.create_user(username=f'user{i}', password='pass12345')
+                       for i in range(5)]
+
+    def test_follow_and_unfollow_keep_counts(self):
+        target = self.others[0]
+        for _ in range(2):
+            self.client.post(f'/api/accounts/follow/{target.pk}/', **self.auth)
+        self.user.refresh_from_db()
+        target.refresh_from_db()
+        self.assertEqual(self.user.following_count, 1)
+        self.assertEqual(target.follower_count, 1)
+
+        for _ in range(2):
+            self.client.post(f'/api/accounts/unfollow/{target.pk}/', **self.auth)
+        self.user.refresh_from_db()
+        target.refresh_from_db()
+        self.assertEqual(self.user.following_count, 0)
+        self.assertEqual(target.follower_count, 0)
+
+    def counts(self, user):
+        user.refresh_from_db()
+        return user.follower_count, user.following_count
+
+    def test_deleting_a_user_releases_the_other_side(self):
+        follow(self.user, self.others[0])
+        follow(self.others[0], self.user)
+        follow(self.others[1], self.others[0])
+        CustomUser.objects.filter(pk=self.others[1].pk).delete()
+        self.user.delete()
+        self.assertEqual(self.counts(self.others[0]), (0, 0))
+
+    def test_recount_repairs_drift(self):
+        follow(self.user, self.others[0])
+        CustomUser.objects.filter(pk=self.others[1].pk).update(follower_count=7)
+        out = io.StringIO()
+        call_command('recount_follows', stdout=out)
+        self.assertIn('1 corrected', out.getvalue())
+        self.assertEqual(self.counts(self.others[1]), (0, 0))
+        self.assertEqual(self.counts(self.others[0]), (1, 0))
+
+    def test_follower_list_pages_newest_first(self):
+        for other in self.others:
+            follow(other, self.user)
+
+        response = self.client.get(f'/api/accounts/{self.user.pk}/followers/?page_size=3')
+        self.assertEqual([row['username'] for row in response.data['results']],
+                         ['user4', 'user3', 'user2'])
+        with self.assertNumQueries(2):
+            response = self.client.get(response.data['next'])
+        self.assertEqual([row['username'] for row in response.data['results']], ['user1', 'user0'])
+        self.assertIsNone(response.data['next'])
+
+        response = self.client.get(f'/api/accounts/{self.others[0].pk}/following/')
+        self.assertEqual([row['id'] for row in response.data['results']], [self.user.pk])
 
-# Create your tests here.
@@ -0,0 +1,120 @@
+# accounts/thumbnails.py
+import hashlib
+import io
+import logging
+import re
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections
+
+from .workers import get_executor
+
+logger = logging.getLogger(__name__)
+
+# Square avatar sizes (in pixels) generated for every profile picture.
+DEFAULT_SIZES = {
+    'small': 64,
+    'medium': 160,
+    'large': 320,
+}
+
+THUMBNAIL_FORMAT = 'WEBP'
+THUMBNAIL_EXTENSION = 'webp'
+THUMBNAIL_DIR = 'profile_pics/thumbs'
+THUMBNAIL_NAME_RE = re.compile(r'[0-9a-f]{32}\.' + THUMBNAIL_EXTENSION)
+
+
+def get_sizes():
+    return getattr(settings, 'PROFILE_PICTURE_SIZES', DEFAULT_SIZES)
+
+
+def render_thumbnail(image, edge):
+    """
+    Crop the image to a centred square and resize it to edge x edge pixels.
+    Returns the encoded bytes.
+    """
+    from PIL import Image, ImageOps
+
+    thumb = ImageOps.fit(image, (edge, edge), method=Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    thumb.save(buffer, format=THUMBNAIL_FORMAT, quality=80, method=4)
+    return buffer.getvalue()
+
+
+def store_thumbnail(data):
+    """
+    Save the bytes under a content-hash filename and return the storage name.
+    Identical content always maps to the same name, so existing files are reused.
+    """
+    digest = hashlib.sha256(data).hexdigest()[:32]
+    name = f'{THUMBNAIL_DIR}/{digest}.{THUMBNAIL_EXTENSION}'
+    if not default_storage.exists(name):
+        saved = default_storage.save(name, ContentFile(data))
+        if saved != name:
+            # Another worker stored the same bytes first; keep the canonical name.
+            default_storage.delete(saved)
+    return name
+
+
+def build_variants(field_file):
+    """
+    Generate every configured size for an uploaded image.
+    Returns a dict mapping size name -> storage name.
+    """
+    from PIL import Image, ImageOps
+
+    field_file.open('rb')
+    try:
+        with Image.open(field_file) as image:
+            image = ImageOps.exif_transpose(image)
+            if image.mode not in ('RGB', 'RGBA'):
+                image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+            return {
+                size_name: store_thumbnail(render_thumbnail(image, edge))
+                for size_name, edge in get_sizes().items()
+            }
+    finally:
+        field_file.close()
+
+
+def process_profile_picture(user_id, source_name):
+    """
+    Build the variants for a user's picture and record them on the user.
+    Skips the work if the picture changed again before the job ran.
+    """
+    from .models import CustomUser
+
+    user = CustomUser.objects.filter(pk=user_id).first()
+    if user is None or user.profile_picture.name != source_name:
+        return
+    variants = build_variants(user.profile_picture)
+    variants['source'] = source_name
+    # update() rather than save() so post_save does not schedule us again.
+    CustomUser.objects.filter(pk=user_id, profile_picture=source_name).update(
+        profile_picture_variants=variants
+    )
+
+
+def _run_in_worker(user_id, source_name):
+    close_old_connections()
+    try:
+        process_profile_picture(user_id, source_name)
+    except Exception:
+        logger.exception('Failed to build thumbnails for user %s', user_id)
+    finally:
+        close_old_connections()
+
+
+def schedule_profile_picture(user):
+    """
+    Queue thumbnail generation for the user's current picture.
+    Runs inline when PROFILE_PICTURE_ASYNC is False (handy in tests).
+    """
+    source_name = user.profile_picture.name
+    if not getattr(settings, 'PROFILE_PICTURE_ASYNC', True):
+        process_profile_picture(user.pk, source_name)
+        return None
+    executor = get_executor('thumbnails', 'PROFILE_PICTURE_WORKERS', 2)
+    return executor.submit(_run_in_worker, user.pk, source_name)
@@ -1,11 +1,19 @@
 from django.urls import path, include
 from .views import RegisterView, LoginView
 from .views import FollowUserView, UnfollowUserView
+from .views import profile_thumbnail
+from .views import DeleteAccountView, AccountDeletionStatusView
+from .views import FollowerListView, FollowingListView
 
 urlpatterns = [
     path('register/', RegisterView.as_view(), name='register'),
     path('login/', LoginView.as_view(), name='login'),
     path("follow/<int:user_id>/", FollowUserView.as_view(), name="follow-user"),
     path("unfollow/<int:user_id>/", UnfollowUserView.as_view(), name="unfollow-user"),
+    path("thumbnails/<str:filename>", profile_thumbnail, name="profile-thumbnail"),
+    path("<int:user_id>/followers/", FollowerListView.as_view(), name="user-followers"),
+    path("<int:user_id>/following/", FollowingListView.as_view(), name="user-following"),
+    path("me/", DeleteAccountView.as_view(), name="delete-account"),
+    path("deletions/<uuid:pk>/", AccountDeletionStatusView.as_view(), name="account-deletion"),
     
 ]
@@ -4,9 +4,19 @@ from rest_framework.response import Response
 from rest_framework import status, permissions
 from rest_framework.authtoken.models import Token
 from .serializers import RegisterSerializer, LoginSerializer, UserSerializer
+from .serializers import AccountDeletionSerializer, FollowerSerializer, FollowingSerializer
+from .pagination import FollowCursorPagination
 from rest_framework.permissions import IsAuthenticated
 from django.shortcuts import get_object_or_404
-from .models import CustomUser
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_safe
+from .models import CustomUser, AccountDeletion, Follow
+from .follows import follow, unfollow
+from .deletion import request_account_deletion, schedule_account_deletion
+from posts.throttling import WRITE_THROTTLE_CLASSES
+from .thumbnails import THUMBNAIL_DIR, THUMBNAIL_NAME_RE
 
 
 class RegisterView(generics.CreateAPIView):
@@ -35,10 +45,12 @@ class LoginView(APIView):
 
 class FollowUserView(generics.GenericAPIView):
     permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = WRITE_THROTTLE_CLASSES
+    throttle_scope = 'follows'
 
     def post(self, request, user_id):
         user_to_follow = get_object_or_404(CustomUser, id=user_id)
-        request.user.following.add(user_to_follow)
+        follow(request.user, user_to_follow)
         return Response({"detail": f"You are now following {user_to_follow.username}"},
                         status=status.HTTP_200_OK)
 
@@ -47,8 +59,75 @@ class UnfollowUserView(generics.GenericAPIView):
 
     def post(self, request, user_id):
         user_to_unfollow = get_object_or_404(CustomUser, id=user_id)
-        request.user.following.remove(user_to_unfollow)
+        unfollow(request.user, user_to_unfollow)
         return Response({"detail": f"You have unfollowed {user_to_unfollow.username}"},
                         status=status.HTTP_200_OK)
-        
-        
+
+
+class FollowerListView(generics.ListAPIView):
+    """
+    GET /api/accounts/<user_id>/followers/ (newest first)
+    Pages through the follow table with a cursor, so deep pages cost the same
+    as the first one.
+    """
+    serializer_class = FollowerSerializer
+    pagination_class = FollowCursorPagination
+    filter_backends = []
+
+    def get_queryset(self):
+        user = get_object_or_404(CustomUser.objects.only('pk'), id=self.kwargs['user_id'])
+        return (Follow.objects.filter(to_customuser=user)
+                .select_related('from_customuser')
+                .only('id', 'from_customuser__id', 'from_customuser__username'))
+
+
+class FollowingListView(generics.ListAPIView):
+    """
+    GET /api/accounts/<user_id>/following/ (newest first)
+    """
+    serializer_class = FollowingSerializer
+    pagination_class = FollowCursorPagination
+    filter_backends = []
+
+    def get_queryset(self):
+        user = get_object_or_404(CustomUser.objects.only('pk'), id=self.kwargs['user_id'])
+        return (Follow.objects.filter(from_customuser=user)
+                .select_related('to_customuser')
+                .only('id', 'to_customuser__id', 'to_customuser__username'))
+
+
+class DeleteAccountView(APIView):
+    """
+    DELETE /api/accounts/me/
+
+    Deactivates the account at once and removes its data in the background.
+    Returns the job; staff can follow it at /api/accounts/deletions/<id>/.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def delete(self, request):
+        job = request_account_deletion(request.user)
+        schedule_account_deletion(job)
+        return Response(AccountDeletionSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+
+class AccountDeletionStatusView(generics.RetrieveAPIView):
+    # Staff only: the job names the account and any error it hit, and the
+    # account itself can no longer log in.
+    queryset = AccountDeletion.objects.all()
+    serializer_class = AccountDeletionSerializer
+    permission_classes = [permissions.IsAdminUser]
+
+
+@require_safe
+def profile_thumbnail(request, filename):
+    """
+    Serve a generated avatar. Names are content hashes, so the response never
+    changes and clients may cache it forever.
+    """
+    name = f'{THUMBNAIL_DIR}/{filename}'
+    if not THUMBNAIL_NAME_RE.fullmatch(filename) or not default_storage.exists(name):
+        raise Http404('Thumbnail not found.')
+    response = FileResponse(default_storage.open(name, 'rb'), content_type='image/webp')
+    patch_cache_control(response, public=True, max_age=31536000, immutable=True)
+    return response
@@ -0,0 +1,19 @@
+# accounts/workers.py
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+
+_executors = {}
+
+
+def get_executor(name, setting, default_workers):
+    """
+    Return the named worker pool, creating it on first use.
+    Its size comes from the given setting (falling back to default_workers).
+    """
+    if name not in _executors:
+        _executors[name] = ThreadPoolExecutor(
+            max_workers=getattr(settings, setting, default_workers),
+            thread_name_prefix=name,
+        )
+    return _executors[name]
@@ -0,0 +1,153 @@
+# notifications/broker.py
+import asyncio
+import json
+import logging
+import select
+import threading
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """
+    One connected stream. Events are pushed from any thread onto a bounded
+    asyncio queue owned by the stream's event loop.
+
+    If the consumer falls behind and the queue fills up, the subscription is
+    marked as overflowed instead of buffering without limit; the stream then
+    closes and the client resumes with Last-Event-ID.
+    """
+    def __init__(self, recipient_id, maxsize):
+        self.recipient_id = recipient_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def deliver(self, event):
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # The stream's loop has already shut down.
+            pass
+
+    def _put(self, event):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # The consumer checks this after every event and closes the stream.
+            self.overflowed = True
+
+
+class InMemoryBroker:
+    """
+    Publish/subscribe within a single process. Enough for one ASGI worker;
+    multi-worker deployments need a backend that fans out between processes.
+    """
+    def __init__(self, queue_size=None):
+        self.queue_size = queue_size or getattr(settings, 'NOTIFICATIONS_STREAM_QUEUE_SIZE', 100)
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, recipient_id):
+        subscription = Subscription(recipient_id, self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(recipient_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.recipient_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.recipient_id]
+
+    def publish(self, recipient_id, event):
+        self.dispatch(recipient_id, event)
+
+    def dispatch(self, recipient_id, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(recipient_id, ()))
+        for subscription in subscribers:
+            subscription.deliver(event)
+
+
+class PostgresBroker(InMemoryBroker):
+    """
+    Fans events out between worker processes with PostgreSQL LISTEN/NOTIFY.
+
+    publish() sends a NOTIFY on the default database; every process runs one
+    listener thread on its own connection and hands what it receives to its
+    local subscribers. Written against psycopg2; payloads must stay under
+    PostgreSQL's 8000 byte limit.
+    """
+    channel = 'notifications_stream'
+
+    def __init__(self, queue_size=None):
+        super().__init__(queue_size)
+        self._listener = None
+
+    def subscribe(self, recipient_id):
+        self.start_listener()
+        return super().subscribe(recipient_id)
+
+    def publish(self, recipient_id, event):
+        from django.db import connection
+
+        payload = json.dumps({'recipient_id': recipient_id, 'event': event})
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_notify(%s, %s)', [self.channel, payload])
+
+    def start_listener(self):
+        with self._lock:
+            if self._listener is not None and self._listener.is_alive():
+                return
+            self._listener = threading.Thread(
+                target=self.listen, name='notifications-listener', daemon=True
+            )
+            self._listener.start()
+
+    def listen(self):
+        from django.db import connections
+
+        db = connections.create_connection('default')
+        try:
+            db.ensure_connection()
+            db.set_autocommit(True)
+            raw = db.connection
+            with raw.cursor() as cursor:
+                cursor.execute(f'LISTEN {self.channel}')
+            while True:
+                if select.select([raw], [], [], 30) == ([], [], []):
+                    continue
+                raw.poll()
+                while raw.notifies:
+                    notify = raw.notifies.pop(0)
+                    try:
+                        message = json.loads(notify.payload)
+                        self.dispatch(message['recipient_id'], message['event'])
+                    except (ValueError, KeyError):
+                        logger.warning('Ignoring malformed notification payload')
+        except Exception:
+            logger.exception('Notification listener stopped')
+        finally:
+            db.close()
+
+
+_broker = None
+
+
+def get_broker():
+    """
+    Return the process-wide broker configured by NOTIFICATIONS_BROKER.
+    """
+    global _broker
+    if _broker is None:
+        backend = getattr(settings, 'NOTIFICATIONS_BROKER', 'notifications.broker.InMemoryBroker')
+        _broker = import_string(backend)()
+    return _broker
@@ -2,6 +2,13 @@ from rest_framework import serializers
 from .models import Notification
 
 class NotificationSerializer(serializers.ModelSerializer):
+    is_read = serializers.BooleanField(source='read', read_only=True)
+    target = serializers.SerializerMethodField()
+
     class Meta:
         model = Notification
-        fields = ['id', 'recipient', 'actor', 'verb', 'target', 'timestamp', 'is_read']
\ No newline at end of file
+        fields = ['id', 'recipient', 'actor', 'verb', 'target', 'timestamp', 'is_read']
+
+    def get_target(self, obj):
+        # Type and id only, so serializing a list never loads each target row.
+        return {'type': obj.target_content_type.model, 'id': obj.target_object_id}
@@ -0,0 +1,23 @@
+# notifications/signals.py
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from .broker import get_broker
+from .models import Notification
+from .serializers import NotificationSerializer
+
+
+@receiver(post_save, sender=Notification)
+def publish_notification(sender, instance, created, **kwargs):
+    """
+    Push new notifications to the recipient's open streams once committed.
+    """
+    if not created:
+        return
+
+    def publish():
+        event = NotificationSerializer(instance).data
+        get_broker().publish(instance.recipient_id, dict(event))
+
+    transaction.on_commit(publish)
@@ -1,3 +1,89 @@
-from django.test import TestCase
+import asyncio
+import json
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib.contenttypes.models import ContentType
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.authtoken.models import Token
+
+from accounts.models import CustomUser
+from .broker import InMemoryBroker
+from .models import Notification
+from .views import stream_events
+
+
+class InMemoryBrokerTests(SimpleTestCase):
+    async def test_publish_reaches_only_the_recipient(self):
+        broker = InMemoryBroker(queue_size=10)
+        mine = broker.subscribe(1)
+        other = broker.subscribe(2)
+        broker.publish(1, {'id': 7})
+        self.assertEqual(await asyncio.wait_for(mine.queue.get(), 1), {'id': 7})
+        self.assertTrue(other.queue.empty())
+
+    async def test_slow_consumer_overflows_instead_of_buffering(self):
+        broker = InMemoryBroker(queue_size=2)
+        subscription = broker.subscribe(1)
+        for event_id in range(5):
+            broker.publish(1, {'id': event_id})
+        await asyncio.sleep(0)
+        self.assertTrue(subscription.overflowed)
+        self.assertEqual(subscription.queue.qsize(), 2)
+
+
+@override_settings(NOTIFICATIONS_STREAM_HEARTBEAT=0.05)
+class NotificationStreamTests(TestCase):
+    def setUp(self):
+        self.recipient = CustomUser.objects.create_user(username='ada', password='pass12345')
+        self.actor = CustomUser.objects.create_user(username='grace', password='pass12345')
+        self.token = Token.objects.create(user=self.recipient)
+
+    def notify(self):
+        return Notification.objects.create(
+            recipient=self.recipient, actor=self.actor, verb='followed you',
+            target_content_type=ContentType.objects.get_for_model(CustomUser),
+            target_object_id=self.actor.pk,
+        )
+
+    def test_requires_authentication(self):
+        response = self.client.get('/api/notifications/stream/')
+        self.assertEqual(response.status_code, 401)
+
+    async def test_stream_is_sent_uncompressed(self):
+        response = await self.async_client.get(
+            '/api/notifications/stream/',
+            headers={'Authorization': f'Token {self.token.key}', 'Accept-Encoding': 'gzip, br'},
+        )
+        try:
+            self.assertEqual(response['Content-Type'], 'text/event-stream')
+            self.assertFalse(response.has_header('Content-Encoding'))
+            self.assertTrue((await anext(aiter(response.streaming_content))).startswith(b'retry:'))
+        finally:
+            await response.streaming_content.aclose()
+
+    async def test_resume_replays_missed_notifications(self):
+        first = await sync_to_async(self.notify)()
+        second = await sync_to_async(self.notify)()
+        events = stream_events(self.recipient.pk, first.pk - 1)
+        try:
+            self.assertTrue((await anext(events)).startswith(b'retry:'))
+            replayed = [await anext(events), await anext(events)]
+            self.assertEqual(await anext(events), b': heartbeat\n\n')
+        finally:
+            await events.aclose()
+        self.assertTrue(replayed[0].startswith(f'id: {first.pk}\n'.encode()))
+        data = replayed[1].decode().split('data: ', 1)[1]
+        self.assertEqual(json.loads(data)['id'], second.pk)
+
+    @override_settings(NOTIFICATIONS_STREAM_REPLAY_LIMIT=2)
+    async def test_resume_replays_more_than_one_page(self):
+        created = [await sync_to_async(self.notify)() for _ in range(5)]
+        events = stream_events(self.recipient.pk, created[0].pk - 1)
+        try:
+            await anext(events)  # retry
+            replayed = [await anext(events) for _ in range(5)]
+            self.assertEqual(await anext(events), b': heartbeat\n\n')
+        finally:
+            await events.aclose()
+        self.assertEqual([event.split(b'\n', 1)[0] for event in replayed],
+                         [f'id: {notification.pk}'.encode() for notification in created])
@@ -1,6 +1,7 @@
 from django.urls import path
-from .views import NotificationListView
+from .views import NotificationListView, notification_stream
 
 urlpatterns = [
     path('', NotificationListView.as_view(), name='notifications'),
+    path('stream/', notification_stream, name='notification-stream'),
 ]
\ No newline at end of file
@@ -1,3 +1,129 @@
-from django.shortcuts import render
+import asyncio
+import json
 
-# Create your views here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+from rest_framework import generics, permissions
+from rest_framework.authtoken.models import Token
+
+from .broker import get_broker
+from .models import Notification
+from .serializers import NotificationSerializer
+
+
+class NotificationListView(generics.ListAPIView):
+    serializer_class = NotificationSerializer
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_queryset(self):
+        return (Notification.objects.filter(recipient=self.request.user)
+                .select_related('target_content_type')
+                .order_by('-timestamp'))
+
+
+def format_event(event_id=None, event=None, data=None, retry=None):
+    """
+    Encode one Server-Sent Events message.
+    """
+    lines = []
+    if retry is not None:
+        lines.append(f'retry: {retry}')
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    if event is not None:
+        lines.append(f'event: {event}')
+    if data is not None:
+        lines.extend(f'data: {line}' for line in json.dumps(data).splitlines())
+    return ('\n'.join(lines) + '\n\n').encode()
+
+
+async def get_stream_user(request):
+    """
+    Accept the API's token header, falling back to the session for browser
+    EventSource clients that cannot set headers.
+    """
+    header = request.headers.get('Authorization', '')
+    if header.startswith('Token '):
+        token = await (Token.objects.select_related('user')
+                       .filter(key=header[len('Token '):].strip()).afirst())
+        if token is not None and token.user.is_active:
+            return token.user
+        return None
+    user = await request.auser()
+    return user if user.is_authenticated else None
+
+
+def parse_last_event_id(request):
+    value = request.headers.get('Last-Event-ID') or request.GET.get('last_event_id')
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+@sync_to_async
+def missed_notifications(recipient_id, last_id, limit):
+    queryset = (Notification.objects.filter(recipient_id=recipient_id, pk__gt=last_id)
+                .select_related('target_content_type').order_by('pk')[:limit])
+    return [NotificationSerializer(notification).data for notification in queryset]
+
+
+async def stream_events(recipient_id, last_id):
+    broker = get_broker()
+    heartbeat = getattr(settings, 'NOTIFICATIONS_STREAM_HEARTBEAT', 15)
+    replay_limit = getattr(settings, 'NOTIFICATIONS_STREAM_REPLAY_LIMIT', 100)
+    # Subscribe before replaying so nothing created in between is lost;
+    # duplicates are dropped by comparing ids below.
+    subscription = broker.subscribe(recipient_id)
+    try:
+        yield format_event(retry=getattr(settings, 'NOTIFICATIONS_STREAM_RETRY_MS', 3000))
+        # Replay in pages of replay_limit rows until the backlog is drained.
+        while last_id is not None:
+            missed = await missed_notifications(recipient_id, last_id, replay_limit)
+            for data in missed:
+                last_id = data['id']
+                yield format_event(data['id'], 'notification', data)
+            if len(missed) < replay_limit:
+                break
+
+        while not subscription.overflowed:
+            try:
+                data = await asyncio.wait_for(subscription.queue.get(), heartbeat)
+            except asyncio.TimeoutError:
+                # Comment line: keeps proxies from closing an idle connection.
+                yield b': heartbeat\n\n'
+                continue
+            if subscription.overflowed:
+                break
+            if last_id is not None and data['id'] <= last_id:
+                continue
+            last_id = data['id']
+            yield format_event(data['id'], 'notification', data)
+        # Too slow to keep up: tell the client to reconnect with Last-Event-ID.
+        yield format_event(event='overflow', data={'last_event_id': last_id})
+    finally:
+        broker.unsubscribe(subscription)
+
+
+async def notification_stream(request):
+    """
+    GET /api/notifications/stream/
+
+    Server-Sent Events stream of the user's new notifications. Needs an ASGI
+    server (e.g. `uvicorn social_media_api.asgi:application`). Reconnecting
+    clients send Last-Event-ID and get what they missed replayed first.
+    """
+    if request.method != 'GET':
+        return HttpResponse(status=405, headers={'Allow': 'GET'})
+    user = await get_stream_user(request)
+    if user is None:
+        return HttpResponse('Authentication credentials were not provided.', status=401)
+
+    response = StreamingHttpResponse(
+        stream_events(user.pk, parse_last_event_id(request)),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
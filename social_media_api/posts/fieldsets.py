@@ -0,0 +1,108 @@
+# advanced-api-project and social_media_api are deployed separately and each
+# carry this same module; change the copies together.
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.permissions import SAFE_METHODS
+
+
+def parse_names(request, param):
+    value = request.query_params.get(param)
+    if value is None:
+        return None
+    return [name.strip() for name in value.split(',') if name.strip()]
+
+
+def is_sparse(request):
+    return parse_names(request, 'fields') is not None or parse_names(request, 'exclude') is not None
+
+
+def trim_fields(serializer, request):
+    """
+    Drop the fields not asked for with ?fields=a,b or asked away with
+    ?exclude=c from a (list) serializer. Unknown names and an empty
+    ?fields= are a 400.
+    """
+    include = parse_names(request, 'fields')
+    exclude = parse_names(request, 'exclude')
+    if include is None and exclude is None:
+        return serializer
+    if include == []:
+        raise ValidationError({'fields': 'Name at least one field, or leave ?fields= out.'})
+
+    target = serializer.child if isinstance(serializer, serializers.ListSerializer) else serializer
+    fields = target.fields
+    for param, names in (('fields', include), ('exclude', exclude)):
+        unknown = [name for name in names or () if name not in fields]
+        if unknown:
+            raise ValidationError({param: f"Unknown field(s): {', '.join(unknown)}. "
+                                          f"Available: {', '.join(fields)}."})
+    for name in list(fields):
+        if (include is not None and name not in include) or (exclude and name in exclude):
+            fields.pop(name)
+    return serializer
+
+
+def only_paths(serializer, model):
+    """
+    The columns a serializer's fields read, for .only(): `title` -> title,
+    `author.username` -> author, author__username. None when a field may
+    read anything (methods, properties, source='*') or a collection.
+    """
+    paths = {model._meta.pk.name}
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if field.source == '*':
+            return None
+        current, prefix = model, ''
+        for attr in field.source_attrs:
+            try:
+                model_field = current._meta.get_field(attr)
+            except FieldDoesNotExist:
+                return None
+            if not model_field.concrete or model_field.many_to_many:
+                return None
+            paths.add(prefix + attr)
+            if not model_field.is_relation:
+                break
+            current, prefix = model_field.related_model, f'{prefix}{attr}__'
+    return paths
+
+
+class SparseFieldsMixin:
+    """
+    ?fields=id,title / ?exclude=content for reads: the response only has
+    the chosen fields. Which columns are selected is left to the view (see
+    SparseColumnsMixin).
+    """
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        request = getattr(self, 'request', None)
+        if request is not None and request.method in SAFE_METHODS:
+            trim_fields(serializer, request)
+        return serializer
+
+
+class SparseColumnsMixin(SparseFieldsMixin):
+    """
+    SparseFieldsMixin that also has the view's queryset select only the
+    columns of the chosen fields.
+    """
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        request = getattr(self, 'request', None)
+        if request is None or request.method not in SAFE_METHODS or not is_sparse(request):
+            return queryset
+        paths = only_paths(self.get_serializer(), queryset.model)
+        if not paths:
+            return queryset
+        # Join only the relations still rendered: a deferred foreign key
+        # cannot be followed by select_related().
+        relations = {path.rsplit('__', 1)[0] for path in paths if '__' in path}
+        queryset = queryset.select_related(None)
+        if relations:
+            queryset = queryset.select_related(*relations)
+        return queryset.only(*paths)
@@ -0,0 +1,379 @@
+"""
+A small asyncio HTTP load generator used by `manage.py loadtest`.
+
+Two ways to drive it:
+
+- a scenario: a weighted mix of endpoints hit by N concurrent clients for a
+  fixed time (or number of requests), with the clients started gradually
+  over a ramp-up period;
+- a replay: the requests of an access log, sent with their original spacing
+  (optionally sped up) or as fast as the clients allow.
+
+It speaks plain HTTP/1.1 over keep-alive connections, so it needs nothing
+beyond the standard library. Results are summarised by report() into a
+JSON-serialisable dict that compare() can diff against an earlier run.
+"""
+import asyncio
+import json
+import math
+import random
+import re
+import ssl
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from urllib.parse import urlsplit
+
+
+# Seconds a request may take, sending included, before it counts as an error.
+DEFAULT_TIMEOUT = 30.0
+
+
+class Endpoint:
+    def __init__(self, path, name=None, method='GET', weight=1, headers=None, body=None):
+        self.path = path
+        self.name = name or f'{method} {path}'
+        self.method = method.upper()
+        self.weight = weight
+        self.headers = headers or {}
+        if body is not None and not isinstance(body, (bytes, str)):
+            self.headers.setdefault('Content-Type', 'application/json')
+            body = json.dumps(body)
+        self.body = body.encode() if isinstance(body, str) else body
+
+
+class Scenario:
+    """
+    Loaded from JSON, e.g.:
+
+        {"base_url": "http://127.0.0.1:8000", "concurrency": 20,
+         "duration": 30, "ramp_up": 5, "timeout": 10, "token": "<DRF token>",
+         "endpoints": [
+             {"path": "/api/posts/", "weight": 5},
+             {"path": "/api/feed/", "weight": 2},
+             {"path": "/api/posts/", "method": "POST", "weight": 1,
+              "body": {"title": "load", "content": "test"}}]}
+    """
+
+    def __init__(self, endpoints, base_url='http://127.0.0.1:8000', concurrency=10, duration=10.0,
+                 requests=None, ramp_up=0.0, think_time=0.0, token=None, headers=None,
+                 timeout=DEFAULT_TIMEOUT):
+        if not endpoints:
+            raise ValueError('A scenario needs at least one endpoint.')
+        self.endpoints = endpoints
+        self.base_url = base_url
+        self.concurrency = concurrency
+        self.duration = duration
+        self.requests = requests
+        self.ramp_up = ramp_up
+        self.think_time = think_time
+        self.timeout = timeout
+        self.headers = dict(headers or {})
+        if token:
+            self.headers['Authorization'] = f'Token {token}'
+
+    @classmethod
+    def from_dict(cls, data):
+        data = dict(data)
+        endpoints = [Endpoint(**endpoint) for endpoint in data.pop('endpoints', [])]
+        return cls(endpoints, **data)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+# [10/Oct/2026:13:55:36 +0000] "GET /api/posts/?page=2 HTTP/1.1" (combined log format)
+# [10/Oct/2026 13:55:36] "GET /api/posts/ HTTP/1.1" (runserver)
+LOG_LINE_RE = re.compile(r'\[(?P<time>[^\]]+)\] "(?P<method>[A-Z]+) (?P<target>\S+) HTTP/[\d.]+"')
+LOG_TIME_FORMATS = ('%d/%b/%Y:%H:%M:%S %z', '%d/%b/%Y %H:%M:%S')
+
+
+def parse_log_time(value):
+    for fmt in LOG_TIME_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
+
+def parse_access_log(lines, methods=('GET', 'HEAD')):
+    """
+    [(seconds since the first request, method, target)] from access log
+    lines. Only `methods` are kept: logs carry no request bodies, so
+    replaying writes would not reproduce them.
+    """
+    entries, start = [], None
+    for line in lines:
+        match = LOG_LINE_RE.search(line)
+        if not match or match['method'] not in methods:
+            continue
+        moment = parse_log_time(match['time'])
+        if moment is None:
+            continue
+        if moment.tzinfo is not None:
+            moment = moment.astimezone(timezone.utc).replace(tzinfo=None)
+        if start is None:
+            start = moment
+        # Log lines are written when requests finish, so they can be slightly out of order.
+        entries.append((max((moment - start).total_seconds(), 0.0), match['method'], match['target']))
+    return entries
+
+
+def replay_name(method, target):
+    # /api/posts/17/?page=2 -> GET /api/posts/<id>/, so a log groups into endpoints.
+    path = re.sub(r'/\d+(?=/|$)', '/<id>', urlsplit(target).path)
+    return f'{method} {path}'
+
+
+class Connection:
+    """One keep-alive HTTP/1.1 connection, reopened when the server closes it."""
+
+    def __init__(self, base_url, timeout=DEFAULT_TIMEOUT):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.secure = parts.scheme == 'https'
+        self.port = parts.port or (443 if self.secure else 80)
+        self.host_header = parts.netloc
+        self.timeout = timeout
+        self.reader = self.writer = None
+
+    async def open(self):
+        context = ssl.create_default_context() if self.secure else None
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port, ssl=context)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+    async def request(self, method, target, headers, body=None):
+        """
+        Send one request and read the whole response; returns (status, body
+        bytes). Raises TimeoutError when that takes longer than the timeout,
+        leaving the connection to be closed.
+        """
+        try:
+            return await asyncio.wait_for(self.exchange(method, target, headers, body), self.timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f'No response within {self.timeout} s') from None
+
+    async def exchange(self, method, target, headers, body):
+        if self.writer is None:
+            await self.open()
+        lines = [f'{method} {target} HTTP/1.1', f'Host: {self.host_header}']
+        headers = {'Accept-Encoding': 'identity', **headers}
+        if body is not None:
+            headers['Content-Length'] = str(len(body))
+        lines += [f'{name}: {value}' for name, value in headers.items()]
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + (body or b''))
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError('Connection closed by the server.')
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            response_headers[name.strip().lower()] = value.strip()
+
+        size = await self.read_body(method, status, response_headers)
+        if response_headers.get('connection', '').lower() == 'close':
+            self.close()
+        return status, size
+
+    async def read_body(self, method, status, headers):
+        if method == 'HEAD' or status in (204, 304) or 100 <= status < 200:
+            return 0
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            size = 0
+            while True:
+                length = int((await self.reader.readline()).split(b';')[0], 16)
+                if length == 0:
+                    await self.reader.readline()  # the empty trailer
+                    return size
+                size += len(await self.reader.readexactly(length))
+                await self.reader.readline()
+        if 'content-length' in headers:
+            return len(await self.reader.readexactly(int(headers['content-length'])))
+        # No length given: the body runs until the server closes the connection.
+        body = await self.reader.read()
+        self.close()
+        return len(body)
+
+
+class Results:
+    def __init__(self):
+        self.samples = []  # (endpoint name, status or None, latency seconds, bytes)
+        self.errors = Counter()
+        self.started = self.finished = None
+
+    def add(self, name, status, latency, size, error=None):
+        self.samples.append((name, status, latency, size))
+        if error is not None:
+            self.errors[f'{type(error).__name__}: {error}'] += 1
+
+
+async def timed_request(connection, results, name, method, target, headers, body=None):
+    start = time.perf_counter()
+    try:
+        status, size = await connection.request(method, target, headers, body)
+    except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, IndexError) as exc:
+        connection.close()
+        results.add(name, None, time.perf_counter() - start, 0, exc)
+    else:
+        results.add(name, status, time.perf_counter() - start, size)
+
+
+async def run_scenario(scenario, seed=None):
+    results = Results()
+    rng = random.Random(seed)
+    weights = [endpoint.weight for endpoint in scenario.endpoints]
+    budget = {'left': scenario.requests}
+    results.started = time.perf_counter()
+    deadline = results.started + scenario.duration if scenario.duration else None
+
+    def more():
+        if deadline is not None and time.perf_counter() >= deadline:
+            return False
+        if budget['left'] is not None:
+            if budget['left'] <= 0:
+                return False
+            budget['left'] -= 1
+        return True
+
+    async def client(number):
+        # Clients start one after another across the ramp-up period.
+        if scenario.ramp_up:
+            await asyncio.sleep(scenario.ramp_up * number / scenario.concurrency)
+        connection = Connection(scenario.base_url, scenario.timeout)
+        try:
+            while more():
+                endpoint = rng.choices(scenario.endpoints, weights)[0]
+                await timed_request(connection, results, endpoint.name, endpoint.method, endpoint.path,
+                                    {**scenario.headers, **endpoint.headers}, endpoint.body)
+                if scenario.think_time:
+                    await asyncio.sleep(scenario.think_time)
+        finally:
+            connection.close()
+
+    await asyncio.gather(*(client(number) for number in range(scenario.concurrency)))
+    results.finished = time.perf_counter()
+    return results
+
+
+async def run_replay(entries, base_url, concurrency=10, speed=1.0, headers=None, timeout=DEFAULT_TIMEOUT):
+    """
+    Send the logged requests in order. With speed > 0 each one waits for its
+    original offset divided by speed; with speed 0 they go out back to back.
+    """
+    results = Results()
+    queue = asyncio.Queue()
+    headers = headers or {}
+    results.started = time.perf_counter()
+
+    async def dispatcher():
+        for offset, method, target in entries:
+            if speed:
+                delay = results.started + offset / speed - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            await queue.put((method, target))
+        for _ in range(concurrency):
+            await queue.put(None)
+
+    async def client():
+        connection = Connection(base_url, timeout)
+        try:
+            while (item := await queue.get()) is not None:
+                method, target = item
+                await timed_request(connection, results, replay_name(method, target), method, target, headers)
+        finally:
+            connection.close()
+
+    await asyncio.gather(dispatcher(), *(client() for _ in range(concurrency)))
+    results.finished = time.perf_counter()
+    return results
+
+
+def percentile(ordered, fraction):
+    # Nearest rank on an already sorted list.
+    if not ordered:
+        return None
+    return ordered[max(math.ceil(fraction * len(ordered)) - 1, 0)]
+
+
+def latency_summary(latencies):
+    ordered = sorted(latency * 1000 for latency in latencies)
+    if not ordered:
+        return {}
+    return {
+        'min': round(ordered[0], 3),
+        'mean': round(sum(ordered) / len(ordered), 3),
+        **{f'p{int(q * 100)}': round(percentile(ordered, q), 3) for q in (0.5, 0.9, 0.95, 0.99)},
+        'max': round(ordered[-1], 3),
+    }
+
+
+def is_error(status):
+    return status is None or status >= 400
+
+
+def report(results, **meta):
+    """The run as a JSON-serialisable dict (see compare())."""
+    elapsed = max(results.finished - results.started, 1e-9)
+    by_endpoint = defaultdict(list)
+    for sample in results.samples:
+        by_endpoint[sample[0]].append(sample)
+
+    def summary(samples):
+        errors = sum(1 for _, status, _, _ in samples if is_error(status))
+        return {
+            'requests': len(samples),
+            'errors': errors,
+            'error_rate': round(errors / len(samples), 4) if samples else 0.0,
+            'throughput_rps': round(len(samples) / elapsed, 2),
+            'latency_ms': latency_summary([latency for _, _, latency, _ in samples]),
+        }
+
+    statuses = Counter('error' if status is None else str(status) for _, status, _, _ in results.samples)
+    return {
+        **meta,
+        'finished_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'duration_s': round(elapsed, 3),
+        **summary(results.samples),
+        'bytes_received': sum(size for _, _, _, size in results.samples),
+        'status_codes': dict(sorted(statuses.items())),
+        'connection_errors': dict(results.errors.most_common(10)),
+        'endpoints': {name: summary(samples) for name, samples in sorted(by_endpoint.items())},
+    }
+
+
+COMPARED = (
+    ('throughput_rps', ('throughput_rps',)),
+    ('error_rate', ('error_rate',)),
+    ('p50 ms', ('latency_ms', 'p50')),
+    ('p95 ms', ('latency_ms', 'p95')),
+    ('p99 ms', ('latency_ms', 'p99')),
+)
+
+
+def compare(before, after):
+    """[(metric, before, after, change %)] for the headline numbers of two reports."""
+    rows = []
+    for label, keys in COMPARED:
+        old, new = before, after
+        for key in keys:
+            old = (old or {}).get(key)
+            new = (new or {}).get(key)
+        change = None
+        if old not in (None, 0) and new is not None:
+            change = round((new - old) / old * 100, 1)
+        rows.append((label, old, new, change))
+    return rows
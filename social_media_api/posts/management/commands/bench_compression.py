@@ -0,0 +1,59 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+
+from posts.models import Post
+from posts.serializers import PostSerializer
+from social_media_api.compression import available_encodings, compress
+
+WORDS = 'the of and a to in is you that it he was for on are as with his they'.split()
+
+
+class Command(BaseCommand):
+    help = ("Compress a PostViewSet list payload with gzip and brotli at several "
+            "levels and report bytes saved against CPU time per response.")
+
+    def add_arguments(self, parser):
+        page_size = settings.REST_FRAMEWORK.get('PAGE_SIZE') or 10
+        parser.add_argument('--rows', type=int, nargs='+', default=[page_size, 100, 1000])
+        parser.add_argument('--levels', type=int, nargs='+', default=[1, 4, 6, 9])
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        for rows in options['rows']:
+            payload = self.payload(rows)
+            self.stdout.write(f"PostViewSet, {rows} posts: {len(payload)} bytes")
+            for encoding in available_encodings():
+                for level in options['levels']:
+                    size, ms = self.timed(encoding, level, payload, options['repeat'])
+                    saved = 100 * (1 - size / len(payload))
+                    self.stdout.write(
+                        f"  {encoding:4} level {level:2}   {size:9} bytes   "
+                        f"saved {saved:5.1f}%   {ms:8.3f} ms   {len(payload) / ms / 1000:7.1f} MB/s"
+                    )
+
+    def timed(self, encoding, level, payload, repeat):
+        size = len(compress(encoding, level, payload))
+        start = time.perf_counter()
+        for _ in range(repeat):
+            compress(encoding, level, payload)
+        return size, (time.perf_counter() - start) / repeat * 1000
+
+    def payload(self, rows):
+        # A page of the post list as PostViewSet renders it, from unsaved posts.
+        User = get_user_model()
+        authors = [User(pk=i + 1, username=f'user{i}') for i in range(max(rows // 5, 1))]
+        now = timezone.now()
+        posts = [
+            Post(pk=i + 1, author=authors[i % len(authors)], created_at=now, updated_at=now,
+                 title=' '.join(WORDS[(i * 3 + j) % len(WORDS)] for j in range(6)),
+                 content=' '.join(WORDS[(i + j * 5) % len(WORDS)] for j in range(80)))
+            for i in range(rows)
+        ]
+        data = {'count': rows, 'next': None, 'previous': None,
+                'results': PostSerializer(posts, many=True).data}
+        return JSONRenderer().render(data)
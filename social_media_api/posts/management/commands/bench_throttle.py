@@ -0,0 +1,56 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory, force_authenticate
+from rest_framework.throttling import ScopedRateThrottle
+
+from posts.throttling import SlidingWindowRateThrottle
+
+
+class BenchView:
+    throttle_scope = 'bench'
+
+
+class Command(BaseCommand):
+    help = "Microbenchmark the per-request overhead of the write throttles."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20000)
+        parser.add_argument('--rate', default='1000000/min',
+                            help="Rate used for the benchmark scope (default never throttles).")
+
+    def handle(self, *args, **options):
+        count = options['requests']
+        user = get_user_model()(pk=1, username='bench')
+        django_request = APIRequestFactory().post('/api/1/like/')
+        force_authenticate(django_request, user=user)
+        request = Request(django_request)
+        request.user  # authenticate once, outside the timed loop
+        view = BenchView()
+
+        rates = {'bench': options['rate']}
+        results = []
+        for label, throttle_class in [
+            ('sliding-window', SlidingWindowRateThrottle),
+            ('drf scoped (timestamp list)', ScopedRateThrottle),
+        ]:
+            original_rates = throttle_class.THROTTLE_RATES
+            throttle_class.THROTTLE_RATES = rates
+            cache.clear()
+            try:
+                start = time.perf_counter()
+                for _ in range(count):
+                    throttle_class().allow_request(request, view)
+                elapsed = time.perf_counter() - start
+            finally:
+                throttle_class.THROTTLE_RATES = original_rates
+            results.append((label, elapsed))
+
+        backend = settings.CACHES['default']['BACKEND'].rsplit('.', 1)[-1]
+        self.stdout.write(f"{count} requests, cache backend {backend}")
+        for label, elapsed in results:
+            self.stdout.write(f"{label:30} {elapsed / count * 1e6:8.2f} us/request")
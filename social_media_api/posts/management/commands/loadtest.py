@@ -0,0 +1,110 @@
+import asyncio
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.loadtest import (
+    DEFAULT_TIMEOUT, Endpoint, Scenario, compare, parse_access_log, report, run_replay, run_scenario,
+)
+
+
+class Command(BaseCommand):
+    help = ("Load-test a running server with a scenario file (weighted endpoint mix, "
+            "auth token, ramp-up) or by replaying an access log, then report "
+            "throughput, error rates and latency percentiles.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('scenario', nargs='?', help="Scenario JSON file (see posts.loadtest.Scenario).")
+        parser.add_argument('--replay', metavar='LOG', help="Replay the GET/HEAD requests of this access log.")
+        parser.add_argument('--path', action='append', default=[],
+                            help="Endpoint path to load, repeatable (instead of a scenario file).")
+        parser.add_argument('--base-url', help="Server to test (default http://127.0.0.1:8000).")
+        parser.add_argument('--concurrency', type=int)
+        parser.add_argument('--duration', type=float, help="Seconds to run a scenario for.")
+        parser.add_argument('--requests', type=int, help="Stop a scenario after this many requests.")
+        parser.add_argument('--ramp-up', type=float, help="Seconds over which clients are started.")
+        parser.add_argument('--timeout', type=float,
+                            help="Seconds before a request counts as a timeout error (default 30).")
+        parser.add_argument('--token', help="DRF token sent as 'Authorization: Token ...'.")
+        parser.add_argument('--speed', type=float, default=1.0,
+                            help="Replay speed-up factor; 0 sends the log back to back.")
+        parser.add_argument('--seed', type=int, help="Seed for the endpoint mix, for repeatable runs.")
+        parser.add_argument('--output', help="Write the JSON report to this file.")
+        parser.add_argument('--compare', metavar='REPORT', help="Earlier JSON report to compare against.")
+
+    def handle(self, *args, **options):
+        overrides = {
+            key: options[key]
+            for key in ('base_url', 'concurrency', 'duration', 'requests', 'ramp_up', 'timeout', 'token')
+            if options[key] is not None
+        }
+        if options['replay']:
+            data = self.run_replay(options, overrides)
+        else:
+            data = self.run_scenario(options, overrides)
+
+        self.print_report(data)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(data, f, indent=2)
+        if options['compare']:
+            with open(options['compare']) as f:
+                self.print_comparison(json.load(f), data)
+
+    def run_scenario(self, options, overrides):
+        if options['scenario']:
+            try:
+                scenario = Scenario.load(options['scenario'])
+            except (OSError, ValueError, TypeError) as exc:
+                raise CommandError(f"Cannot load scenario {options['scenario']}: {exc}")
+            for key, value in overrides.items():
+                if key == 'token':
+                    scenario.headers['Authorization'] = f'Token {value}'
+                else:
+                    setattr(scenario, key, value)
+        elif options['path']:
+            scenario = Scenario([Endpoint(path) for path in options['path']], **overrides)
+        else:
+            raise CommandError("Give a scenario file, --path or --replay.")
+        results = asyncio.run(run_scenario(scenario, seed=options['seed']))
+        return report(results, mode='scenario', source=options['scenario'], base_url=scenario.base_url,
+                      concurrency=scenario.concurrency)
+
+    def run_replay(self, options, overrides):
+        try:
+            with open(options['replay']) as f:
+                entries = parse_access_log(f)
+        except OSError as exc:
+            raise CommandError(f"Cannot read {options['replay']}: {exc}")
+        if not entries:
+            raise CommandError(f"No replayable requests in {options['replay']}.")
+        base_url = overrides.get('base_url', 'http://127.0.0.1:8000')
+        concurrency = overrides.get('concurrency', 10)
+        headers = {'Authorization': f"Token {overrides['token']}"} if 'token' in overrides else {}
+        timeout = overrides.get('timeout', DEFAULT_TIMEOUT)
+        results = asyncio.run(run_replay(entries, base_url, concurrency, options['speed'], headers, timeout))
+        return report(results, mode='replay', source=options['replay'], base_url=base_url,
+                      concurrency=concurrency, speed=options['speed'])
+
+    def print_report(self, data):
+        latency = data['latency_ms']
+        self.stdout.write(
+            f"{data['requests']} requests in {data['duration_s']} s: {data['throughput_rps']} req/s, "
+            f"{data['error_rate'] * 100:.2f}% errors"
+        )
+        if latency:
+            self.stdout.write("latency ms: " + '  '.join(f"{key} {value}" for key, value in latency.items()))
+        self.stdout.write(f"status codes: {data['status_codes']}")
+        for message, count in data['connection_errors'].items():
+            self.stdout.write(f"  {count} x {message}")
+        for name, endpoint in data['endpoints'].items():
+            self.stdout.write(
+                f"  {name:40} {endpoint['requests']:7} req  {endpoint['error_rate'] * 100:6.2f}% err  "
+                f"p50 {endpoint['latency_ms'].get('p50')} ms  p95 {endpoint['latency_ms'].get('p95')} ms"
+            )
+
+    def print_comparison(self, before, after):
+        self.stdout.write("compared with the earlier report:")
+        for label, old, new, change in compare(before, after):
+            delta = f"{change:+.1f}%" if change is not None else "n/a"
+            self.stdout.write(f"  {label:15} {old!s:>10} -> {new!s:>10}  {delta}")
@@ -9,7 +9,7 @@ class PostSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Post
-        fields = ['id,' 'author', 'title', 'content', 'created_at', 'updated_at']
+        fields = ['id', 'author', 'title', 'content', 'created_at', 'updated_at']
 
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -18,4 +18,4 @@ class CommentSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Comment
-        fields = ['id', 'author', 'post', 'content', 'created_at', 'upated_at']
\ No newline at end of file
+        fields = ['id', 'author', 'post', 'content', 'created_at', 'updated_at']
\ No newline at end of file
@@ -0,0 +1,184 @@
+import asyncio
+import gzip
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import LiveServerTestCase, SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from accounts.models import CustomUser
+from .loadtest import Endpoint, Scenario, compare, parse_access_log, replay_name, report, run_scenario
+from .models import Post
+from .throttling import SlidingWindowRateThrottle
+
+
+class LikeView:
+    throttle_scope = 'likes'
+
+
+class SlidingWindowRateThrottleTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.now = 1000 * 60.0  # start of a one-minute window
+        self.request = Request(APIRequestFactory().post('/api/1/like/'))
+
+    def allow(self):
+        throttle = SlidingWindowRateThrottle()
+        throttle.THROTTLE_RATES = {'likes': '3/min'}
+        throttle.timer = lambda: self.now
+        return throttle.allow_request(self.request, LikeView()), throttle
+
+    def test_blocks_after_rate_within_window(self):
+        self.assertEqual([self.allow()[0] for _ in range(4)], [True, True, True, False])
+        allowed, throttle = self.allow()
+        self.assertFalse(allowed)
+        self.assertEqual(throttle.wait(), 60)
+
+    def test_previous_window_decays(self):
+        for _ in range(3):
+            self.allow()
+        # A third of the way into the next window, 2 of the 3 old requests still count.
+        self.now += 60 + 20
+        self.assertEqual([self.allow()[0] for _ in range(2)], [True, False])
+
+    def test_counters_are_keyed_by_scope_client_and_window(self):
+        _, throttle = self.allow()
+        self.assertEqual(throttle.window_keys(throttle.key, 1000),
+                         ('throttle_sw_likes_127.0.0.1_1000', 'throttle_sw_likes_127.0.0.1_999'))
+        self.assertEqual(cache.get('throttle_sw_likes_127.0.0.1_1000'), 1)
+
+    def test_views_without_scope_are_not_throttled(self):
+        throttle = SlidingWindowRateThrottle()
+        self.assertTrue(throttle.allow_request(self.request, object()))
+
+
+class PostListQueryTests(TestCase):
+    def test_author_usernames_do_not_cost_a_query_per_post(self):
+        for i in range(5):
+            author = CustomUser.objects.create_user(username=f'user{i}', password='pass12345')
+            Post.objects.create(author=author, title=f'post {i}', content='x')
+        # The page count, then the posts joined with their authors
+        with self.assertNumQueries(2):
+            response = self.client.get('/api/posts/')
+        results = response.json()['results']
+        self.assertEqual({post['author'] for post in results}, {f'user{i}' for i in range(5)})
+
+
+class CompressionTests(TestCase):
+    def test_post_list_is_gzipped_when_accepted(self):
+        author = CustomUser.objects.create_user(username='writer', password='pass12345')
+        for i in range(10):
+            Post.objects.create(author=author, title=f'post {i}', content='lorem ipsum dolor ' * 20)
+        plain = self.client.get('/api/posts/')
+        response = self.client.get('/api/posts/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertFalse(plain.has_header('Content-Encoding'))
+
+
+class LoadTestTests(LiveServerTestCase):
+    def setUp(self):
+        author = CustomUser.objects.create_user(username='writer', password='pass12345')
+        Post.objects.create(author=author, title='post', content='content')
+
+    def run_command(self, *args):
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'report.json')
+            call_command('loadtest', *args, '--base-url', self.live_server_url, '--output', output,
+                         stdout=StringIO())
+            with open(output) as f:
+                return json.load(f)
+
+    def test_scenario_report(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            json.dump({'concurrency': 3, 'requests': 30, 'duration': 30, 'endpoints': [
+                {'path': '/api/posts/', 'weight': 3},
+                {'path': '/api/missing/', 'weight': 1},
+            ]}, f)
+        self.addCleanup(os.unlink, f.name)
+        data = self.run_command(f.name, '--seed', '1')
+        self.assertEqual(data['requests'], 30)
+        self.assertEqual(sum(data['status_codes'].values()), 30)
+        self.assertEqual(set(data['status_codes']), {'200', '404'})
+        self.assertEqual(data['errors'], data['endpoints']['GET /api/missing/']['requests'])
+        self.assertLessEqual(data['latency_ms']['p50'], data['latency_ms']['p99'])
+
+    def test_replay(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.log', delete=False) as f:
+            f.write('[19/Oct/2026 08:00:00] "GET /api/posts/ HTTP/1.1" 200 100\n'
+                    '[19/Oct/2026 08:00:01] "POST /api/posts/ HTTP/1.1" 201 80\n'
+                    f'[19/Oct/2026 08:00:02] "GET /api/posts/{Post.objects.get().pk}/ HTTP/1.1" 200 90\n')
+        self.addCleanup(os.unlink, f.name)
+        data = self.run_command('--replay', f.name, '--speed', '0')
+        self.assertEqual(data['requests'], 2)
+        self.assertEqual(set(data['endpoints']), {'GET /api/posts/', 'GET /api/posts/<id>/'})
+
+
+class LoadTestHelperTests(SimpleTestCase):
+    def test_access_log_offsets(self):
+        entries = parse_access_log([
+            '127.0.0.1 - - [19/Oct/2026:08:00:00 +0000] "GET /api/feed/ HTTP/1.1" 200 5',
+            '127.0.0.1 - - [19/Oct/2026:10:00:03 +0200] "HEAD /api/posts/?page=2 HTTP/1.1" 200 0',
+            'not a request line',
+        ])
+        self.assertEqual(entries, [(0.0, 'GET', '/api/feed/'), (3.0, 'HEAD', '/api/posts/?page=2')])
+        self.assertEqual(replay_name('GET', '/api/posts/17/?x=1'), 'GET /api/posts/<id>/')
+
+    async def test_stalled_responses_time_out_as_errors(self):
+        async def stall(reader, writer):
+            # Read the request, answer nothing, and wait for the client to give up.
+            await reader.read()
+            writer.close()
+
+        server = await asyncio.start_server(stall, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        scenario = Scenario([Endpoint('/api/posts/')], base_url=f'http://127.0.0.1:{port}',
+                            concurrency=2, duration=None, requests=2, timeout=0.1)
+        async with server:
+            data = report(await run_scenario(scenario))
+        self.assertEqual((data['requests'], data['errors']), (2, 2))
+        self.assertEqual(data['connection_errors'], {'TimeoutError: No response within 0.1 s': 2})
+
+    def test_compare(self):
+        before = {'throughput_rps': 100, 'error_rate': 0, 'latency_ms': {'p50': 10, 'p95': 20, 'p99': 40}}
+        after = {'throughput_rps': 120, 'error_rate': 0, 'latency_ms': {'p50': 5, 'p95': 20, 'p99': 50}}
+        rows = {label: change for label, _, _, change in compare(before, after)}
+        self.assertEqual(rows, {'throughput_rps': 20.0, 'error_rate': None, 'p50 ms': -50.0,
+                                'p95 ms': 0.0, 'p99 ms': 25.0})
+
+
+class SparseFieldsetTests(TestCase):
+    def setUp(self):
+        self.author = CustomUser.objects.create_user(username='writer', password='pass12345')
+        for i in range(3):
+            Post.objects.create(author=self.author, title=f'post {i}', content='long text ' * 50)
+
+    def select_of(self, queries):
+        return queries[-1]['sql'].split(' FROM ')[0]
+
+    def test_fields_trim_the_response_and_the_select(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/posts/', {'fields': 'id,title'})
+        self.assertEqual([set(post) for post in response.json()['results']], [{'id', 'title'}] * 3)
+        self.assertNotIn('content', self.select_of(queries))
+        self.assertNotIn('JOIN', queries[-1]['sql'])
+
+    def test_related_fields_keep_their_join(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/posts/', {'exclude': 'content,updated_at'})
+        self.assertEqual(response.json()['results'][0]['author'], 'writer')
+        self.assertEqual(len(queries), 2)  # the count, then the page
+        self.assertIn('username', self.select_of(queries))
+        self.assertNotIn('"email"', self.select_of(queries))
+
+    def test_unknown_field(self):
+        self.assertEqual(self.client.get('/api/posts/', {'fields': 'likes'}).status_code, 400)
+        self.assertEqual(self.client.get('/api/posts/', {'fields': ' , '}).status_code, 400)
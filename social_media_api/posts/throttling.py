@@ -0,0 +1,109 @@
+# posts/throttling.py
+import time
+
+from django.core.cache import cache as default_cache
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class SlidingWindowRateThrottle(SimpleRateThrottle):
+    """
+    Approximate sliding-window throttle for write endpoints.
+
+    Keeps two counters per client in the shared cache: the current fixed window
+    and the previous one. The request rate is estimated as
+
+        previous * (1 - elapsed / duration) + current
+
+    so each check is one get_many() and at most one incr(), and the memory used
+    per client is constant no matter how many requests it makes (unlike
+    SimpleRateThrottle, which stores a timestamp per request).
+
+    Views pick their rate through `throttle_scope`, looked up in
+    REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']. Authenticated clients are counted
+    per user, anonymous ones per IP address.
+    """
+    cache = default_cache
+    cache_format = 'throttle_sw_%(scope)s_%(ident)s'
+    timer = time.time
+
+    def __init__(self):
+        # The rate depends on the view, so it is resolved in allow_request().
+        pass
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+    def window_keys(self, key, window):
+        return f'{key}_{window}', f'{key}_{window - 1}'
+
+    def estimate(self, current, previous, elapsed):
+        weight = 1 - (elapsed / self.duration)
+        return previous * weight + current
+
+    def get_scope(self, view):
+        return getattr(view, 'throttle_scope', None)
+
+    def allow_request(self, request, view):
+        self.scope = self.get_scope(view)
+        if not self.scope or self.scope not in self.THROTTLE_RATES:
+            return True
+
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        if self.num_requests is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        window = int(self.now // self.duration)
+        self.elapsed = self.now - window * self.duration
+        current_key, previous_key = self.window_keys(self.key, window)
+
+        counts = self.cache.get_many([current_key, previous_key])
+        self.current = counts.get(current_key, 0)
+        self.previous = counts.get(previous_key, 0)
+
+        if self.estimate(self.current, self.previous, self.elapsed) >= self.num_requests:
+            return self.throttle_failure()
+
+        # The counter must outlive the next window, where it becomes "previous".
+        if not self.cache.add(current_key, 1, 2 * self.duration):
+            try:
+                self.cache.incr(current_key)
+            except ValueError:
+                # Expired between add() and incr(); start the window again.
+                self.cache.set(current_key, 1, 2 * self.duration)
+        return self.throttle_success()
+
+    def throttle_success(self):
+        return True
+
+    def wait(self):
+        """
+        Seconds until the estimate drops below the limit, assuming no new requests.
+        """
+        if not self.previous or self.current >= self.num_requests:
+            # Nothing left to decay from the previous window: wait for the boundary.
+            return self.duration - self.elapsed
+        # Solve previous * (1 - t / duration) + current < num_requests for t.
+        needed = self.duration * (1 - (self.num_requests - self.current) / self.previous)
+        return max(needed - self.elapsed, 0)
+
+
+class UserWriteRateThrottle(SlidingWindowRateThrottle):
+    """
+    Overall write budget per user, shared by every endpoint that uses it.
+    Rate comes from the 'writes' entry of DEFAULT_THROTTLE_RATES.
+    """
+    def get_scope(self, view):
+        return 'writes'
+
+
+WRITE_THROTTLE_CLASSES = [SlidingWindowRateThrottle, UserWriteRateThrottle]
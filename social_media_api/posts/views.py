@@ -8,11 +8,14 @@ from rest_framework import permissions
 from .permissions import IsOwnerOrReadOnly
 from rest_framework.response import Response
 from notifications.models import Notification
+from .throttling import WRITE_THROTTLE_CLASSES
+from .fieldsets import SparseColumnsMixin
 
 
 
-class PostViewSet(viewsets.ModelViewSet):
-    queryset = Post.objects.all().order_by("-created_at")
+class PostViewSet(SparseColumnsMixin, viewsets.ModelViewSet):
+    # author.username is rendered for every post: join it instead of one query per row
+    queryset = Post.objects.select_related("author").order_by("-created_at")
     serializer_class = PostSerializer
     permission_classes = [permissions.IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
 
@@ -24,29 +27,39 @@ class PostViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
-class CommentViewSet(viewsets.ModelViewSet):
-    queryset = Comment.objects.all().order_by("-created_at")
+class CommentViewSet(SparseColumnsMixin, viewsets.ModelViewSet):
+    queryset = Comment.objects.select_related("author").order_by("-created_at")
     serializer_class = CommentSerializer
     permission_classes =  [permissions.IsAuthenticatedOrReadOnly, IsOwnerOrReadOnly]
 
     filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
     filterset_fields = ['post'] 
     ordering_fields = ['created_at', 'updated_at']
+    throttle_scope = 'comments'
+
+    def get_throttles(self):
+        # Only creating comments is rate limited; reads stay unthrottled.
+        if self.action == 'create':
+            return [throttle() for throttle in WRITE_THROTTLE_CLASSES]
+        return super().get_throttles()
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
 
-class FeedView(generics.ListAPIView):
+class FeedView(SparseColumnsMixin, generics.ListAPIView):
     serializer_class = PostSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_queryset(self):
         following_users = self.request.user.following.all()
-        return Post.objects.filter(author__in=following_users).order_by("-created_at")
+        return (Post.objects.filter(author__in=following_users)
+                .select_related("author").order_by("-created_at"))
     
 class LikePostView(generics.GenericAPIView):
     permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = WRITE_THROTTLE_CLASSES
+    throttle_scope = 'likes'
 
     def post(self, request, pk):
         post = generics.get_object_or_404(Post, pk=pk)
@@ -74,6 +87,8 @@ class LikePostView(generics.GenericAPIView):
 
 class UnlikePostView(generics.GenericAPIView):
     permission_classes = [permissions.IsAuthenticated]
+    throttle_classes = WRITE_THROTTLE_CLASSES
+    throttle_scope = 'likes'
 
 
     def post(self, request, pk):
@@ -53,6 +53,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'social_media_api.compression.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -95,6 +96,22 @@ DATABASES = {
     }
 }
 
+# Cache
+# Throttle counters live here, so use a shared backend (e.g. Redis) when
+# running more than one worker process.
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('DJANGO_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('DJANGO_CACHE_LOCATION', ''),
+    }
+}
+
+# Real-time notifications (notifications.views.notification_stream)
+# Use 'notifications.broker.PostgresBroker' when running several ASGI workers.
+NOTIFICATIONS_BROKER = os.environ.get('NOTIFICATIONS_BROKER', 'notifications.broker.InMemoryBroker')
+NOTIFICATIONS_STREAM_HEARTBEAT = 15  # seconds between keep-alive comments
+NOTIFICATIONS_STREAM_QUEUE_SIZE = 100  # events buffered per slow client before it is dropped
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -133,6 +150,29 @@ STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
+# Uploaded files (profile pictures and their generated thumbnails)
+MEDIA_URL = 'media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Avatar sizes built off the request path by accounts.thumbnails
+PROFILE_PICTURE_SIZES = {'small': 64, 'medium': 160, 'large': 320}
+PROFILE_PICTURE_WORKERS = int(os.environ.get('PROFILE_PICTURE_WORKERS', '2'))
+
+# Account removal runs in the background (accounts.deletion), this many rows
+# per transaction. Run `manage.py process_account_deletions` to resume jobs
+# interrupted by a restart.
+ACCOUNT_DELETION_BATCH_SIZE = 500
+ACCOUNT_DELETION_WORKERS = 1
+# A running job without progress for this many seconds is taken over by the command
+ACCOUNT_DELETION_STALE_AFTER = 600
+
+# Response compression (social_media_api.compression): br (when Brotli is
+# installed) or gzip as negotiated, for bodies of at least COMPRESSION_MIN_SIZE bytes.
+# Per-route levels go in COMPRESSION_ROUTE_LEVELS, keyed by URL name.
+COMPRESSION_MIN_SIZE = 860
+COMPRESSION_LEVELS = {'br': 4, 'gzip': 6}
+COMPRESSION_ROUTE_LEVELS = {}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -152,6 +192,14 @@ REST_FRAMEWORK = {
      ],
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
+    # Used by posts.throttling: one rate per endpoint scope, counted per user,
+    # plus 'writes' as the overall budget a user has across all of them.
+    'DEFAULT_THROTTLE_RATES': {
+        'likes': '60/min',
+        'follows': '30/min',
+        'comments': '20/min',
+        'writes': '300/hour',
+    },
 
     
 }